@@ -0,0 +1,173 @@
+import copy
+import shutil
+import tempfile
+import threading
+from collections import deque
+
+
+class RenderCancelado(Exception):
+    """Levantada dentro de um trabalho quando ele foi substituído por um mais novo."""
+    pass
+
+
+class TrabalhoRender:
+    """
+    Um pedido de renderização com uma cópia imutável dos dados do momento em que foi criado.
+    tipo: "preview" (pode ser descartado/cancelado) ou "final" (sempre executa).
+    """
+    def __init__(self, tarefa, dados, design, tipo="preview", opcoes=None, ao_concluir=None, ao_falhar=None):
+        self.tarefa = tarefa
+        # Snapshot: edições posteriores em controller.portfolio_data não afetam este trabalho
+        self.dados = copy.deepcopy(dados)
+        self.design = copy.deepcopy(design)
+        self.tipo = tipo
+        self.opcoes = opcoes or {}
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.scratch_dir = None # Pasta temporária exclusiva, criada na execução
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def verificar_cancelamento(self):
+        """Ponto de checagem entre as etapas: interrompe o trabalho se ele foi substituído."""
+        if self._cancelado.is_set():
+            raise RenderCancelado()
+
+
+class AgendadorRenderizacao:
+    """
+    Fila única de renderizações executadas em uma thread de trabalho.
+    - Trabalhos "final" rodam em ordem, nenhum é descartado.
+    - Previews são agrupados: só o mais recente fica na fila, e um preview em execução
+      é cancelado quando chega outro mais novo.
+    - Cada trabalho roda com seus próprios arquivos temporários (scratch_dir).
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._finais = deque()
+        self._preview = None # Apenas o preview mais recente aguarda
+        self._atual = None
+        self._observadores = []
+
+        # Estatísticas
+        self.concluidos = 0
+        self.descartados = 0
+        self.cancelados = 0
+
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def adicionar_observador(self, callback):
+        """callback(pendentes, em_execucao) é chamado (na thread de trabalho) quando a fila muda."""
+        self._observadores.append(callback)
+
+    def profundidade(self):
+        """Quantidade de trabalhos aguardando (sem contar o que está em execução)."""
+        with self._cond:
+            return len(self._finais) + (1 if self._preview else 0)
+
+    def agendar(self, tarefa, dados, design, tipo="preview", opcoes=None, ao_concluir=None, ao_falhar=None):
+        """
+        Enfileira tarefa(trabalho). O resultado vai para ao_concluir(resultado) e os erros para
+        ao_falhar(erro); nenhum dos dois é chamado se o trabalho for cancelado.
+        """
+        trabalho = TrabalhoRender(tarefa, dados, design, tipo, opcoes, ao_concluir, ao_falhar)
+        with self._cond:
+            if tipo == "preview":
+                if self._preview is not None:
+                    self._preview.cancelar()
+                    self.descartados += 1
+                self._preview = trabalho
+                if self._atual is not None and self._atual.tipo == "preview":
+                    self._atual.cancelar()
+            else:
+                self._finais.append(trabalho)
+            self._cond.notify()
+        self._notificar()
+        return trabalho
+
+    def _notificar(self):
+        with self._cond:
+            pendentes = len(self._finais) + (1 if self._preview else 0)
+            em_execucao = self._atual is not None
+        for callback in list(self._observadores):
+            try:
+                callback(pendentes, em_execucao)
+            except Exception as e:
+                print(f"Erro ao notificar fila de renderização: {e}")
+
+    def _proximo(self):
+        """Aguarda e retira o próximo trabalho (finais têm prioridade sobre previews)."""
+        with self._cond:
+            while not self._finais and self._preview is None:
+                self._cond.wait()
+            if self._finais:
+                trabalho = self._finais.popleft()
+            else:
+                trabalho = self._preview
+                self._preview = None
+            self._atual = trabalho
+            return trabalho
+
+    def _loop(self):
+        while True:
+            trabalho = self._proximo()
+            self._notificar()
+            self._executar(trabalho)
+            with self._cond:
+                self._atual = None
+            self._notificar()
+
+    def _executar(self, trabalho):
+        trabalho.scratch_dir = tempfile.mkdtemp(prefix="portfolio_render_")
+        try:
+            trabalho.verificar_cancelamento()
+            resultado = trabalho.tarefa(trabalho)
+        except RenderCancelado:
+            self.cancelados += 1
+            return
+        except Exception as e:
+            if trabalho.cancelado:
+                self.cancelados += 1
+            elif trabalho.ao_falhar:
+                self._chamar(trabalho.ao_falhar, e)
+            return
+        finally:
+            shutil.rmtree(trabalho.scratch_dir, ignore_errors=True)
+
+        if trabalho.cancelado:
+            # Substituído depois que a tarefa terminou: o resultado não será entregue
+            self.cancelados += 1
+            self._descartar(resultado)
+            return
+
+        self.concluidos += 1
+        if trabalho.ao_concluir:
+            self._chamar(trabalho.ao_concluir, resultado)
+
+    @staticmethod
+    def _descartar(resultado):
+        """Libera um resultado descartado (ex: o PaginadorPreview, com o documento e a thread de pré-carga)."""
+        for item in resultado if isinstance(resultado, tuple) else (resultado,):
+            fechar = getattr(item, "fechar", None)
+            if callable(fechar):
+                try:
+                    fechar()
+                except Exception as e:
+                    print(f"Erro ao liberar renderização descartada: {e}")
+
+    def _chamar(self, callback, valor):
+        """
+        Entrega o resultado/erro sem deixar uma exceção do callback (ex: self.after numa tela
+        já destruída) derrubar a única thread de trabalho.
+        """
+        try:
+            callback(valor)
+        except Exception as e:
+            print(f"Erro ao entregar resultado da renderização: {e}")
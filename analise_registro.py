@@ -0,0 +1,212 @@
+#relatório de habilidades de todos os portfólios registrados (dashboard em PNG ou PDF)
+#rode o comando: python analise_registro.py --formato pdf
+import argparse
+import hashlib
+import os
+import sys
+import time
+import numpy as np
+
+from busca import LISTAS_HABILIDADES, normalizar
+
+CATEGORIAS = ("Frontend", "Backend", "Soft")
+ANALISE_DIR = os.path.join("output", "analise")
+
+# Quantidade de habilidades mostradas no ranking e em cada eixo da co-ocorrência
+TOP_HABILIDADES = 15
+TOP_COOCORRENCIA = 12
+
+
+class MatrizHabilidades:
+    """
+    Habilidades do registro codificadas como inteiros.
+    Cada ocorrência (portfólio, habilidade, categoria) vira uma posição em três vetores
+    paralelos; todas as contagens são feitas sobre eles com NumPy, sem laços em Python.
+    """
+    def __init__(self, portfolios):
+        self.rotulos = [] # código -> nome exibido
+        codigos = {} # habilidade normalizada -> código
+        linhas, colunas, categorias = [], [], []
+        meses = []
+
+        # Única passada em Python: transformar os dicionários em inteiros
+        for linha, portfolio in enumerate(portfolios):
+            for categoria, campo in enumerate(LISTAS_HABILIDADES):
+                for skill in portfolio.get(campo) or ():
+                    skill = str(skill).strip()
+                    chave = normalizar(skill)
+                    if not chave:
+                        continue
+                    codigo = codigos.get(chave)
+                    if codigo is None:
+                        codigo = codigos[chave] = len(self.rotulos)
+                        self.rotulos.append(skill)
+                    linhas.append(linha)
+                    colunas.append(codigo)
+                    categorias.append(categoria)
+            meses.append(_mes_criacao(portfolio.get("data_criacao")))
+
+        self.num_portfolios = len(meses)
+        self.num_habilidades = len(self.rotulos)
+        linhas = np.asarray(linhas, dtype=np.int64)
+        colunas = np.asarray(colunas, dtype=np.int64)
+        categorias = np.asarray(categorias, dtype=np.int8)
+
+        # Remove repetições (mesma habilidade duas vezes na mesma categoria de um portfólio)
+        chaves = (linhas * 3 + categorias) * max(self.num_habilidades, 1) + colunas
+        _, unicos = np.unique(chaves, return_index=True)
+        self.linhas = linhas[unicos]
+        self.colunas = colunas[unicos]
+        self.categorias = categorias[unicos]
+        self.meses = np.asarray(meses, dtype=np.int64) # ano * 12 + (mês - 1); -1 = sem data
+
+    def frequencia(self):
+        """Em quantos portfólios cada habilidade aparece (em qualquer categoria)."""
+        pares = np.unique(self.linhas * max(self.num_habilidades, 1) + self.colunas)
+        return np.bincount(pares % max(self.num_habilidades, 1), minlength=self.num_habilidades)
+
+    def frequencia_categoria(self, categoria):
+        mascara = self.categorias == categoria
+        return np.bincount(self.colunas[mascara], minlength=self.num_habilidades)
+
+    def matriz_categoria(self, categoria, codigos):
+        """Matriz 0/1 (portfólios x codigos) das habilidades da categoria."""
+        posicao = np.full(self.num_habilidades, -1, dtype=np.int64)
+        posicao[codigos] = np.arange(len(codigos))
+        mascara = (self.categorias == categoria) & (posicao[self.colunas] >= 0)
+        matriz = np.zeros((self.num_portfolios, len(codigos)), dtype=np.int32)
+        matriz[self.linhas[mascara], posicao[self.colunas[mascara]]] = 1
+        return matriz
+
+    def coocorrencia(self, top=TOP_COOCORRENCIA):
+        """
+        Quantos portfólios têm cada par (frontend, backend), para as habilidades mais comuns
+        de cada categoria. Retorna (rótulos frontend, rótulos backend, matriz).
+        """
+        frontend = _maiores(self.frequencia_categoria(0), top)
+        backend = _maiores(self.frequencia_categoria(1), top)
+        matriz = self.matriz_categoria(0, frontend).T @ self.matriz_categoria(1, backend)
+        return [self.rotulos[c] for c in frontend], [self.rotulos[c] for c in backend], matriz
+
+    def distribuicao_quantidades(self):
+        """
+        Para cada categoria, quantos portfólios têm 0, 1, 2... habilidades.
+        Retorna uma matriz (categorias x quantidade).
+        """
+        n = self.num_portfolios
+        por_portfolio = np.bincount(
+            self.categorias.astype(np.int64) * n + self.linhas, minlength=len(CATEGORIAS) * n
+        ).reshape(len(CATEGORIAS), n)
+        maximo = int(por_portfolio.max()) + 1 if self.num_portfolios else 1
+        return np.stack([np.bincount(linha, minlength=maximo) for linha in por_portfolio])
+
+    def criados_por_mes(self):
+        """Retorna (rótulos 'mm/aaaa', quantidades) do primeiro ao último mês com cadastros."""
+        meses = self.meses[self.meses >= 0]
+        if not meses.size:
+            return [], np.zeros(0, dtype=np.int64)
+        inicio = meses.min()
+        contagem = np.bincount(meses - inicio)
+        rotulos = [f"{(m % 12) + 1:02d}/{m // 12}" for m in range(inicio, inicio + contagem.size)]
+        return rotulos, contagem
+
+    def assinatura(self):
+        """Hash dos dados analisados: o dashboard só é redesenhado quando o resultado muda."""
+        h = hashlib.sha256()
+        for vetor in (self.linhas, self.colunas, self.categorias, self.meses):
+            h.update(vetor.tobytes())
+        h.update("\n".join(self.rotulos).encode("utf-8"))
+        return h.hexdigest()[:32]
+
+
+def _mes_criacao(texto):
+    """'dd/mm/aaaa hh:mm' -> ano * 12 + (mês - 1), ou -1 se ausente/inválido."""
+    try:
+        return int(texto[6:10]) * 12 + int(texto[3:5]) - 1
+    except (TypeError, ValueError):
+        return -1
+
+
+def _maiores(contagens, n):
+    """Códigos das n maiores contagens (maior primeiro), ignorando zeros."""
+    n = min(n, int(np.count_nonzero(contagens)))
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    indices = np.argpartition(-contagens, n - 1)[:n]
+    return indices[np.argsort(-contagens[indices], kind="stable")]
+
+
+def analisar(portfolios, top=TOP_HABILIDADES):
+    """Calcula todas as estatísticas do dashboard."""
+    matriz = MatrizHabilidades(portfolios)
+    frequencia = matriz.frequencia()
+    mais_comuns = _maiores(frequencia, top)
+    frontend, backend, coocorrencia = matriz.coocorrencia()
+    meses, por_mes = matriz.criados_por_mes()
+    return {
+        "assinatura": matriz.assinatura(),
+        "total_portfolios": matriz.num_portfolios,
+        "total_habilidades": matriz.num_habilidades,
+        "frequencia": [(matriz.rotulos[c], int(frequencia[c])) for c in mais_comuns],
+        "coocorrencia": (frontend, backend, coocorrencia),
+        "distribuicao": matriz.distribuicao_quantidades(),
+        "categorias": CATEGORIAS,
+        "por_mes": (meses, por_mes),
+    }
+
+
+def gerar_relatorio(portfolios=None, formato="png", pasta=ANALISE_DIR, chart_gen=None, analise=None):
+    """
+    Gera o dashboard do registro (reaproveita o arquivo se os dados não mudaram).
+    Retorna o caminho do arquivo.
+    """
+    if portfolios is None:
+        from registro import obter_registro
+        portfolios = obter_registro().listar()
+    if chart_gen is None:
+        from relatorios import GeradorRelatorios
+        chart_gen = GeradorRelatorios(output_dir=pasta, usar_cache=False)
+
+    if analise is None:
+        analise = analisar(portfolios)
+    if not os.path.exists(pasta):
+        os.makedirs(pasta)
+    caminho = os.path.join(pasta, f"analise_registro_{analise['assinatura']}.{formato}")
+    if not os.path.exists(caminho):
+        if chart_gen.gerar_dashboard_registro(analise, caminho, formato=formato) is None:
+            return None
+        # Mantém só o dashboard mais recente de cada formato
+        for nome in os.listdir(pasta):
+            antigo = os.path.join(pasta, nome)
+            if nome.startswith("analise_registro_") and nome.endswith(f".{formato}") and antigo != caminho:
+                os.remove(antigo)
+    return os.path.abspath(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de habilidades de todos os portfólios registrados.")
+    parser.add_argument("--registro", default="portfolios_registrados.db",
+                        help="Registro SQLite (ou um JSON exportado) com os portfólios.")
+    parser.add_argument("--formato", choices=("png", "pdf"), default="png", help="Formato do dashboard.")
+    parser.add_argument("--saida", default=ANALISE_DIR, help="Pasta onde o dashboard será salvo.")
+    args = parser.parse_args()
+
+    from lote_pdf import carregar_portfolios
+    portfolios = carregar_portfolios(args.registro)
+
+    inicio = time.perf_counter()
+    analise = analisar(portfolios)
+    tempo_analise = time.perf_counter() - inicio
+    caminho = gerar_relatorio(portfolios, args.formato, args.saida, analise=analise)
+    tempo_total = time.perf_counter() - inicio
+
+    print(f"Portfólios: {analise['total_portfolios']} | Habilidades distintas: {analise['total_habilidades']}")
+    for nome, quantidade in analise["frequencia"][:5]:
+        print(f"  {nome}: {quantidade}")
+    print(f"Análise: {tempo_analise * 1000:.1f} ms | Total com o dashboard: {tempo_total:.2f}s")
+    print(f"Dashboard salvo em {caminho}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
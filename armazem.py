@@ -0,0 +1,248 @@
+#armazém de uploads endereçado pelo conteúdo + coleta de lixo
+#relatório (não apaga nada): python armazem.py gc
+#apagar de verdade:          python armazem.py gc --aplicar
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from cache_pdf import hash_arquivo
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOADS_DIR = os.path.join(BASE_DIR, "uploads")
+BLOBS_DIR = os.path.join(UPLOADS_DIR, "blobs")
+DERIVADOS_DIR = os.path.join(UPLOADS_DIR, "derivados")
+CHARTS_DIR = os.path.join(UPLOADS_DIR, "charts")
+
+# Um blob recém-enviado ainda pode não estar em nenhum portfólio salvo (formulário aberto)
+CARENCIA_SEGUNDOS = 24 * 60 * 60
+
+EXTENSOES = {".png", ".jpg", ".jpeg"}
+
+
+def _formatar_bytes(tamanho):
+    for unidade in ("B", "KB", "MB", "GB"):
+        if tamanho < 1024 or unidade == "GB":
+            return f"{tamanho:.0f} {unidade}" if unidade == "B" else f"{tamanho:.1f} {unidade}"
+        tamanho /= 1024
+
+
+class ArmazemUploads:
+    """
+    Fotos enviadas, guardadas uma única vez pelo hash do conteúdo:
+    uploads/blobs/ab/abcdef....jpg. Dois arquivos 'foto.jpg' diferentes não se
+    sobrescrevem e reenviar a mesma imagem não cria outra cópia. Arquivos que já estão
+    no mesmo disco (ex: os uploads antigos) entram por hardlink, sem ocupar espaço extra.
+    """
+    def __init__(self, pasta=BLOBS_DIR):
+        self.pasta = pasta
+        self._lock = threading.Lock()
+        if not os.path.exists(self.pasta):
+            os.makedirs(self.pasta)
+
+    def caminho_blob(self, digest, extensao):
+        return os.path.join(self.pasta, digest[:2], f"{digest}{extensao}")
+
+    def guardar(self, origem):
+        """Guarda o arquivo (se ainda não existir) e retorna o caminho absoluto do blob."""
+        extensao = os.path.splitext(origem)[1].lower()
+        if extensao == ".jpeg":
+            extensao = ".jpg"
+        digest = hash_arquivo(origem)
+        destino = self.caminho_blob(digest, extensao)
+
+        with self._lock:
+            if os.path.exists(destino):
+                os.utime(destino, None) # Reenvio: renova a carência da coleta de lixo
+                return destino
+            pasta = os.path.dirname(destino)
+            if not os.path.exists(pasta):
+                os.makedirs(pasta)
+
+            # Dentro de uploads/ (mesmo disco): hardlink; fora: cópia atômica. Um arquivo
+            # escolhido pelo usuário não é linkado, senão editá-lo mudaria o blob.
+            if os.path.abspath(origem).startswith(UPLOADS_DIR + os.sep):
+                try:
+                    os.link(origem, destino)
+                    return destino
+                except OSError:
+                    pass # Sistema de arquivos sem hardlink: copia
+            fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f, open(origem, "rb") as original:
+                    shutil.copyfileobj(original, f)
+                os.replace(temporario, destino)
+            except Exception:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+                raise
+        return destino
+
+    def blobs(self):
+        """Gera (digest, caminho, tamanho, mtime) de todos os blobs."""
+        if not os.path.exists(self.pasta):
+            return
+        for sub in os.scandir(self.pasta):
+            if not sub.is_dir():
+                continue
+            for entrada in os.scandir(sub.path):
+                if entrada.is_file() and not entrada.name.endswith(".tmp"):
+                    info = entrada.stat()
+                    yield os.path.splitext(entrada.name)[0], entrada.path, info.st_size, info.st_mtime
+
+
+def fotos_referenciadas(portfolios, pasta_blobs=BLOBS_DIR):
+    """
+    Fotos usadas, como (hashes, nomes). Foto que existe nesta máquina entra pelo hash do
+    conteúdo (um blob já tem o hash no nome, sem reler o arquivo); caminho de outra máquina
+    entra só pelo nome do arquivo, que é o que sobra para comparar.
+    """
+    hashes = set()
+    nomes = set()
+    vistos = set()
+    pasta_blobs = os.path.abspath(pasta_blobs)
+    for portfolio in portfolios:
+        caminho = portfolio.get("photo_path")
+        if not caminho or caminho in vistos:
+            continue
+        vistos.add(caminho)
+        if os.path.isfile(caminho):
+            absoluto = os.path.abspath(caminho)
+            if os.path.dirname(os.path.dirname(absoluto)) == pasta_blobs:
+                hashes.add(os.path.splitext(os.path.basename(absoluto))[0])
+            else:
+                hashes.add(hash_arquivo(absoluto))
+        else:
+            nomes.add(os.path.basename(caminho.replace("\\", "/")).lower())
+    return hashes, nomes
+
+
+def coletar_lixo(portfolios, armazem=None, aplicar=False, legado=False, carencia=CARENCIA_SEGUNDOS):
+    """
+    Remove (ou, com aplicar=False, só lista) o que nenhum portfólio registrado usa:
+    - blobs cuja foto não está em nenhum portfólio (respeitando a carência);
+    - fotos reduzidas (uploads/derivados) de fotos que não estão mais em uso;
+    - gráficos mini_chart_<hash do email> do esquema antigo de nomes;
+    - com legado=True, imagens soltas em uploads/ que nenhum portfólio referencia.
+    Retorna {categoria: (mantidos, bytes mantidos, removidos, bytes removidos)}.
+    """
+    armazem = armazem or ArmazemUploads()
+    hashes_usados, nomes_usados = fotos_referenciadas(portfolios, armazem.pasta)
+    agora = time.time()
+    relatorio = {}
+    remover = []
+
+    def contar(categoria, caminho, tamanho, apagar):
+        mantidos, bytes_mantidos, removidos, bytes_removidos = relatorio.get(categoria, (0, 0, 0, 0))
+        if apagar:
+            remover.append(caminho)
+            relatorio[categoria] = (mantidos, bytes_mantidos, removidos + 1, bytes_removidos + tamanho)
+        else:
+            relatorio[categoria] = (mantidos + 1, bytes_mantidos + tamanho, removidos, bytes_removidos)
+
+    hashes_em_uso = set()
+    for digest, caminho, tamanho, mtime in armazem.blobs():
+        em_uso = (digest in hashes_usados or os.path.basename(caminho).lower() in nomes_usados
+                  or agora - mtime < carencia)
+        if em_uso:
+            hashes_em_uso.add(digest)
+        contar("blobs", caminho, tamanho, not em_uso)
+
+    # Fotos soltas do esquema antigo (uploads/<nome original>)
+    soltas = []
+    if os.path.exists(UPLOADS_DIR):
+        for entrada in os.scandir(UPLOADS_DIR):
+            if entrada.is_file() and os.path.splitext(entrada.name)[1].lower() in EXTENSOES:
+                soltas.append(entrada)
+    for entrada in soltas:
+        digest = hash_arquivo(entrada.path)
+        em_uso = digest in hashes_usados or entrada.name.lower() in nomes_usados
+        if em_uso:
+            hashes_em_uso.add(digest)
+        contar("uploads antigos", entrada.path, entrada.stat().st_size, legado and not em_uso)
+
+    # Derivados: <sha[:32] da foto original>_<tamanho>.png
+    if os.path.exists(DERIVADOS_DIR):
+        prefixos = {digest[:32] for digest in hashes_em_uso}
+        for entrada in os.scandir(DERIVADOS_DIR):
+            if entrada.is_file() and entrada.name.endswith(".png"):
+                info = entrada.stat()
+                em_uso = entrada.name.split("_")[0] in prefixos or agora - info.st_mtime < carencia
+                contar("fotos reduzidas", entrada.path, info.st_size, not em_uso)
+
+    # Gráficos: os endereçados pelo conteúdo já têm limite LRU; os mini_chart_<hash do email> não são mais gerados
+    if os.path.exists(CHARTS_DIR):
+        for entrada in os.scandir(CHARTS_DIR):
+            if entrada.is_file():
+                contar("gráficos", entrada.path, entrada.stat().st_size, entrada.name.startswith("mini_chart_"))
+
+    if aplicar:
+        for caminho in remover:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+    return relatorio
+
+
+def imprimir_relatorio(relatorio, aplicar):
+    print("\n--- Uploads ---")
+    total_removido = 0
+    for categoria, (mantidos, bytes_mantidos, removidos, bytes_removidos) in relatorio.items():
+        acao = "removidos" if aplicar else "a remover"
+        print(f"{categoria:<17} em uso: {mantidos:>5} ({_formatar_bytes(bytes_mantidos):>9}) | "
+              f"{acao}: {removidos:>5} ({_formatar_bytes(bytes_removidos):>9})")
+        total_removido += bytes_removidos
+    if aplicar:
+        print(f"Espaço liberado: {_formatar_bytes(total_removido)}")
+    else:
+        print(f"Espaço que seria liberado: {_formatar_bytes(total_removido)} (use --aplicar para remover)")
+
+
+_armazem = None
+_armazem_lock = threading.Lock()
+
+
+def obter_armazem():
+    """Armazém compartilhado pelo processo."""
+    global _armazem
+    with _armazem_lock:
+        if _armazem is None:
+            _armazem = ArmazemUploads()
+    return _armazem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazém de uploads: coleta de lixo e relatório de espaço.")
+    parser.add_argument("acao", choices=("gc",))
+    parser.add_argument("--aplicar", action="store_true", help="Remove de verdade (sem isso, só mostra o relatório).")
+    parser.add_argument("--legado", action="store_true",
+                        help="Inclui as imagens soltas em uploads/ que nenhum portfólio usa.")
+    parser.add_argument("--carencia-horas", type=float, default=CARENCIA_SEGUNDOS / 3600,
+                        help="Não remove blobs/derivados mais novos que isso (fotos ainda não salvas).")
+    args = parser.parse_args()
+
+    from registro import obter_registro
+    # O rascunho do formulário também segura a foto
+    rascunho = []
+    if os.path.exists("portfolio_data.json"):
+        try:
+            with open("portfolio_data.json", "r", encoding="utf-8") as f:
+                rascunho.append(json.load(f))
+        except Exception as e:
+            print(f"Erro ao ler portfolio_data.json: {e}")
+    portfolios = itertools.chain(obter_registro().iterar(), rascunho)
+
+    relatorio = coletar_lixo(portfolios, aplicar=args.aplicar, legado=args.legado,
+                             carencia=args.carencia_horas * 3600)
+    imprimir_relatorio(relatorio, args.aplicar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#benchmark do pipeline do PDF e do registro, com comparação contra um baseline salvo
+#rode o comando: python benchmark_render.py
+#gravar o baseline (na máquina de referência): python benchmark_render.py --salvar-baseline
+#só o registro, rápido: python benchmark_render.py --etapas registro --tamanhos 1000 10000
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Garante que os outros módulos possam ser importados
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Mesmo ajuste do main.py para o WeasyPrint encontrar o GTK3 no Windows
+gtk3_path = r"C:\Program Files\GTK3-Runtime Win64\bin"
+if os.path.exists(gtk3_path):
+    os.environ['PATH'] = gtk3_path + os.pathsep + os.environ['PATH']
+
+from modelo import DESIGN_PADRAO
+
+BASELINE_PADRAO = "benchmark_baseline.json"
+SAIDA_PADRAO = os.path.join("output", "benchmark")
+
+# (nome, experiências, habilidades, foto): do formulário vazio ao maior portfólio aceito
+CENARIOS = [
+    ("vazio", 0, 0, None),
+    ("tipico", 3, 15, "pequena"),
+    ("grande", 20, 60, "grande"),
+    ("maximo", 50, 100, "grande"),
+    ("maximo_sem_foto", 50, 100, None),
+]
+TAMANHOS_REGISTRO = (1000, 10000, 100000)
+
+# Resolução das fotos sintéticas (a "grande" é a de uma câmera de celular)
+FOTOS = {"pequena": (400, 400), "grande": (4000, 3000)}
+
+HABILIDADES = {
+    "frontend": ["HTML", "CSS", "JavaScript", "TypeScript", "React", "Vue.js", "Angular", "Svelte",
+                 "Sass", "Webpack", "Vite", "Next.js", "Tailwind", "Redux", "Jest"],
+    "backend": ["Python", "Django", "Flask", "FastAPI", "Node.js", "Express.js", "Java", "Spring",
+                "Go", "Rust", "SQL", "PostgreSQL", "MongoDB", "Redis", "Docker"],
+    "soft": ["Comunicação", "Liderança", "Gestão de Tempo", "Trabalho em Equipe", "Criatividade",
+             "Resolução de Problemas", "Empatia", "Organização"],
+}
+CARGOS = ["Desenvolvedor(a) Backend", "Desenvolvedor(a) Frontend", "Engenheiro(a) de Software",
+          "Analista de Dados", "Tech Lead", "Estagiário(a)"]
+CIDADES = ["Maceió-AL", "Arapiraca-AL", "Recife-PE", "São Paulo-SP", "Curitiba-PR", "Salvador-BA"]
+
+
+def _habilidades(rnd, categoria, quantidade):
+    """Habilidades do pool da categoria; acima do tamanho do pool, nomes numerados (ex: 'React 3')."""
+    pool = HABILIDADES[categoria]
+    return [pool[i % len(pool)] + (f" {i // len(pool)}" if i >= len(pool) else "")
+            for i in rnd.sample(range(max(quantidade, 1) * 2), quantidade)]
+
+
+def portfolio_sintetico(indice, n_experiencias, n_habilidades, foto=None, rnd=None):
+    """Portfólio no formato que o formulário monta em _save_and_next, com tamanho controlado."""
+    rnd = rnd or random.Random(indice)
+    terco = n_habilidades // 3
+    quantidades = {"frontend": terco, "backend": terco, "soft": n_habilidades - 2 * terco}
+
+    portfolio = {
+        "nome": f"Pessoa Sintética {indice}",
+        "titulo": rnd.choice(CARGOS),
+        "bio": "Profissional com experiência em projetos web, dados e automação. " * 3,
+        "telefone": f"(82) 9{indice % 10000:04d}-{indice % 7919:04d}",
+        "email": f"pessoa{indice}@exemplo.com",
+        "local": rnd.choice(CIDADES),
+        "linkedin": f"linkedin.com/in/pessoa{indice}",
+        "instagram": "",
+        "photo_path": foto,
+        "formacoes_list": [{
+            "curso": "Engenharia de Software",
+            "instituicao": "Universidade Sintética",
+            "periodo": "2018-2022",
+            "descricao": "Projetos práticos, estruturas de dados, algoritmos e banco de dados.",
+        }],
+        "experiencias_list": [{
+            "cargo": rnd.choice(CARGOS),
+            "empresa": f"Empresa {n}",
+            "periodo": f"{2000 + n % 25} - {2001 + n % 25}",
+            "resumo": "-Desenvolvimento de aplicações web.\n-Análise de requisitos.\n-Testes automatizados.",
+        } for n in range(n_experiencias)],
+        "data_criacao": f"{1 + indice % 28:02d}/{1 + indice % 12:02d}/2025 {indice % 24:02d}:{indice % 60:02d}",
+        "design_config": dict(DESIGN_PADRAO),
+    }
+    for categoria, quantidade in quantidades.items():
+        lista = _habilidades(rnd, categoria, quantidade)
+        portfolio[f"habilidades_{categoria}_list"] = lista
+        portfolio[f"habilidades_{categoria}"] = ", ".join(lista)
+    return portfolio
+
+
+def criar_foto(pasta, nome, tamanho):
+    """JPEG com ruído (não comprime quase nada: o pior caso para a decodificação)."""
+    from PIL import Image
+    caminho = os.path.join(pasta, f"{nome}.jpg")
+    canais = [Image.effect_noise(tamanho, 64) for _ in range(3)]
+    Image.merge("RGB", canais).save(caminho, "JPEG", quality=90)
+    return caminho
+
+
+def medir(funcao, repeticoes, aquecimento=1):
+    """Roda funcao() repetidas vezes e retorna {mediana_ms, min_ms, max_ms, repeticoes}."""
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "min_ms": round(min(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+        "repeticoes": repeticoes,
+    }
+
+
+def _exigir(resultado, etapa):
+    """Os geradores imprimem o erro e retornam None: no benchmark isso não pode virar um tempo 'rápido'."""
+    if resultado is None:
+        raise RuntimeError(f"A etapa '{etapa}' falhou (veja o erro acima).")
+    return resultado
+
+
+def bench_render(cenarios, repeticoes, pasta, imprimir=print):
+    """
+    Tempo de cada etapa do _generate_pdf_task, sem os caches (cada repetição refaz o trabalho):
+    foto reduzida, cada gráfico do GeradorRelatorios, Jinja2, WeasyPrint e PyMuPDF.
+    """
+    # Imports pesados só quando o render é medido
+    import motor_pdf
+    from cache_imagens import CacheDerivados
+    from relatorios import GeradorRelatorios
+
+    motor = motor_pdf.obter_motor()
+    chart_gen = GeradorRelatorios(output_dir=os.path.join(pasta, "charts"), usar_cache=False)
+    fotos = {tipo: criar_foto(pasta, tipo, tamanho) for tipo, tamanho in FOTOS.items()}
+    design = dict(DESIGN_PADRAO)
+    resultados = {}
+
+    for nome, n_experiencias, n_habilidades, foto in cenarios:
+        portfolio = portfolio_sintetico(0, n_experiencias, n_habilidades, fotos.get(foto))
+        etapas = {}
+
+        if foto:
+            def reduzir_foto():
+                # Pasta nova a cada vez: o derivado é sempre gerado, como na primeira renderização
+                derivados = tempfile.mkdtemp(dir=pasta)
+                _exigir(CacheDerivados(pasta=derivados).obter(portfolio["photo_path"], 150), "foto")
+                shutil.rmtree(derivados, ignore_errors=True)
+            etapas["foto"] = medir(reduzir_foto, repeticoes)
+
+        cats = ["Frontend", "Backend", "Soft Skills"]
+        vals = [min(len(portfolio[f"habilidades_{c}_list"]) * 20, 100) for c in ("frontend", "backend", "soft")]
+        if sum(vals) == 0: vals = [20, 20, 20]
+        cor = design["cor_principal"]
+        etapas["grafico_radar_svg"] = medir(
+            lambda: _exigir(chart_gen.generate_radar_chart(cats, vals, color=cor, formato="svg"), "radar svg"),
+            repeticoes)
+        etapas["grafico_radar_png"] = medir(
+            lambda: _exigir(chart_gen.generate_radar_chart(cats, vals, color=cor), "radar png"), repeticoes)
+        etapas["grafico_barras"] = medir(
+            lambda: _exigir(chart_gen.generate_bar_chart(cats, vals, color=cor), "barras"), repeticoes)
+        etapas["grafico_donut"] = medir(
+            lambda: _exigir(chart_gen.generate_mini_bar_chart(cats, vals, color=cor), "donut"), repeticoes)
+
+        # Template, PDF e preview com os dados já preparados (como no pipeline)
+        dados = motor_pdf.preparar_dados(portfolio, design, chart_gen)
+        html = motor.renderizar_html(dados, design)
+        pdf_bytes = motor.escrever_pdf(html)
+        etapas["template"] = medir(lambda: motor.renderizar_html(dados, design), repeticoes)
+        etapas["weasyprint"] = medir(lambda: motor.escrever_pdf(html), repeticoes)
+        etapas["rasterizar"] = medir(lambda: motor_pdf.rasterizar_pagina(pdf_bytes, 400, 550), repeticoes)
+
+        for etapa, tempo in etapas.items():
+            resultados[f"render/{nome}/{etapa}"] = tempo
+        imprimir(f"render/{nome}: " + ", ".join(f"{e} {t['mediana_ms']:.1f} ms" for e, t in etapas.items()))
+    return resultados
+
+
+def bench_registro(tamanhos, repeticoes, pasta, imprimir=print):
+    """
+    save_portfolio e _load_portfolios da lista com N portfólios registrados.
+    O registro, o índice de busca e o motor de similaridade são instâncias próprias
+    numa pasta temporária (o registro do usuário não é tocado); o save mede as mesmas
+    três chamadas do ListaPortfolios.save_portfolio.
+    """
+    from busca import IndiceBusca
+    from registro import RegistroPortfolios
+    from similaridade import MotorSimilaridade
+
+    resultados = {}
+    for n in tamanhos:
+        rnd = random.Random(n)
+        registro = RegistroPortfolios(os.path.join(pasta, f"registro_{n}.db"))
+        etapas = {}
+        try:
+            geracao = (portfolio_sintetico(i, rnd.randint(0, 5), rnd.randint(0, 20), rnd=rnd) for i in range(n))
+            etapas["importar"] = medir(lambda: registro.salvar_varios(geracao), 1, aquecimento=0)
+
+            # Construções a frio (primeira abertura da lista): no máximo 3 vezes, são as etapas longas
+            repeticoes_frio = min(repeticoes, 3)
+            etapas["listar"] = medir(registro.listar, repeticoes_frio, aquecimento=0)
+            portfolios = registro.listar()
+            etapas["indice_construir"] = medir(lambda: IndiceBusca().construir(portfolios), repeticoes_frio,
+                                               aquecimento=0)
+            etapas["similaridade_construir"] = medir(lambda: MotorSimilaridade().construir(portfolios),
+                                                     repeticoes_frio, aquecimento=0)
+            indice = IndiceBusca()
+            indice.construir(portfolios)
+            motor = MotorSimilaridade()
+            motor.construir(portfolios)
+            amostra = copy.deepcopy(portfolios[n // 2])
+            del portfolios
+
+            contador = iter(range(10 ** 9))
+
+            def save_portfolio():
+                amostra["titulo"] = f"Cargo {next(contador)}"
+                registro.salvar(amostra)
+                indice.atualizar(copy.deepcopy(amostra))
+                motor.atualizar(copy.deepcopy(amostra))
+            etapas["save_portfolio"] = medir(save_portfolio, repeticoes)
+
+            # A primeira busca após um save refaz a ordenação (é o que a lista faz ao reabrir)
+            etapas["load_apos_save"] = medir(lambda: (save_portfolio(), indice.buscar()), repeticoes)
+            etapas["load_todos"] = medir(lambda: indice.buscar(), repeticoes)
+            etapas["load_texto"] = medir(lambda: indice.buscar("desenv"), repeticoes)
+            etapas["load_skill"] = medir(lambda: indice.buscar("", ["Python"], "nome"), repeticoes)
+            etapas["similares"] = medir(lambda: motor.similares(amostra), repeticoes)
+        finally:
+            registro.fechar()
+
+        for etapa, tempo in etapas.items():
+            resultados[f"registro/{n}/{etapa}"] = tempo
+        imprimir(f"registro/{n}: " + ", ".join(f"{e} {t['mediana_ms']:.1f} ms" for e, t in etapas.items()))
+    return resultados
+
+
+def info_maquina():
+    return {
+        "plataforma": platform.platform(),
+        "python": platform.python_version(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(etapas, baseline, limite=0.25, minimo_ms=5.0):
+    """
+    Compara as medianas com o baseline. Uma etapa regrediu se ficou mais de 'limite'
+    (fração) mais lenta E mais de minimo_ms mais lenta (etapas de poucos ms oscilam muito).
+    Retorna (regressões, linhas do relatório), regressão = (etapa, base_ms, atual_ms).
+    """
+    regressoes = []
+    linhas = []
+    base_etapas = baseline.get("etapas", {})
+    for etapa, tempo in etapas.items():
+        atual = tempo["mediana_ms"]
+        base = base_etapas.get(etapa, {}).get("mediana_ms")
+        if base is None:
+            linhas.append(f"  {etapa:<45} {'-':>10}   {atual:10.1f} ms  (nova)")
+            continue
+        variacao = (atual - base) / base if base > 0 else 0.0
+        regrediu = variacao > limite and atual - base > minimo_ms
+        if regrediu:
+            regressoes.append((etapa, base, atual))
+        marca = "  <-- REGRESSÃO" if regrediu else ""
+        linhas.append(f"  {etapa:<45} {base:10.1f} -> {atual:10.1f} ms  ({variacao:+.0%}){marca}")
+    return regressoes, linhas
+
+
+def _gravar_json(caminho, conteudo):
+    pasta = os.path.dirname(caminho)
+    if pasta and not os.path.exists(pasta):
+        os.makedirs(pasta)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do PDF e do registro de portfólios.")
+    parser.add_argument("--etapas", nargs="+", choices=("render", "registro"), default=["render", "registro"],
+                        help="O que medir.")
+    parser.add_argument("--cenarios", nargs="+", choices=[c[0] for c in CENARIOS],
+                        help="Cenários do render (padrão: todos).")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=list(TAMANHOS_REGISTRO),
+                        help="Quantidades de portfólios no registro.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada etapa (vale a mediana).")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="Pasta dos resultados em JSON.")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="Arquivo do baseline para comparação.")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava este resultado como o novo baseline.")
+    parser.add_argument("--limite", type=float, default=0.25,
+                        help="Regressão tolerada por etapa, em fração (0.25 = 25%% mais lenta).")
+    parser.add_argument("--minimo-ms", type=float, default=5.0,
+                        help="Diferença mínima (ms) para contar como regressão.")
+    args = parser.parse_args()
+
+    repeticoes = max(1, args.repeticoes)
+    cenarios = [c for c in CENARIOS if not args.cenarios or c[0] in args.cenarios]
+    pasta = tempfile.mkdtemp(prefix="portfolio_bench_")
+    etapas = {}
+    try:
+        if "render" in args.etapas:
+            etapas.update(bench_render(cenarios, repeticoes, pasta))
+        if "registro" in args.etapas:
+            etapas.update(bench_registro(args.tamanhos, repeticoes, pasta))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "maquina": info_maquina(),
+        "etapas": etapas,
+    }
+    caminho = os.path.join(args.saida, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    _gravar_json(caminho, resultado)
+    print(f"\nResultados salvos em {caminho}")
+
+    if args.salvar_baseline:
+        _gravar_json(args.baseline, resultado)
+        print(f"Baseline salvo em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Sem baseline em {args.baseline} (use --salvar-baseline para criar um).")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if baseline.get("maquina") != resultado["maquina"]:
+        print("Aviso: o baseline foi gravado em outra máquina/versão do Python; os tempos podem não ser comparáveis.")
+    regressoes, linhas = comparar(etapas, baseline, args.limite, args.minimo_ms)
+    print(f"\n--- Comparação com o baseline de {baseline.get('data', '?')} ---")
+    print("\n".join(linhas))
+    if regressoes:
+        print(f"\n{len(regressoes)} etapa(s) mais de {args.limite:.0%} mais lenta(s) que o baseline.")
+        return 1
+    print("\nNenhuma regressão.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
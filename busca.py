@@ -0,0 +1,452 @@
+import copy
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+# Campos de texto indexados (as habilidades entram pelas listas habilidades_*_list)
+CAMPOS_TEXTO = ("nome", "titulo", "local")
+LISTAS_HABILIDADES = ("habilidades_frontend_list", "habilidades_backend_list", "habilidades_soft_list")
+
+ORDENACOES = ("recentes", "antigos", "nome")
+
+_TOKEN = re.compile(r"\w+")
+
+# Resultados até esse tamanho contam as facetas portfólio a portfólio; acima, pelas máscaras de bits
+MAX_CONTAGEM_DIRETA = 2000
+
+# int.bit_count só existe a partir do Python 3.10
+_contar_bits = getattr(int, "bit_count", None) or (lambda valor: bin(valor).count("1"))
+
+
+@lru_cache(maxsize=65536)
+def _normalizar(texto):
+    if texto.isascii():
+        return texto.lower()
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'Maceió' e 'maceio' viram o mesmo termo."""
+    # Nomes de habilidades, cidades e cargos se repetem muito: a normalização fica em cache
+    return _normalizar(str(texto or ""))
+
+
+def tokenizar(texto):
+    return _TOKEN.findall(normalizar(texto))
+
+
+@lru_cache(maxsize=65536)
+def _converter_data(texto):
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y %H:%M")
+    except ValueError:
+        return None
+
+
+def data_criacao(portfolio):
+    """Converte o data_criacao ('dd/mm/aaaa hh:mm') em datetime; None se ausente/inválido."""
+    return _converter_data(portfolio.get("data_criacao") or "")
+
+
+def habilidades(portfolio):
+    """Todas as habilidades do portfólio, sem repetição, na ordem em que aparecem."""
+    vistas = {}
+    for campo in LISTAS_HABILIDADES:
+        for skill in portfolio.get(campo) or []:
+            skill = str(skill).strip()
+            chave = normalizar(skill)
+            if chave and chave not in vistas:
+                vistas[chave] = skill
+    return vistas
+
+
+class IndiceBusca:
+    """
+    Índice invertido dos portfólios registrados.
+    - termo -> ids dos portfólios (nome, título, local, instituições e habilidades);
+    - os termos ficam também numa lista ordenada, então um prefixo ('reac') vira uma
+      faixa contínua encontrada com bisect;
+    - habilidade -> ids, para o filtro, e a mesma lista como máscara de bits (um int),
+      para contar as facetas de um resultado grande com AND + contagem de bits;
+    - as ordenações completas ficam em cache e são mantidas a cada save (bisect), e a
+      posição de cada id nelas ordena um resultado filtrado sem percorrer a ordem inteira.
+    Cada portfólio é identificado pelo email, como no registro.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self._ids = {} # email -> id interno
+        self._portfolios = {} # id -> portfólio
+        self._termos_doc = {} # id -> termos indexados (para remover na atualização)
+        self._skills_doc = {} # id -> habilidades normalizadas
+        self._datas = {} # id -> timestamp do data_criacao (0 se desconhecido)
+        self._nomes = {} # id -> nome normalizado (ordenação)
+        self._postings = {} # termo -> set de ids
+        self._termos = [] # termos em ordem alfabética (busca por prefixo)
+        self._skills = {} # habilidade normalizada -> set de ids
+        self._rotulos = {} # habilidade normalizada -> forma de exibição
+        self._mascaras = {} # habilidade normalizada -> ids como bits de um int
+        self._por_frequencia = None # habilidades da mais para a menos frequente (refeita após mudanças)
+        self._proximo_id = 0
+        self._ordens = {} # ordenação -> (ids ordenados, portfólios na mesma ordem), mantida a cada mudança
+        self._posicoes = {} # ordenação -> {id: posição relativa na ordem}, mantida a cada mudança
+
+    def __len__(self):
+        return len(self._portfolios)
+
+    def construir(self, portfolios):
+        """Indexa a lista inteira (os termos são ordenados uma única vez no final)."""
+        with self._lock:
+            self._limpar()
+            for portfolio in portfolios:
+                self._indexar(portfolio, ordenar=False)
+            self._termos = sorted(self._postings)
+            self._mascaras = {chave: self._mascara(ids) for chave, ids in self._skills.items()}
+
+    def atualizar(self, portfolio):
+        """Insere ou substitui (pelo email) um portfólio no índice."""
+        with self._lock:
+            self._indexar(portfolio, ordenar=True)
+
+    def remover(self, email):
+        with self._lock:
+            id_doc = self._ids.pop(email or "", None)
+            if id_doc is not None:
+                self._desindexar(id_doc)
+
+    def _termos_portfolio(self, portfolio, skills):
+        termos = set()
+        for campo in CAMPOS_TEXTO:
+            termos.update(tokenizar(portfolio.get(campo)))
+        for formacao in portfolio.get("formacoes_list") or []:
+            termos.update(tokenizar(formacao.get("instituicao")))
+            termos.update(tokenizar(formacao.get("curso")))
+        for skill in skills.values():
+            termos.update(tokenizar(skill))
+        return termos
+
+    def _indexar(self, portfolio, ordenar):
+        email = portfolio.get("email") or ""
+        id_doc = self._ids.get(email)
+        if id_doc is None:
+            id_doc = self._proximo_id
+            self._proximo_id += 1
+            self._ids[email] = id_doc
+        else:
+            self._desindexar(id_doc)
+
+        skills = habilidades(portfolio)
+        termos = self._termos_portfolio(portfolio, skills)
+        for termo in termos:
+            ids = self._postings.get(termo)
+            if ids is None:
+                ids = self._postings[termo] = set()
+                if ordenar:
+                    insort(self._termos, termo)
+            ids.add(id_doc)
+
+        for chave, rotulo in skills.items():
+            self._skills.setdefault(chave, set()).add(id_doc)
+            self._rotulos.setdefault(chave, rotulo)
+            if ordenar: # Na construção as máscaras são montadas de uma vez no final
+                self._mascaras[chave] = self._mascaras.get(chave, 0) | (1 << id_doc)
+
+        data = data_criacao(portfolio)
+        self._portfolios[id_doc] = portfolio
+        self._termos_doc[id_doc] = termos
+        self._skills_doc[id_doc] = tuple(skills)
+        self._datas[id_doc] = data.timestamp() if data else 0
+        self._nomes[id_doc] = normalizar(portfolio.get("nome"))
+
+        for ordenacao, (ordem, lista) in self._ordens.items():
+            posicao = self._inserir_ordenado(ordem, id_doc, self._chave(ordenacao))
+            lista.insert(posicao, portfolio)
+            self._posicionar(ordenacao, ordem, posicao)
+        self._por_frequencia = None
+
+    def _desindexar(self, id_doc):
+        for termo in self._termos_doc.pop(id_doc, ()):
+            ids = self._postings.get(termo)
+            if ids is not None:
+                ids.discard(id_doc)
+                if not ids:
+                    del self._postings[termo]
+                    posicao = bisect_left(self._termos, termo)
+                    if posicao < len(self._termos) and self._termos[posicao] == termo:
+                        del self._termos[posicao]
+        for chave in self._skills_doc.pop(id_doc, ()):
+            ids = self._skills.get(chave)
+            if ids is not None:
+                ids.discard(id_doc)
+                if not ids:
+                    del self._skills[chave]
+                    self._rotulos.pop(chave, None)
+                    self._mascaras.pop(chave, None)
+                elif chave in self._mascaras:
+                    self._mascaras[chave] &= ~(1 << id_doc)
+        for ordenacao, (ordem, lista) in self._ordens.items():
+            # As chaves do id (data, nome) ainda não foram removidas: a posição sai por bisect
+            posicao = self._bisect(ordem, id_doc, self._chave(ordenacao))
+            del ordem[posicao]
+            del lista[posicao]
+        for posicoes in self._posicoes.values():
+            posicoes.pop(id_doc, None) # Os outros ids continuam na mesma ordem relativa
+        self._por_frequencia = None
+        self._portfolios.pop(id_doc, None)
+        self._datas.pop(id_doc, None)
+        self._nomes.pop(id_doc, None)
+
+    def _ids_prefixo(self, prefixo):
+        """União dos ids de todos os termos que começam com o prefixo."""
+        inicio = bisect_left(self._termos, prefixo)
+        fim = bisect_left(self._termos, prefixo + "\uffff")
+        if fim - inicio == 1:
+            return self._postings[self._termos[inicio]]
+        ids = set()
+        for termo in self._termos[inicio:fim]:
+            ids |= self._postings[termo]
+        return ids
+
+    def _filtrar(self, texto, skills):
+        """Ids que contêm todos os termos (por prefixo) e todas as habilidades pedidas; None = todos."""
+        conjuntos = [self._ids_prefixo(termo) for termo in tokenizar(texto)]
+        for skill in skills or ():
+            conjuntos.append(self._skills.get(normalizar(skill), set()))
+        if not conjuntos:
+            return None
+        # Interseção começando pelo menor conjunto
+        conjuntos.sort(key=len)
+        resultado = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            if not resultado:
+                break
+            resultado &= conjunto
+        return resultado
+
+    def _mascara(self, ids):
+        """Conjunto de ids -> int com esses bits ligados."""
+        bits = bytearray((self._proximo_id >> 3) + 1)
+        for id_doc in ids:
+            bits[id_doc >> 3] |= 1 << (id_doc & 7)
+        return int.from_bytes(bits, "little")
+
+    def _chave(self, ordenacao):
+        if ordenacao == "nome":
+            return lambda i: (self._nomes[i], i)
+        if ordenacao == "antigos":
+            return lambda i: (self._datas[i], i)
+        # Mais recentes primeiro; empate (mesmo minuto) pela ordem de registro
+        return lambda i: (-self._datas[i], -i)
+
+    def _ordem_completa(self, ordenacao):
+        """
+        Mesma ordem de _chave, mas com ordenações estáveis por chaves simples
+        (bem mais rápido que uma tupla por portfólio).
+        """
+        ordem = sorted(self._portfolios)
+        if ordenacao == "nome":
+            ordem.sort(key=self._nomes.__getitem__)
+        elif ordenacao == "antigos":
+            ordem.sort(key=self._datas.__getitem__)
+        else:
+            ordem.reverse()
+            ordem.sort(key=self._datas.__getitem__, reverse=True)
+        return ordem
+
+    @staticmethod
+    def _bisect(ordem, id_doc, chave):
+        """Posição do id na ordem (ou onde ele entraria); as chaves são únicas, pois incluem o id."""
+        valor = chave(id_doc)
+        inicio, fim = 0, len(ordem)
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if chave(ordem[meio]) < valor:
+                inicio = meio + 1
+            else:
+                fim = meio
+        return inicio
+
+    def _inserir_ordenado(self, ordem, id_doc, chave):
+        posicao = self._bisect(ordem, id_doc, chave)
+        ordem.insert(posicao, id_doc)
+        return posicao
+
+    def _posicionar(self, ordenacao, ordem, posicao):
+        """
+        Posição relativa do id recém-inserido em ordem[posicao]: o meio entre as dos vizinhos,
+        sem renumerar os outros. Quando não cabe mais um número entre eles, as posições
+        são refeitas na próxima busca.
+        """
+        posicoes = self._posicoes.get(ordenacao)
+        if posicoes is None:
+            return
+        antes = posicoes[ordem[posicao - 1]] if posicao > 0 else None
+        depois = posicoes[ordem[posicao + 1]] if posicao + 1 < len(ordem) else None
+        if antes is None and depois is None:
+            valor = 0
+        elif antes is None:
+            valor = depois - 1
+        elif depois is None:
+            valor = antes + 1
+        else:
+            valor = (antes + depois) / 2
+            if valor == antes or valor == depois:
+                del self._posicoes[ordenacao]
+                return
+        posicoes[ordem[posicao]] = valor
+
+    def _ordenar(self, ids, ordenacao):
+        """
+        Portfólios dos ids (None = todos) na ordenação pedida. A ordem completa é calculada
+        uma vez e mantida a cada save; um resultado filtrado é ordenado pela posição de cada
+        id nela.
+        """
+        ordem = self._ordens.get(ordenacao)
+        if ordem is None:
+            ids_ordenados = self._ordem_completa(ordenacao)
+            ordem = self._ordens[ordenacao] = (ids_ordenados, list(map(self._portfolios.__getitem__, ids_ordenados)))
+        ordem, lista = ordem
+        if ids is None:
+            return list(lista) # Cópia: a lista em cache muda a cada save
+        posicoes = self._posicoes.get(ordenacao)
+        if posicoes is None:
+            posicoes = self._posicoes[ordenacao] = dict(zip(ordem, range(len(ordem))))
+        return list(map(self._portfolios.__getitem__, sorted(ids, key=posicoes.__getitem__)))
+
+    def _facetas(self, ids, mascara, max_facetas):
+        """
+        [(habilidade normalizada, quantidade)] das mais frequentes em ids (None = todos).
+        As candidatas são percorridas da mais para a menos frequente no registro inteiro:
+        quando nem o total de uma candidata supera a menor das max_facetas já achadas,
+        nenhuma das seguintes supera e a contagem para.
+        """
+        if self._por_frequencia is None:
+            self._por_frequencia = sorted(self._skills, key=lambda chave: len(self._skills[chave]), reverse=True)
+        if ids is None:
+            return [(chave, len(self._skills[chave])) for chave in self._por_frequencia[:max_facetas]]
+        if mascara is None:
+            contagem = Counter()
+            for id_doc in ids:
+                contagem.update(self._skills_doc[id_doc])
+            return contagem.most_common(max_facetas)
+
+        melhores = [] # heap de (quantidade, -posição, habilidade): o topo é a menor
+        for posicao, chave in enumerate(self._por_frequencia):
+            if len(melhores) == max_facetas and min(len(self._skills[chave]), len(ids)) <= melhores[0][0]:
+                break
+            quantidade = _contar_bits(self._mascaras[chave] & mascara)
+            if not quantidade:
+                continue
+            if len(melhores) < max_facetas:
+                heapq.heappush(melhores, (quantidade, -posicao, chave))
+            else:
+                heapq.heappushpop(melhores, (quantidade, -posicao, chave))
+        return [(chave, quantidade) for quantidade, _, chave in sorted(melhores, reverse=True)]
+
+    def buscar(self, texto="", skills=None, ordenacao="recentes", max_facetas=30):
+        """
+        Retorna (portfolios, facetas): os portfólios que casam com todos os termos do texto
+        (prefixo) e com todas as habilidades em skills, ordenados; e as habilidades mais
+        frequentes nesse resultado como [(rótulo, quantidade), ...].
+        """
+        with self._lock:
+            ids = self._filtrar(texto, skills)
+            mascara = None
+            if ids is not None and len(ids) > MAX_CONTAGEM_DIRETA:
+                if skills and not tokenizar(texto):
+                    # Só habilidades: o resultado já é a interseção das máscaras delas
+                    mascara = -1
+                    for skill in skills:
+                        mascara &= self._mascaras.get(normalizar(skill), 0)
+                else:
+                    mascara = self._mascara(ids)
+            contagem = self._facetas(ids, mascara, max_facetas)
+            portfolios = self._ordenar(ids, ordenacao)
+            facetas = [(self._rotulos[chave], n) for chave, n in contagem]
+        return portfolios, facetas
+
+_indice = None
+_indice_lock = threading.Lock()
+_aguardando = None # Callbacks esperando a construção em andamento (None = nenhuma em andamento)
+_pendentes = [] # Saves feitos durante a construção, aplicados antes de publicar o índice
+
+
+def _construir_indice():
+    """Thread de construção: lê o registro em páginas e publica o índice pronto."""
+    global _indice, _aguardando
+    indice = IndiceBusca()
+    erro = None
+    try:
+        from registro import obter_registro
+        indice.construir(obter_registro().iterar())
+    except Exception as e:
+        erro = e
+    with _indice_lock:
+        if erro is None:
+            # Uma página já lida não tem o que foi salvo depois: reaplica os saves do meio tempo
+            for portfolio in _pendentes:
+                indice.atualizar(portfolio)
+            _indice = indice
+        _pendentes.clear()
+        callbacks, _aguardando = _aguardando, None
+    for callback in callbacks:
+        try:
+            callback(None if erro else indice, erro)
+        except Exception as e:
+            print(f"Erro ao entregar o índice de busca: {e}")
+
+
+def indice_pronto():
+    """O índice compartilhado, ou None se ainda não foi construído."""
+    with _indice_lock:
+        return _indice
+
+
+def obter_indice_async(callback):
+    """
+    Pede o índice compartilhado sem bloquear: callback(indice, erro) é chamado na hora se
+    ele já existe, ou na thread de construção quando ficar pronto (uma só construção,
+    mesmo com vários pedidos). Com erro, o próximo pedido tenta de novo.
+    """
+    global _aguardando
+    with _indice_lock:
+        indice = _indice
+        if indice is None:
+            if _aguardando is None:
+                _aguardando = []
+                threading.Thread(target=_construir_indice, daemon=True).start()
+            _aguardando.append(callback)
+    if indice is not None:
+        callback(indice, None)
+
+
+def obter_indice():
+    """Índice compartilhado, construído a partir do registro na primeira busca (bloqueante)."""
+    pronto = threading.Event()
+    resultado = []
+    obter_indice_async(lambda indice, erro: (resultado.append((indice, erro)), pronto.set()))
+    pronto.wait()
+    indice, erro = resultado[0]
+    if erro is not None:
+        raise erro
+    return indice
+
+
+def atualizar_indice(portfolio):
+    """Atualização incremental após um save (se o índice ainda não foi construído, nada a fazer)."""
+    # Cópia: o dicionário salvo continua sendo editado pelo formulário
+    with _indice_lock:
+        indice = _indice
+        if indice is None:
+            if _aguardando is not None:
+                _pendentes.append(copy.deepcopy(portfolio))
+            return
+    indice.atualizar(copy.deepcopy(portfolio))
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import threading
+import warnings
+from PIL import Image
+from cache_pdf import hash_arquivo
+
+DERIVADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads", "derivados")
+
+# Proteção contra "decompression bombs": imagens com dimensões absurdas para um arquivo pequeno
+MAX_PIXELS = 40_000_000
+
+
+class ImagemInvalida(Exception):
+    """Imagem que não pode (ou não deve) ser decodificada."""
+    pass
+
+
+class CacheDerivados:
+    """
+    Versões reduzidas das fotos de perfil, endereçadas pelo hash do conteúdo e pelo tamanho.
+    A foto original é decodificada uma única vez por tamanho (em JPEG, já reduzida via draft mode);
+    o preview do formulário e a imagem do template usam os derivados prontos.
+    """
+    def __init__(self, pasta=DERIVADOS_DIR, max_pixels=MAX_PIXELS):
+        self.pasta = pasta
+        self.max_pixels = max_pixels
+        if not os.path.exists(self.pasta):
+            os.makedirs(self.pasta)
+
+        self._lock = threading.Lock()
+        self._hashes = {} # (caminho, mtime, tamanho do arquivo) -> hash do conteúdo
+
+    def _hash(self, caminho):
+        info = os.stat(caminho)
+        chave = (os.path.abspath(caminho), info.st_mtime_ns, info.st_size)
+        with self._lock:
+            digest = self._hashes.get(chave)
+        if digest is None:
+            digest = hash_arquivo(caminho)
+            with self._lock:
+                self._hashes[chave] = digest
+        return digest
+
+    def _abrir_reduzida(self, caminho, tamanho):
+        """Abre a imagem conferindo as dimensões antes de decodificar os pixels."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            try:
+                img = Image.open(caminho)
+            except (Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+                raise ImagemInvalida(f"Imagem grande demais: {e}")
+
+        largura, altura = img.size
+        if largura * altura > self.max_pixels:
+            img.close()
+            raise ImagemInvalida(f"Imagem grande demais ({largura}x{altura} pixels).")
+
+        # JPEG: decodifica direto em escala reduzida (1/2, 1/4, 1/8) — não tem efeito em PNG
+        img.draft("RGB", (tamanho, tamanho))
+        return img
+
+    def obter(self, caminho, tamanho):
+        """
+        Retorna o caminho absoluto de um PNG de no máximo tamanho x tamanho (proporção mantida)
+        gerado a partir da foto, criando o derivado apenas na primeira vez.
+        """
+        if not caminho or not os.path.exists(caminho):
+            return None
+
+        destino = os.path.join(self.pasta, f"{self._hash(caminho)[:32]}_{tamanho}.png")
+        if os.path.exists(destino):
+            return destino
+
+        with self._abrir_reduzida(caminho, tamanho) as img:
+            derivado = img.convert("RGBA")
+        derivado.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+
+        # Escrita atômica: outro processo/thread pode estar gerando o mesmo derivado
+        fd, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                derivado.save(f, "PNG")
+            os.replace(temporario, destino)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        return destino
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obter_derivado(caminho, tamanho):
+    """Atalho para o cache de derivados compartilhado pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheDerivados()
+    return _cache.obter(caminho, tamanho)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pdf")
+
+# Incrementar quando o pipeline de renderização mudar de forma que invalide PDFs antigos
+VERSAO_PIPELINE = 2
+
+# Ao passar do limite, o descarte vai até esta fração dele: a próxima varredura só vem
+# depois de várias escritas, e não a cada PDF novo com o cache cheio
+FRACAO_APOS_LIMPEZA = 0.9
+
+# Campos que não influenciam o PDF (derivados ou apenas de controle)
+CAMPOS_IGNORADOS = {"processed_img_path", "radar_chart_path", "radar_chart_svg", "data_criacao", "design_config"}
+
+
+def hash_arquivo(caminho, bloco=1024 * 1024):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+class CacheRenderizacao:
+    """
+    Cache de PDFs renderizados, endereçado pelo conteúdo das entradas.
+    A chave combina os dados normalizados, o design, o conteúdo da foto e a versão
+    dos templates/CSS/fontes. O tamanho em disco é limitado com descarte LRU
+    (o mtime de cada arquivo marca o último acesso); o total é mantido em memória e a
+    pasta só é varrida na primeira escrita e quando uma escrita passa do limite.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self._lock = threading.Lock()
+        self._total = None # Bytes em cache; None até a primeira varredura
+        self._hash_fotos = {} # (caminho, mtime, tamanho) -> hash, evita reler a mesma foto
+
+    def _hash_foto(self, photo_path):
+        if not photo_path or not os.path.exists(photo_path):
+            return None
+        info = os.stat(photo_path)
+        chave = (os.path.abspath(photo_path), info.st_mtime_ns, info.st_size)
+        if chave not in self._hash_fotos:
+            self._hash_fotos[chave] = hash_arquivo(photo_path)
+        return self._hash_fotos[chave]
+
+    def chave(self, data, design, versao_templates):
+        """Calcula a chave de cache para uma combinação de entradas."""
+        dados = {k: v for k, v in data.items() if k not in CAMPOS_IGNORADOS}
+        payload = {
+            "pipeline": VERSAO_PIPELINE,
+            "dados": dados,
+            "design": design,
+            "foto": self._hash_foto(data.get("photo_path")),
+            "templates": versao_templates,
+        }
+        texto = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.cache_dir, f"{chave}.pdf")
+
+    def obter(self, chave):
+        """Retorna o caminho do PDF em cache (e marca como usado) ou None."""
+        caminho = self._caminho(chave)
+        try:
+            os.utime(caminho, None)
+            return caminho
+        except FileNotFoundError:
+            return None
+
+    def copiar_para(self, chave, destino):
+        """Copia o PDF em cache para 'destino'. Retorna False se não estiver em cache."""
+        caminho = self.obter(chave)
+        if not caminho:
+            return False
+        try:
+            shutil.copyfile(caminho, destino)
+            return True
+        except FileNotFoundError: # Descartado por outro processo entre obter e copiar
+            return False
+
+    def ler(self, chave):
+        """Retorna os bytes do PDF em cache ou None."""
+        caminho = self.obter(chave)
+        if not caminho:
+            return None
+        try:
+            with open(caminho, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, chave, origem):
+        """Guarda uma cópia do PDF gerado (escrita atômica) e aplica o limite de tamanho."""
+        with open(origem, "rb") as f:
+            self.guardar_bytes(chave, f.read())
+
+    def guardar_bytes(self, chave, conteudo):
+        """Guarda o conteúdo de um PDF já em memória (escrita atômica)."""
+        destino = self._caminho(chave)
+        fd, temporario = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(conteudo)
+            try:
+                anterior = os.path.getsize(destino) # Mesma chave regravada: não conta duas vezes
+            except FileNotFoundError:
+                anterior = 0
+            os.replace(temporario, destino)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        with self._lock:
+            if self._total is not None:
+                self._total += len(conteudo) - anterior
+            if self._total is None or self._total > self.max_bytes:
+                self._total = self._limpar()
+
+    def _limpar(self):
+        """
+        Remove os PDFs menos usados até o cache ocupar FRACAO_APOS_LIMPEZA de max_bytes
+        e retorna o total que sobrou (chamado com self._lock; a varredura também corrige
+        o total em memória se outro processo mexeu na pasta).
+        """
+        entradas = []
+        total = 0
+        for entrada in os.scandir(self.cache_dir):
+            if entrada.is_file() and entrada.name.endswith(".pdf"):
+                info = entrada.stat()
+                entradas.append((info.st_mtime, info.st_size, entrada.path))
+                total += info.st_size
+
+        entradas.sort() # Mais antigos (menos usados) primeiro
+        alvo = self.max_bytes * FRACAO_APOS_LIMPEZA
+        for _, tamanho, caminho in entradas:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+        return total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obter_cache():
+    """Retorna o cache de PDFs compartilhado pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheRenderizacao()
+        return _cache
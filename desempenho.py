@@ -0,0 +1,109 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+LOG_PATH = os.path.join("output", "desempenho_render.jsonl")
+MAX_BYTES_LOG = 5 * 1024 * 1024 # Passou disso: o log atual vira .1 e um novo começa
+
+
+class MedicaoRender:
+    """
+    Tempos de cada etapa de uma renderização (foto, gráficos, template, WeasyPrint,
+    rasterização, atualização da tela). Cada etapa é um bloco 'with medicao.etapa(nome)';
+    quem recebe medicao=None (ex: modo lote) não mede nada.
+    O portfólio é identificado no log pelo mesmo hash do email usado no modo lote,
+    sem gravar dados pessoais.
+    """
+    def __init__(self, tipo="preview", portfolio=None):
+        self.inicio = time.perf_counter()
+        self.tipo = tipo
+        self.etapas = [] # (nome, milissegundos), na ordem em que terminaram
+        self.cache = False # PDF reaproveitado do cache de renderização
+        self.total_ms = None
+
+        portfolio = portfolio or {}
+        self.portfolio_id = hashlib.md5((portfolio.get("email") or "default").encode()).hexdigest()[:8]
+        self.tamanho = {
+            "experiencias": len(portfolio.get("experiencias_list") or []),
+            "formacoes": len(portfolio.get("formacoes_list") or []),
+            "habilidades": sum(len(portfolio.get(f"habilidades_{c}_list") or [])
+                               for c in ("frontend", "backend", "soft")),
+            "foto": bool(portfolio.get("photo_path")),
+        }
+
+    @contextlib.contextmanager
+    def etapa(self, nome):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nome, (time.perf_counter() - t0) * 1000))
+
+    def finalizar(self):
+        """Fecha a medição: o total vai do início do trabalho até agora."""
+        self.total_ms = (time.perf_counter() - self.inicio) * 1000
+        return self.total_ms
+
+    def por_etapa(self):
+        """{etapa: ms}, somando etapas repetidas."""
+        soma = {}
+        for nome, ms in self.etapas:
+            soma[nome] = soma.get(nome, 0.0) + ms
+        return soma
+
+    def para_dict(self, status="ok"):
+        total = self.total_ms if self.total_ms is not None else self.finalizar()
+        return {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "tipo": self.tipo,
+            "status": status,
+            "portfolio": self.portfolio_id,
+            "tamanho": self.tamanho,
+            "cache": self.cache,
+            "total_ms": round(total, 1),
+            "etapas_ms": {nome: round(ms, 1) for nome, ms in self.por_etapa().items()},
+        }
+
+    def resumo(self):
+        """Texto do painel 'detalhes de desempenho' (a etapa mais lenta vem marcada)."""
+        etapas = self.por_etapa()
+        total = self.total_ms if self.total_ms is not None else self.finalizar()
+        if not etapas:
+            return f"Total: {total:.0f} ms"
+        mais_lenta = max(etapas, key=etapas.get)
+        linhas = [f"{'▶  ' if nome == mais_lenta else '   '}{nome:<11} {ms:7.0f} ms" for nome, ms in etapas.items()]
+        outros = total - sum(etapas.values())
+        if outros >= 1:
+            linhas.append(f"   {'outros':<11} {outros:7.0f} ms")
+        linhas.append(f"   {'total':<11} {total:7.0f} ms" + (" (cache)" if self.cache else ""))
+        return "\n".join(linhas)
+
+
+def etapa(medicao, nome):
+    """Bloco medido se houver medição; senão, um bloco que não faz nada."""
+    if medicao is None:
+        return contextlib.nullcontext()
+    return medicao.etapa(nome)
+
+
+_log_lock = threading.Lock()
+
+
+def registrar(medicao, status="ok", log_path=LOG_PATH):
+    """Acrescenta a medição como uma linha JSON no log (chamado das threads de render e da UI)."""
+    try:
+        linha = json.dumps(medicao.para_dict(status), ensure_ascii=False) + "\n"
+        with _log_lock:
+            pasta = os.path.dirname(log_path)
+            if pasta and not os.path.exists(pasta):
+                os.makedirs(pasta)
+            if os.path.exists(log_path) and os.path.getsize(log_path) > MAX_BYTES_LOG:
+                os.replace(log_path, log_path + ".1")
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(linha)
+    except Exception as e:
+        print(f"Erro ao salvar log de desempenho: {e}")
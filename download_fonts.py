@@ -1,32 +1,169 @@
 #arquivo que faz o download de todas as fontes de uma vez, fazendo a geração do pdf ser mais rápida
+#rode o comando: python download_fonts.py
+#sem internet: python download_fonts.py --espelho /caminho/das/fontes
+#servidor local: python download_fonts.py --base-url http://localhost:8000/
+import argparse
+import hashlib
 import os
-import requests
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+FONTS_DIR = os.path.join("templates", "fonts")
+
+# Nome do arquivo -> (URL, SHA-256 esperado). O hash fixa a versão exata de cada fonte:
+# um arquivo que já bate com ele não é baixado de novo e um download diferente é rejeitado.
+FONTES = {
+    "Montserrat-Regular.ttf": (
+        "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCtr6Ew-.ttf",
+        "84f3d3275dfb159dd311c61828fd754a82ec31c377120518e2cd3e7d34394e96",
+    ),
+    "Montserrat-SemiBold.ttf": (
+        "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCu170w-.ttf",
+        "c535bb158e8cfc3c27654f73aa68a87732899e7d9b10d8496b68605a56d947a7",
+    ),
+    "Montserrat-Bold.ttf": (
+        "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCuM70w-.ttf",
+        "247f052d2f5b84a5bbe7831c3b08a71ca391ff54f1dfb9be88a3d3da569e3a38",
+    ),
+    "OpenSans-Regular.ttf": (
+        "https://fonts.gstatic.com/s/opensans/v44/memSYaGs126MiZpBA-UvWbX2vVnXBbObj2OVZyOOSr4dVJWUgsjZ0C4n.ttf",
+        "47ed1cfaa7ffca04a04ab850b2938fd52c09d1b44cfa3e2980878e166b0cbd87",
+    ),
+    "OpenSans-SemiBold.ttf": (
+        "https://fonts.gstatic.com/s/opensans/v44/memSYaGs126MiZpBA-UvWbX2vVnXBbObj2OVZyOOSr4dVJWUgsgH1y4n.ttf",
+        "733eb93b167e6d45de09aa768f6c0355647c2c26f5416dbc7407a08ed41e81c6",
+    ),
+}
+
+
+class FonteInvalida(Exception):
+    """Conteúdo baixado/copiado não confere com o SHA-256 do manifesto."""
+    pass
+
+
+def sha256_arquivo(caminho):
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def criar_sessao(conexoes):
+    """Uma única sessão com pool de conexões (reaproveita TCP/TLS) e novas tentativas em erros temporários."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    sessao = requests.Session()
+    tentativas = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=tentativas)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+def _gravar_verificado(destino, esperado, escrever):
+    """Grava num temporário calculando o SHA-256; só substitui o destino se o hash conferir."""
+    pasta = os.path.dirname(destino) or "."
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    digest = hashlib.sha256()
+    tamanho = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for bloco in escrever():
+                digest.update(bloco)
+                f.write(bloco)
+                tamanho += len(bloco)
+        if digest.hexdigest() != esperado:
+            raise FonteInvalida(f"SHA-256 não confere ({digest.hexdigest()[:12]}... != {esperado[:12]}...)")
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return tamanho
+
+
+def obter_fonte(nome, url, esperado, fonts_dir, sessao=None, espelho=None, timeout=30, forcar=False):
+    """
+    Garante a fonte em fonts_dir. Retorna (nome, status, bytes, erro), com status
+    "ok" (já estava certa), "baixada", "copiada" ou "falha".
+    """
+    destino = os.path.join(fonts_dir, nome)
+    try:
+        if not forcar and os.path.exists(destino) and sha256_arquivo(destino) == esperado:
+            return nome, "ok", 0, None
+
+        if espelho:
+            origem = os.path.join(espelho, nome)
+
+            def ler_espelho():
+                with open(origem, "rb") as f:
+                    yield from iter(lambda: f.read(1024 * 1024), b"")
+            return nome, "copiada", _gravar_verificado(destino, esperado, ler_espelho), None
+
+        def baixar():
+            with sessao.get(url, stream=True, timeout=timeout) as resposta:
+                resposta.raise_for_status()
+                yield from resposta.iter_content(chunk_size=64 * 1024)
+        return nome, "baixada", _gravar_verificado(destino, esperado, baixar), None
+    except Exception as e:
+        return nome, "falha", 0, str(e)
+
+
+def url_da_fonte(nome, url, base_url=None):
+    """Com --base-url (ex: um 'python -m http.server' com os .ttf), a fonte é buscada pelo nome do arquivo."""
+    if base_url:
+        return base_url.rstrip("/") + "/" + nome
+    return url
 
-def download_file(url, filepath):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        print(f"Downloaded: {filepath}")
-    else:
-        print(f"Failed to download: {url}")
 
 def main():
-    fonts_dir = os.path.join("templates", "fonts")
-    if not os.path.exists(fonts_dir):
-        os.makedirs(fonts_dir)
-
-    fonts = {
-        "Montserrat-Regular.ttf": "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCtr6Ew-.ttf",
-        "Montserrat-SemiBold.ttf": "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCu170w-.ttf",
-        "Montserrat-Bold.ttf": "https://fonts.gstatic.com/s/montserrat/v31/JTUHjIg1_i6t8kCHKm4532VJOt5-QNFgpCuM70w-.ttf",
-        "OpenSans-Regular.ttf": "https://fonts.gstatic.com/s/opensans/v44/memSYaGs126MiZpBA-UvWbX2vVnXBbObj2OVZyOOSr4dVJWUgsjZ0C4n.ttf",
-        "OpenSans-SemiBold.ttf": "https://fonts.gstatic.com/s/opensans/v44/memSYaGs126MiZpBA-UvWbX2vVnXBbObj2OVZyOOSr4dVJWUgsgH1y4n.ttf"
-    }
-
-    for filename, url in fonts.items():
-        filepath = os.path.join(fonts_dir, filename)
-        download_file(url, filepath)
+    parser = argparse.ArgumentParser(description="Baixa (e verifica) as fontes usadas no PDF.")
+    parser.add_argument("--destino", default=FONTS_DIR, help="Pasta onde as fontes serão salvas.")
+    parser.add_argument("--espelho", help="Pasta local com os .ttf (sem acesso à internet).")
+    parser.add_argument("--base-url", help="Servidor HTTP alternativo que serve os .ttf pelo nome do arquivo.")
+    parser.add_argument("--workers", type=int, default=len(FONTES), help="Downloads em paralelo.")
+    parser.add_argument("--timeout", type=float, default=30, help="Tempo limite (segundos) de cada conexão/leitura.")
+    parser.add_argument("--forcar", action="store_true", help="Baixa de novo mesmo se o arquivo já estiver certo.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.destino):
+        os.makedirs(args.destino)
+
+    workers = max(1, min(args.workers, len(FONTES)))
+    sessao = None if args.espelho else criar_sessao(workers)
+    inicio = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futuros = [
+                pool.submit(obter_fonte, nome, url_da_fonte(nome, url, args.base_url), esperado,
+                            args.destino, sessao, args.espelho, args.timeout, args.forcar)
+                for nome, (url, esperado) in FONTES.items()
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+    finally:
+        if sessao is not None:
+            sessao.close()
+
+    falhas = 0
+    total_bytes = 0
+    for nome, status, tamanho, erro in resultados:
+        if status == "falha":
+            falhas += 1
+            print(f"Failed: {nome} ({erro})")
+        elif status == "ok":
+            print(f"Up to date: {nome}")
+        else:
+            total_bytes += tamanho
+            print(f"{'Downloaded' if status == 'baixada' else 'Copied'}: {os.path.join(args.destino, nome)}")
+
+    print(f"{len(resultados) - falhas}/{len(resultados)} fontes prontas, "
+          f"{total_bytes / 1024:.0f} KB transferidos em {time.perf_counter() - inicio:.2f}s")
+    return 1 if falhas else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,8 +2,10 @@ import customtkinter as ctk
 from tkinter import filedialog
 from PIL import Image, ImageTk
 import os
-import shutil
 import json
+from cache_imagens import obter_derivado
+from armazem import obter_armazem
+from modelo import adicionar_listas_habilidades
 
 class PortfolioForms(ctk.CTkFrame):
     """
@@ -15,6 +17,12 @@ class PortfolioForms(ctk.CTkFrame):
         self.photo_path = None # Caminho da foto carregada
         self.json_file = "portfolio_data.json"
         
+        # Preview ao vivo (opcional): re-renderiza após uma pausa na digitação
+        self.preview_ao_vivo = False
+        self.preview_delay_ms = 400
+        self._preview_after_id = None
+        self._preview_image = None
+        
         # Configura o layout com rolagem, já que o formulário será longo
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
@@ -23,9 +31,27 @@ class PortfolioForms(ctk.CTkFrame):
         self.scrollable_frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
         self.scrollable_frame.grid_columnconfigure(0, weight=1)
 
+        # Painel lateral do preview ao vivo (fica oculto até ser ativado)
+        self.preview_frame = ctk.CTkFrame(self, fg_color="#e0e0e0")
+        self.preview_frame.grid_columnconfigure(0, weight=1)
+        self.preview_frame.grid_rowconfigure(0, weight=1)
+        self.live_preview_label = ctk.CTkLabel(
+            self.preview_frame,
+            text="O preview aparecerá aqui...",
+            text_color="gray"
+        )
+        self.live_preview_label.grid(row=0, column=0, padx=10, pady=10)
+
         # Contador de linha para organizar os elementos no scrollable_frame
         self.row_counter = 0 
         
+        self.live_preview_switch = ctk.CTkSwitch(
+            self.scrollable_frame,
+            text="Preview ao vivo",
+            command=self._toggle_preview_ao_vivo
+        )
+        self._place_element(self.live_preview_switch, pady=(5, 0))
+        
         # --- Seção de Dados Pessoais e Foto ---
         self._create_section_title("🧑 Dados Pessoais", 16)
         
@@ -150,10 +176,12 @@ class PortfolioForms(ctk.CTkFrame):
         if is_textbox:
             field = ctk.CTkTextbox(self.scrollable_frame, height=80, width=400)
             self.fields[key] = field 
+            self._observar_edicao(field)
         else:
             field_var = ctk.StringVar()
             field = ctk.CTkEntry(self.scrollable_frame, textvariable=field_var, width=400)
             self.fields[key] = field_var
+            self._observar_edicao(field_var)
             
         self._place_element(field, pady=(0, 10))
     
@@ -184,6 +212,10 @@ class PortfolioForms(ctk.CTkFrame):
                                    command=lambda b=block: self._remove_formacao_block(b))
         remove_btn.grid(row=0, column=1, padx=8, pady=8)
 
+        for item in (curso_var, inst_var, periodo_var, descricao_tb):
+            self._observar_edicao(item)
+        self._agendar_preview()
+
         # Registrar refs
         self.formacoes.append({
             'block': block,
@@ -218,6 +250,10 @@ class PortfolioForms(ctk.CTkFrame):
                                    command=lambda b=block: self._remove_experiencia_block(b))
         remove_btn.grid(row=0, column=1, padx=8, pady=8)
 
+        for item in (cargo_var, empresa_var, periodo_var, resumo_tb):
+            self._observar_edicao(item)
+        self._agendar_preview()
+
         self.experiencias.append({
             'block': block,
             'cargo': cargo_var,
@@ -236,6 +272,7 @@ class PortfolioForms(ctk.CTkFrame):
         # Reorganiza posições
         for idx, f in enumerate(self.formacoes):
             f['block'].grid_configure(row=idx)
+        self._agendar_preview()
     
     def _remove_experiencia_block(self, block):
         for i, e in enumerate(self.experiencias):
@@ -245,6 +282,7 @@ class PortfolioForms(ctk.CTkFrame):
                 break
         for idx, e in enumerate(self.experiencias):
             e['block'].grid_configure(row=idx)
+        self._agendar_preview()
         
     
     def _load_photo(self, path=None):
@@ -260,24 +298,20 @@ class PortfolioForms(ctk.CTkFrame):
         if file_path and os.path.exists(file_path):
             # --- Salvar cópia localmente ---
             try:
-                # Se não for carregamento automático (path=None), copia para uploads
+                # Se não for carregamento automático (path=None), guarda no armazém de uploads
+                # (nome pelo hash do conteúdo: arquivos com o mesmo nome não se sobrescrevem)
                 if not path:
-                    upload_dir = "uploads"
-                    if not os.path.exists(upload_dir):
-                        os.makedirs(upload_dir)
-                    
-                    filename = os.path.basename(file_path)
-                    destination_path = os.path.join(upload_dir, filename)
-                    shutil.copy2(file_path, destination_path)
-                    self.photo_path = os.path.abspath(destination_path)
+                    self.photo_path = obter_armazem().guardar(file_path)
                 else:
                     self.photo_path = file_path # Já é o caminho salvo
 
                 # --- Tratamento de Imagem com Pillow ---
-                img = Image.open(self.photo_path)
+                # Usa um derivado de 200px (2x para telas HighDPI) em vez da foto original
+                img = Image.open(obter_derivado(self.photo_path, 200))
+                img.load()
                 
                 # Criar CTkImage (mantém alta qualidade em HighDPI)
-                # Definimos o tamanho de exibição para 100x100, mas passamos a imagem original
+                # Definimos o tamanho de exibição para 100x100
                 ctk_image = ctk.CTkImage(light_image=img, dark_image=img, size=(100, 100))
                 
                 self.photo_preview.configure(
@@ -373,8 +407,8 @@ class PortfolioForms(ctk.CTkFrame):
         except Exception as e:
             print(f"Erro ao carregar dados do JSON: {e}")
 
-    def _save_and_next(self):
-        """Salva os dados coletados no controlador e avança para a próxima tela."""
+    def _coletar_dados(self):
+        """Coleta os campos e os blocos de formação/experiência (apenas os não vazios)."""
         collected_data = self._get_input_data()
 
         # Coleta formações dos blocos (apenas não vazias)
@@ -400,16 +434,79 @@ class PortfolioForms(ctk.CTkFrame):
             }
             if any(experiencia.values()):
                 collected_data['experiencias_list'].append(experiencia)
+        return collected_data
+
+    def _save_and_next(self):
+        """Salva os dados coletados no controlador e avança para a próxima tela."""
+        collected_data = self._coletar_dados()
         
         # Salva persistência
         self._save_data_to_json(collected_data)
         
-        # Otimização para listas de habilidades
-        for key in ["habilidades_frontend", "habilidades_backend", "habilidades_soft"]:
-            if collected_data.get(key):
-                collected_data[f"{key}_list"] = [item.strip() for item in collected_data[key].split(',')]
-            else:
-                collected_data[f"{key}_list"] = []
+        adicionar_listas_habilidades(collected_data)
 
         self.controller.set_portfolio_data(collected_data)
-        self.controller.show_frame("PersonalizacaoFrame")
\ No newline at end of file
+        self.controller.show_frame("PersonalizacaoFrame")
+
+    # --- Preview ao vivo ---
+
+    def _observar_edicao(self, item):
+        """Agenda um novo preview quando o campo (StringVar ou Textbox) é editado."""
+        if isinstance(item, ctk.StringVar):
+            item.trace_add("write", lambda *args: self._agendar_preview())
+        else:
+            item.bind("<KeyRelease>", lambda event: self._agendar_preview(), add="+")
+
+    def _toggle_preview_ao_vivo(self):
+        """Mostra/oculta o painel lateral de preview."""
+        self.preview_ao_vivo = bool(self.live_preview_switch.get())
+        if self.preview_ao_vivo:
+            self.grid_columnconfigure(1, weight=1)
+            self.preview_frame.grid(row=0, column=1, sticky="nsew", padx=(0, 20), pady=20)
+            self._agendar_preview()
+        else:
+            if self._preview_after_id:
+                self.after_cancel(self._preview_after_id)
+                self._preview_after_id = None
+            self.preview_frame.grid_remove()
+            self.grid_columnconfigure(1, weight=0)
+
+    def _agendar_preview(self):
+        """Debounce: só renderiza depois que o usuário para de digitar por preview_delay_ms."""
+        if not self.preview_ao_vivo:
+            return
+        if self._preview_after_id:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(self.preview_delay_ms, self._disparar_preview)
+
+    def _disparar_preview(self):
+        """Envia o estado atual do formulário ao agendador (previews intermediários são descartados)."""
+        self._preview_after_id = None
+        if not self.preview_ao_vivo:
+            return
+        dados = adicionar_listas_habilidades(self._coletar_dados())
+        self.controller.agendador_render.agendar(
+            self._tarefa_preview,
+            dados,
+            self.controller.design_config,
+            tipo="preview",
+            opcoes={"tamanho": (260, 360)},
+            ao_concluir=lambda preview: self.after(0, lambda: self._mostrar_preview(preview)),
+            ao_falhar=lambda e: print(f"Erro no preview ao vivo: {e}")
+        )
+
+    def _tarefa_preview(self, trabalho):
+        """Roda na thread do agendador: renderiza o PDF em memória e rasteriza a primeira página."""
+        import motor_pdf
+        pdf_bytes = motor_pdf.gerar_pdf_bytes(
+            trabalho.dados, trabalho.design, checkpoint=trabalho.verificar_cancelamento
+        )
+        trabalho.verificar_cancelamento()
+        return motor_pdf.rasterizar_pagina(pdf_bytes, *trabalho.opcoes["tamanho"])
+
+    def _mostrar_preview(self, preview):
+        """Atualiza a imagem do painel lateral (thread principal)."""
+        if not self.preview_ao_vivo:
+            return
+        self._preview_image = ctk.CTkImage(light_image=preview, dark_image=preview, size=preview.size)
+        self.live_preview_label.configure(image=self._preview_image, text="")
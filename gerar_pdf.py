@@ -1,14 +1,8 @@
 import customtkinter as ctk
 import os
 import webbrowser
-import threading
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
 from PIL import Image
-import fitz # PyMuPDF
-from relatorios import GeradorRelatorios
-import random
-import pathlib
+from desempenho import MedicaoRender, registrar
 
 class PortfolioPDFGenerator(ctk.CTkFrame):
     """
@@ -26,7 +20,7 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
         # --- Coluna da Esquerda: Controles ---
         self.left_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.left_frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
-        self.left_frame.grid_rowconfigure(4, weight=1) # Empurrar botão voltar para baixo
+        self.left_frame.grid_rowconfigure(6, weight=1) # Empurrar botão voltar para baixo
         self.left_frame.grid_columnconfigure(0, weight=1)
 
         # Label de status/informação
@@ -43,15 +37,22 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
             font=ctk.CTkFont(size=14),
             wraplength=250
         )
-        self.info_label.grid(row=1, column=0, padx=20, pady=(0, 40), sticky="n")
+        self.info_label.grid(row=1, column=0, padx=20, pady=(0, 10), sticky="n")
+
+        # Indicador da fila de renderização
+        self.fila_label = ctk.CTkLabel(
+            self.left_frame,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color="gray"
+        )
+        self.fila_label.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="n")
         
         self.output_dir = "output"
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
             
         self.generated_file_path = os.path.join(self.output_dir, "portfolio_profissional.pdf")
-        self.temp_pdf_path = os.path.join(self.output_dir, "temp_preview.pdf")
-        self.preview_file_path = os.path.join(self.output_dir, "preview.png") # Caminho do preview
         self.html_file_path = os.path.join(self.output_dir, "output_portfolio.html")
 
         self.generate_button = ctk.CTkButton(
@@ -62,7 +63,7 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
             width=250,
             font=ctk.CTkFont(size=18, weight="bold")
         )
-        self.generate_button.grid(row=2, column=0, padx=20, pady=(0, 20))
+        self.generate_button.grid(row=3, column=0, padx=20, pady=(0, 20))
         
         self.open_button = ctk.CTkButton(
             self.left_frame, 
@@ -73,7 +74,7 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
             state="disabled", # Desabilitado até o PDF ser gerado
             fg_color="green" # Cor diferente para destaque
         )
-        self.open_button.grid(row=3, column=0, padx=20, pady=(0, 20), sticky="n")
+        self.open_button.grid(row=4, column=0, padx=20, pady=(0, 20), sticky="n")
 
         self.back_button = ctk.CTkButton(
             self.left_frame, 
@@ -83,7 +84,28 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
             width=250,
             fg_color="gray"
         )
-        self.back_button.grid(row=4, column=0, padx=20, pady=(0, 20), sticky="s") # Sticky south
+        self.back_button.grid(row=6, column=0, padx=20, pady=(0, 20), sticky="s") # Sticky south
+
+        # Painel opcional com o tempo de cada etapa da última renderização
+        self.desempenho_frame = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.desempenho_frame.grid(row=5, column=0, padx=20, pady=(0, 10), sticky="n")
+        self.desempenho_var = ctk.BooleanVar(value=False)
+        self.desempenho_check = ctk.CTkCheckBox(
+            self.desempenho_frame,
+            text="Detalhes de desempenho",
+            variable=self.desempenho_var,
+            command=self._atualizar_desempenho,
+            font=ctk.CTkFont(size=12)
+        )
+        self.desempenho_check.grid(row=0, column=0, sticky="w")
+        self.desempenho_label = ctk.CTkLabel(
+            self.desempenho_frame,
+            text="",
+            font=ctk.CTkFont(family="Courier", size=11),
+            justify="left",
+            anchor="w"
+        )
+        self.ultima_medicao = None # MedicaoRender da última renderização concluída
 
         # --- Coluna da Direita: Preview ---
         self.right_frame = ctk.CTkFrame(self, fg_color="#e0e0e0") # Cor de fundo para destacar o papel
@@ -99,7 +121,32 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
         self.preview_label.grid(row=0, column=0)
         self.preview_image = None # Referência para manter a imagem na memória
         
-        self.chart_gen = GeradorRelatorios()
+        # Navegação entre páginas do preview
+        nav_frame = ctk.CTkFrame(self.right_frame, fg_color="transparent")
+        nav_frame.grid(row=1, column=0, pady=(0, 10))
+        self.prev_page_button = ctk.CTkButton(
+            nav_frame, text="◀", width=40, state="disabled", command=lambda: self._mudar_pagina(-1)
+        )
+        self.prev_page_button.grid(row=0, column=0, padx=5)
+        self.page_label = ctk.CTkLabel(nav_frame, text="", text_color="gray", width=110)
+        self.page_label.grid(row=0, column=1, padx=5)
+        self.next_page_button = ctk.CTkButton(
+            nav_frame, text="▶", width=40, state="disabled", command=lambda: self._mudar_pagina(1)
+        )
+        self.next_page_button.grid(row=0, column=2, padx=5)
+        
+        self.paginador = None # PaginadorPreview do último PDF gerado
+        self.pagina_atual = 0
+        
+        # Preview em memória: PDF em bytes -> pixmap -> CTkImage, sem arquivos temporários.
+        # Com False, volta ao fluxo antigo (temp_preview.pdf + preview.png).
+        self.preview_em_memoria = True
+        
+        # Todas as renderizações passam pelo agendador compartilhado do App
+        self.agendador = controller.agendador_render
+        self.agendador.adicionar_observador(
+            lambda pendentes, em_execucao: self.after(0, lambda: self._atualizar_fila(pendentes, em_execucao))
+        )
 
     def update_data(self):
         """Atualiza a tela quando ela é exibida."""
@@ -109,129 +156,139 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
         # Limpa o preview anterior
         self.preview_label.configure(image=None, text="Gerando preview...")
         self.preview_image = None
+        self._trocar_paginador(None)
         
         # Auto-gerar PREVIEW ao entrar na tela
         self._generate_preview()
 
-    def _process_image_for_template(self, photo_path):
-        """Redimensiona, recorta em círculo e salva a imagem para uso no template."""
-        if not photo_path or not os.path.exists(photo_path):
-            return None # Retorna None se não houver foto
-
-        # --- Tratamento de Imagem com Pillow ---
-        try:
-            img = Image.open(photo_path).convert("RGBA")
-            
-            # 1. Redimensionar para um tamanho ideal para o template (Ex: 150x150)
-            target_size = 150
-            img.thumbnail((target_size, target_size), Image.Resampling.LANCZOS)
-
-            # 2. Criar uma máscara circular (para o efeito de círculo no template)
-            # Embora o CSS possa fazer o efeito (border-radius: 50%), 
-            # redimensionar a imagem é importante para otimização do PDF.
-            
-            # Salvar a imagem processada temporariamente
-            upload_dir = "uploads"
-            if not os.path.exists(upload_dir):
-                os.makedirs(upload_dir)
-                
-            processed_img_path = os.path.join(upload_dir, "processed_profile_pic.png")
-            img.save(processed_img_path, "PNG")
+    def _tamanho_preview(self):
+        """Tamanho disponível para o preview no frame da direita (máx. 400x550)."""
+        self.right_frame.update_idletasks()
+        largura = self.right_frame.winfo_width() - 20
+        altura = self.right_frame.winfo_height() - 70 # Espaço da barra de páginas
+        if largura < 50 or altura < 50: # Frame ainda não desenhado
+            return 400, 550
+        return min(largura, 400), min(altura, 550)
 
-            return os.path.abspath(processed_img_path)
+    def _agendar(self, is_preview):
+        """Envia a geração para o agendador com um snapshot dos dados atuais."""
+        self.agendador.agendar(
+            self._generate_pdf_task,
+            self.controller.portfolio_data,
+            self.controller.design_config,
+            tipo="preview" if is_preview else "final",
+            opcoes={"tamanho": self._tamanho_preview()},
+            ao_concluir=lambda resultado: self.after(0, lambda: self._on_generation_success(is_preview, resultado)),
+            ao_falhar=lambda e: self.after(0, lambda: self._on_generation_error(str(e)))
+        )
 
-        except Exception as e:
-            print(f"Erro ao processar imagem para PDF: {e}")
-            return None
-        
     def _generate_preview(self):
-        """Inicia o processo de geração do PREVIEW (PDF temporário) em background."""
+        """Inicia o processo de geração do PREVIEW em background (previews antigos são descartados)."""
         # Não desabilita o botão de gerar final, pois é apenas um preview
-        threading.Thread(target=self._generate_pdf_task, args=(True,)).start()
+        self._agendar(is_preview=True)
 
     def _save_final_pdf(self):
-        """Salva o PDF final (pode reutilizar o temp ou gerar de novo)."""
+        """Salva o PDF final (reutiliza o preview do cache se os dados não mudaram)."""
         self.generate_button.configure(text="Salvando...", state="disabled")
         self.info_label.configure(text="Salvando arquivo final...", text_color="blue")
-        # Gera novamente para garantir (ou poderia copiar)
-        threading.Thread(target=self._generate_pdf_task, args=(False,)).start()
+        # Com as mesmas entradas do preview, o motor apenas copia o PDF do cache
+        self._agendar(is_preview=False)
 
-    def _generate_pdf_task(self, is_preview=True):
-        """Tarefa de geração do PDF que roda em background.
-           is_preview: Se True, salva em temp_pdf_path. Se False, salva em generated_file_path.
+    def _generate_pdf_task(self, trabalho):
+        """Tarefa de geração do PDF que roda na thread do agendador.
+           trabalho.tipo: "preview" (em memória ou no scratch do trabalho) ou "final" (salva em generated_file_path).
+           trabalho.opcoes["tamanho"]: (largura, altura) máximos das páginas do preview.
+           Retorna (PaginadorPreview com a primeira página já rasterizada, MedicaoRender com o tempo das etapas).
         """
-        try:
-            data = self.controller.portfolio_data
-            design = self.controller.design_config
-            
-            target_path = self.temp_pdf_path if is_preview else self.generated_file_path
+        # Imports pesados (WeasyPrint, Jinja2, PyMuPDF) só na primeira renderização, fora da thread da UI
+        import motor_pdf
+        from paginador_preview import PaginadorPreview
 
-            # --- 1. Processar a imagem ---
-            processed_img_path = self._process_image_for_template(data.get("photo_path"))
-            if processed_img_path:
-                data["processed_img_path"] = pathlib.Path(processed_img_path).as_uri()
-            else:
-                data["processed_img_path"] = None
-            
-            # --- 1.5. Sanitizar URLs ---
-            for key in ["linkedin", "instagram"]:
-                if data.get(key) and not data[key].startswith(("http://", "https://")):
-                    data[key] = f"https://{data[key]}"
-
-            # --- 2. Gerar Gráficos ---
-            # Radar Chart (Equilíbrio)
-            cats = ["Frontend", "Backend", "Soft Skills"]
-            vals = [
-                min(len(data.get("habilidades_frontend_list", [])) * 20, 100),
-                min(len(data.get("habilidades_backend_list", [])) * 20, 100),
-                min(len(data.get("habilidades_soft_list", [])) * 20, 100)
-            ]
-            # Evita gráfico vazio se não tiver skills
-            if sum(vals) == 0: vals = [20, 20, 20] 
-            
-            radar_path = self.chart_gen.generate_radar_chart(cats, vals, color=design["cor_principal"])
-            if radar_path:
-                data["radar_chart_path"] = pathlib.Path(radar_path).as_uri()
+        data = trabalho.dados
+        design = trabalho.design
+        tamanho = trabalho.opcoes.get("tamanho", (400, 550))
+        is_preview = trabalho.tipo == "preview"
+        medicao = MedicaoRender(trabalho.tipo, data)
+
+        try:
+            primeira_pagina = None
+            if is_preview and self.preview_em_memoria:
+                # --- 1 a 5. PDF apenas em memória ---
+                pdf_bytes = motor_pdf.gerar_pdf_bytes(
+                    data, design, checkpoint=trabalho.verificar_cancelamento, medicao=medicao
+                )
             else:
-                data["radar_chart_path"] = None
+                if is_preview:
+                    target_path = os.path.join(trabalho.scratch_dir, "temp_preview.pdf")
+                    html_path = os.path.join(trabalho.scratch_dir, "output_portfolio.html")
+                else:
+                    target_path = self.generated_file_path
+                    html_path = self.html_file_path
 
-            # --- 3. Configurar Jinja2 ---
-            env = Environment(loader=FileSystemLoader("templates"))
-            template = env.get_template("portfolio_template.html")
-            
-            # --- 4. Renderizar o template ---
-            html_output = template.render(
-                dados=data,
-                design=design
-            )
-            
-            # Salva o HTML também (opcional, mas bom para debug)
-            with open(self.html_file_path, "w", encoding="utf-8") as f:
-                f.write(html_output)
-            
-            # --- 5. Gerar o PDF com Weasyprint ---
-            base_url = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
-            HTML(string=html_output, base_url=base_url).write_pdf(target_path)
-            
-            # --- 6. Gerar Preview com PyMuPDF (fitz) ---
-            # Sempre geramos o preview para mostrar na tela, mesmo se for o save final
-            doc = fitz.open(target_path)
-            page = doc.load_page(0) # Primeira página
-            pix = page.get_pixmap(dpi=72) # Baixa resolução para preview rápido
-            pix.save(self.preview_file_path)
-            doc.close()
-
-            # Sucesso
-            self.after(0, lambda: self._on_generation_success(is_preview))
+                # --- 1 a 5. Foto, gráficos, template e PDF (pipeline compartilhado com o modo lote) ---
+                motor_pdf.gerar_pdf(
+                    data,
+                    design,
+                    target_path,
+                    html_path=html_path,
+                    checkpoint=trabalho.verificar_cancelamento,
+                    medicao=medicao
+                )
+                # O scratch é apagado ao fim do trabalho: o paginador fica com os bytes
+                with open(target_path, "rb") as f:
+                    pdf_bytes = f.read()
+
+                if not self.preview_em_memoria:
+                    with medicao.etapa("rasterizar"):
+                        import fitz # PyMuPDF
+                        preview_path = os.path.join(trabalho.scratch_dir, "preview.png")
+                        doc = fitz.open(target_path)
+                        page = doc.load_page(0) # Primeira página
+                        pix = page.get_pixmap(dpi=72) # Baixa resolução para preview rápido
+                        pix.save(preview_path)
+                        doc.close()
+
+                        # Carrega a imagem com PIL e força o carregamento para memória
+                        pil_image = Image.open(preview_path)
+                        pil_image.load()
+                        primeira_pagina = pil_image.copy()
+                        primeira_pagina.thumbnail(tamanho, Image.Resampling.LANCZOS)
+            trabalho.verificar_cancelamento()
             
+            # --- 6. Preview com PyMuPDF (fitz): só a primeira página agora, as outras sob demanda ---
+            with medicao.etapa("rasterizar"):
+                paginador = PaginadorPreview(pdf_bytes, *tamanho)
+            try:
+                if primeira_pagina is not None:
+                    paginador.definir(0, primeira_pagina)
+                with medicao.etapa("rasterizar"):
+                    paginador.obter(0)
+                paginador.pre_carregar(1)
+                trabalho.verificar_cancelamento()
+            except Exception:
+                paginador.fechar()
+                raise
+            return paginador, medicao
+
         except Exception as e:
-            print(f"Erro detalhado na geração de PDF: {e}")
-            # Erro - Agenda a atualização da UI na thread principal
-            self.after(0, lambda: self._on_generation_error(str(e)))
+            if not trabalho.cancelado:
+                print(f"Erro detalhado na geração de PDF: {e}")
+                registrar(medicao, status="erro")
+            raise
+
+    def _atualizar_fila(self, pendentes, em_execucao):
+        """Mostra a profundidade da fila de renderização."""
+        if pendentes or em_execucao:
+            self.fila_label.configure(text=f"Renderizando... ({pendentes} na fila)")
+        else:
+            self.fila_label.configure(text="")
+
+    def _on_generation_success(self, is_preview, resultado):
+        """Chamado quando a geração do PDF termina com sucesso.
+           resultado: (PaginadorPreview do PDF gerado, MedicaoRender do trabalho).
+        """
+        paginador, medicao = resultado
 
-    def _on_generation_success(self, is_preview):
-        """Chamado quando a geração do PDF termina com sucesso."""
-        
         if is_preview:
             self.info_label.configure(text="Clique em 'Gerar e Salvar' para finalizar.", text_color="white")
             self.generate_button.configure(text="Gerar e Salvar PDF", state="normal")
@@ -241,22 +298,76 @@ class PortfolioPDFGenerator(ctk.CTkFrame):
             self.generate_button.configure(text="PDF Salvo!", state="normal") # Mantém habilitado para gerar de novo se quiser
         
         # Exibe o preview
+        with medicao.etapa("ui"):
+            self._trocar_paginador(paginador)
+            self._mostrar_pagina(0)
+        medicao.finalizar()
+        registrar(medicao)
+        self.ultima_medicao = medicao
+        self._atualizar_desempenho()
+
+    def _atualizar_desempenho(self):
+        """Mostra/esconde o painel de desempenho com os tempos da última renderização."""
+        if self.desempenho_var.get() and self.ultima_medicao is not None:
+            self.desempenho_label.configure(text=self.ultima_medicao.resumo())
+            self.desempenho_label.grid(row=1, column=0, pady=(5, 0), sticky="w")
+        else:
+            self.desempenho_label.grid_remove()
+
+    def _trocar_paginador(self, paginador):
+        """Substitui o paginador atual, liberando o documento anterior."""
+        if self.paginador is not None and self.paginador is not paginador:
+            self.paginador.fechar()
+        self.paginador = paginador
+        self.pagina_atual = 0
+        self._atualizar_navegacao()
+
+    def _atualizar_navegacao(self):
+        """Habilita/desabilita os botões de página."""
+        total = self.paginador.num_paginas if self.paginador else 0
+        if total:
+            self.page_label.configure(text=f"Página {self.pagina_atual + 1}/{total}")
+        else:
+            self.page_label.configure(text="")
+        self.prev_page_button.configure(state="normal" if self.pagina_atual > 0 else "disabled")
+        self.next_page_button.configure(state="normal" if self.pagina_atual < total - 1 else "disabled")
+
+    def _mudar_pagina(self, delta):
+        if not self.paginador:
+            return
+        pagina = self.pagina_atual + delta
+        if 0 <= pagina < self.paginador.num_paginas:
+            self._mostrar_pagina(pagina)
+
+    def _mostrar_pagina(self, pagina):
+        """Mostra a página do cache ou rasteriza em background; pré-carrega a seguinte."""
+        paginador = self.paginador
+        if not paginador:
+            return
+        self.pagina_atual = pagina
+        self._atualizar_navegacao()
+
+        imagem = paginador.em_cache(pagina)
+        if imagem is not None:
+            self._exibir_imagem(imagem)
+        else:
+            self.preview_label.configure(text="Carregando página...", image=None)
+            paginador.obter_async(
+                pagina,
+                lambda p, img: self.after(0, lambda: self._pagina_pronta(paginador, p, img))
+            )
+        paginador.pre_carregar(pagina + 1)
+
+    def _pagina_pronta(self, paginador, pagina, imagem):
+        """Callback da rasterização em background (ignora se o usuário já mudou de página/PDF)."""
+        if paginador is self.paginador and pagina == self.pagina_atual:
+            self._exibir_imagem(imagem)
+
+    def _exibir_imagem(self, imagem):
         try:
-            if os.path.exists(self.preview_file_path):
-                # Carrega a imagem com PIL e força o carregamento para memória
-                pil_image = Image.open(self.preview_file_path)
-                pil_image.load() # Garante que o arquivo foi lido
-                
-                # Calcula o tamanho para caber no frame da direita mantendo a proporção
-                max_width = 400
-                max_height = 550
-                
-                # Cria uma cópia para redimensionar (boa prática)
-                img_copy = pil_image.copy()
-                img_copy.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                
+            if imagem is not None:
                 # Cria o objeto CTkImage
-                self.preview_image = ctk.CTkImage(light_image=img_copy, dark_image=img_copy, size=img_copy.size)
+                self.preview_image = ctk.CTkImage(light_image=imagem, dark_image=imagem, size=imagem.size)
                 
                 # Atualiza o label
                 self.preview_label.configure(image=self.preview_image, text="")
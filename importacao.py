@@ -0,0 +1,293 @@
+#importação e exportação em massa do registro (NDJSON ou CSV), um registro por vez
+#rode o comando: python importacao.py importar candidatos.ndjson
+#               python importacao.py exportar registro.csv
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from modelo import (CAMPOS_HABILIDADES, CAMPOS_TEXTO, DESIGN_PADRAO, adicionar_listas_habilidades,
+                    dividir_habilidades, normalizar_url)
+
+CAMPOS_FORMACAO = ("curso", "instituicao", "periodo", "descricao")
+CAMPOS_EXPERIENCIA = ("cargo", "empresa", "periodo", "resumo")
+
+# Limites da validação (um registro fora deles é rejeitado, o lote continua)
+MAX_CARACTERES = 5000
+MAX_HABILIDADES = 100
+MAX_BLOCOS = 20
+
+EMAIL_VALIDO = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# Colunas do design no CSV, uma por chave: design_cor_principal, design_cor_secundaria
+COLUNAS_DESIGN = tuple(f"design_{chave}" for chave in DESIGN_PADRAO)
+# Colunas numeradas do CSV: formacao_1_curso, experiencia_2_empresa...
+COLUNA_BLOCO = re.compile(r"^(formacao|experiencia)_(\d+)_(\w+)$")
+
+
+class RegistroInvalido(Exception):
+    """Registro que não pode ser importado (o motivo vai para o arquivo de rejeitados)."""
+    pass
+
+
+def _texto(valor, campo):
+    if valor is None:
+        return ""
+    if not isinstance(valor, (str, int, float)):
+        raise RegistroInvalido(f"campo '{campo}' deveria ser texto")
+    valor = str(valor).strip()
+    if len(valor) > MAX_CARACTERES:
+        raise RegistroInvalido(f"campo '{campo}' passa de {MAX_CARACTERES} caracteres")
+    return valor
+
+
+def _blocos(bruto, nome, campos):
+    """
+    Lê os blocos de formação/experiência: lista pronta ('formacoes_list') no NDJSON
+    ou colunas numeradas ('formacao_1_curso') no CSV. Blocos vazios são descartados,
+    como no formulário.
+    """
+    lista = bruto.get(f"{'formacoes' if nome == 'formacao' else 'experiencias'}_list")
+    if lista is None:
+        numerados = {}
+        for coluna, valor in bruto.items():
+            encontrado = COLUNA_BLOCO.match(coluna or "")
+            if encontrado and encontrado.group(1) == nome and encontrado.group(3) in campos:
+                numerados.setdefault(int(encontrado.group(2)), {})[encontrado.group(3)] = valor
+        lista = [numerados[n] for n in sorted(numerados)]
+    if not isinstance(lista, list):
+        raise RegistroInvalido(f"'{nome}' deveria ser uma lista")
+
+    blocos = []
+    for item in lista:
+        if not isinstance(item, dict):
+            raise RegistroInvalido(f"bloco de '{nome}' inválido")
+        bloco = {campo: _texto(item.get(campo), f"{nome}.{campo}") for campo in campos}
+        if any(bloco.values()):
+            blocos.append(bloco)
+    if len(blocos) > MAX_BLOCOS:
+        raise RegistroInvalido(f"mais de {MAX_BLOCOS} blocos de '{nome}'")
+    return blocos
+
+
+def converter_registro(bruto):
+    """
+    Converte um registro externo na mesma estrutura que o formulário monta em _save_and_next
+    (campos de texto, formacoes_list, experiencias_list e as listas de habilidades) e valida.
+    Levanta RegistroInvalido com o motivo.
+    """
+    if not isinstance(bruto, dict):
+        raise RegistroInvalido("registro deveria ser um objeto")
+
+    dados = {campo: _texto(bruto.get(campo), campo) for campo in CAMPOS_TEXTO}
+    if not dados["nome"]:
+        raise RegistroInvalido("nome vazio")
+    if not EMAIL_VALIDO.match(dados["email"]):
+        raise RegistroInvalido(f"email inválido: '{dados['email']}'")
+    for campo in ("linkedin", "instagram"):
+        dados[campo] = normalizar_url(dados[campo])
+
+    # A foto só é mantida se o arquivo existe nesta máquina (importar() conta as descartadas)
+    foto = _texto(bruto.get("photo_path"), "photo_path")
+    dados["photo_path"] = foto if foto and os.path.isfile(foto) else None
+    dados["formacoes_list"] = _blocos(bruto, "formacao", CAMPOS_FORMACAO)
+    dados["experiencias_list"] = _blocos(bruto, "experiencia", CAMPOS_EXPERIENCIA)
+
+    # Habilidades: lista pronta (NDJSON) ou texto separado por vírgula (CSV / formulário)
+    for chave in CAMPOS_HABILIDADES:
+        valor = bruto.get(f"{chave}_list", bruto.get(chave))
+        if isinstance(valor, list):
+            valor = ", ".join(str(item) for item in valor)
+        dados[chave] = _texto(valor, chave)
+    adicionar_listas_habilidades(dados)
+    if sum(len(dados[f"{chave}_list"]) for chave in CAMPOS_HABILIDADES) > MAX_HABILIDADES:
+        raise RegistroInvalido(f"mais de {MAX_HABILIDADES} habilidades")
+
+    # Mesmos campos que o ListaPortfolios.save_portfolio acrescenta
+    dados["data_criacao"] = _texto(bruto.get("data_criacao"), "data_criacao") or datetime.now().strftime("%d/%m/%Y %H:%M")
+    design = bruto.get("design_config")
+    if not isinstance(design, dict):
+        # CSV: colunas design_<chave>; as vazias ficam com a cor padrão
+        cores = {chave: _texto(bruto.get(coluna), coluna) for chave, coluna in zip(DESIGN_PADRAO, COLUNAS_DESIGN)}
+        design = dict(DESIGN_PADRAO, **{chave: cor for chave, cor in cores.items() if cor})
+    dados["design_config"] = design
+    return dados
+
+
+def detectar_formato(caminho, formato=None):
+    if formato:
+        return formato
+    return "csv" if caminho.lower().endswith(".csv") else "ndjson"
+
+
+def ler_registros(caminho, formato=None):
+    """Gera (número da linha, registro bruto ou exceção) lendo o arquivo aos poucos."""
+    formato = detectar_formato(caminho, formato)
+    with open(caminho, "r", encoding="utf-8-sig", newline="") as f:
+        if formato == "csv":
+            leitor = csv.DictReader(f)
+            for bruto in leitor:
+                yield leitor.line_num, bruto
+            return
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip():
+                continue
+            try:
+                yield numero, json.loads(linha)
+            except json.JSONDecodeError as e:
+                yield numero, RegistroInvalido(f"JSON inválido: {e.msg}")
+
+
+def importar(caminho, registro, formato=None, tamanho_lote=1000, caminho_rejeitados=None, progresso=True):
+    """
+    Importa os registros do arquivo no registro (upsert por email), em transações de
+    tamanho_lote. Registros inválidos vão para caminho_rejeitados (NDJSON com linha e motivo)
+    sem interromper a importação. Registros com o email de um anterior do arquivo
+    sobrescrevem aquele (contados em 'repetidos', fora de 'importados').
+    Retorna um dicionário com as contagens e o tempo.
+    """
+    if caminho_rejeitados is None:
+        caminho_rejeitados = os.path.splitext(caminho)[0] + ".rejeitados.ndjson"
+
+    inicio = time.perf_counter()
+    lidos = importados = rejeitados = repetidos = fotos_descartadas = 0
+    emails = set() # Só os emails (não os registros): identifica os repetidos entre lotes
+    lote = []
+    arquivo_rejeitados = None
+    try:
+        for numero, bruto in ler_registros(caminho, formato):
+            lidos += 1
+            try:
+                if isinstance(bruto, Exception):
+                    raise bruto
+                dados = converter_registro(bruto)
+                if bruto.get("photo_path") and not dados["photo_path"]:
+                    fotos_descartadas += 1
+                if dados["email"] in emails:
+                    repetidos += 1
+                else:
+                    emails.add(dados["email"])
+                    importados += 1
+                lote.append(dados)
+            except Exception as e: # Qualquer problema no registro o rejeita, sem parar o lote
+                rejeitados += 1
+                if arquivo_rejeitados is None:
+                    arquivo_rejeitados = open(caminho_rejeitados, "w", encoding="utf-8")
+                original = bruto if isinstance(bruto, dict) else None
+                arquivo_rejeitados.write(json.dumps({"linha": numero, "erro": str(e), "registro": original}, ensure_ascii=False) + "\n")
+
+            if len(lote) >= tamanho_lote:
+                registro.salvar_varios(lote)
+                lote = []
+                if progresso:
+                    decorrido = time.perf_counter() - inicio
+                    print(f"{importados} importados, {rejeitados} rejeitados ({importados / decorrido:.0f} registros/s)")
+        if lote:
+            registro.salvar_varios(lote)
+    finally:
+        if arquivo_rejeitados is not None:
+            arquivo_rejeitados.close()
+
+    return {
+        "lidos": lidos,
+        "importados": importados,
+        "rejeitados": rejeitados,
+        "repetidos": repetidos,
+        "fotos_descartadas": fotos_descartadas,
+        "segundos": time.perf_counter() - inicio,
+        "rejeitados_em": caminho_rejeitados if rejeitados else None,
+    }
+
+
+def _linha_csv(portfolio, max_formacoes, max_experiencias):
+    linha = {campo: portfolio.get(campo) or "" for campo in CAMPOS_TEXTO}
+    for chave in CAMPOS_HABILIDADES:
+        linha[chave] = ", ".join(portfolio.get(f"{chave}_list") or dividir_habilidades(portfolio.get(chave)))
+    for nome, lista, campos, maximo in (
+        ("formacao", portfolio.get("formacoes_list") or [], CAMPOS_FORMACAO, max_formacoes),
+        ("experiencia", portfolio.get("experiencias_list") or [], CAMPOS_EXPERIENCIA, max_experiencias),
+    ):
+        for n in range(maximo):
+            item = lista[n] if n < len(lista) else {}
+            for campo in campos:
+                linha[f"{nome}_{n + 1}_{campo}"] = item.get(campo, "")
+    design = portfolio.get("design_config") or DESIGN_PADRAO
+    for chave, coluna in zip(DESIGN_PADRAO, COLUNAS_DESIGN):
+        linha[coluna] = design.get(chave, DESIGN_PADRAO[chave])
+    linha["photo_path"] = portfolio.get("photo_path") or ""
+    linha["data_criacao"] = portfolio.get("data_criacao") or ""
+    return linha
+
+
+def exportar(registro, caminho, formato=None):
+    """
+    Exporta o registro página por página (memória constante). No CSV, uma primeira passada
+    descobre quantas colunas de formação/experiência o cabeçalho precisa.
+    Retorna (quantidade, segundos).
+    """
+    formato = detectar_formato(caminho, formato)
+    inicio = time.perf_counter()
+    total = 0
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        if formato == "csv":
+            max_formacoes = max_experiencias = 0
+            for portfolio in registro.iterar():
+                max_formacoes = max(max_formacoes, len(portfolio.get("formacoes_list") or []))
+                max_experiencias = max(max_experiencias, len(portfolio.get("experiencias_list") or []))
+            colunas = list(CAMPOS_TEXTO) + list(CAMPOS_HABILIDADES)
+            colunas += [f"formacao_{n + 1}_{c}" for n in range(max_formacoes) for c in CAMPOS_FORMACAO]
+            colunas += [f"experiencia_{n + 1}_{c}" for n in range(max_experiencias) for c in CAMPOS_EXPERIENCIA]
+            colunas += list(COLUNAS_DESIGN) + ["photo_path", "data_criacao"]
+            escritor = csv.DictWriter(f, fieldnames=colunas)
+            escritor.writeheader()
+            for portfolio in registro.iterar():
+                escritor.writerow(_linha_csv(portfolio, max_formacoes, max_experiencias))
+                total += 1
+        else:
+            for portfolio in registro.iterar():
+                f.write(json.dumps(portfolio, ensure_ascii=False) + "\n")
+                total += 1
+    return total, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa/exporta portfólios do registro em NDJSON ou CSV.")
+    parser.add_argument("acao", choices=("importar", "exportar"))
+    parser.add_argument("arquivo", help="Arquivo .ndjson/.jsonl ou .csv.")
+    parser.add_argument("--formato", choices=("ndjson", "csv"), help="Força o formato (padrão: pela extensão).")
+    parser.add_argument("--banco", default="portfolios_registrados.db", help="Arquivo SQLite do registro.")
+    parser.add_argument("--lote", type=int, default=1000, help="Registros por transação na importação.")
+    parser.add_argument("--rejeitados", help="Arquivo NDJSON para os registros rejeitados.")
+    args = parser.parse_args()
+
+    from registro import abrir_registro
+    # No banco do app, migra antes: senão a migração do JSON antigo na próxima abertura
+    # do app sobrescreveria (pelo email) o que for importado agora
+    registro = abrir_registro(args.banco)
+    try:
+        if args.acao == "importar":
+            resultado = importar(args.arquivo, registro, args.formato, max(1, args.lote), args.rejeitados)
+            segundos = resultado["segundos"]
+            print("\n--- Resumo da importação ---")
+            print(f"Lidos: {resultado['lidos']} | Importados: {resultado['importados']} | Rejeitados: {resultado['rejeitados']}")
+            if resultado["repetidos"]:
+                print(f"Emails repetidos no arquivo (o último registro de cada um vale): {resultado['repetidos']}")
+            if resultado["fotos_descartadas"]:
+                print(f"Fotos descartadas (arquivo não encontrado nesta máquina): {resultado['fotos_descartadas']}")
+            if segundos > 0:
+                print(f"Tempo: {segundos:.2f}s ({resultado['lidos'] / segundos:.0f} registros/s)")
+            if resultado["rejeitados_em"]:
+                print(f"Rejeitados salvos em {resultado['rejeitados_em']}")
+        else:
+            total, segundos = exportar(registro, args.arquivo, args.formato)
+            taxa = f" ({total / segundos:.0f} registros/s)" if segundos > 0 else ""
+            print(f"{total} portfólios exportados para {args.arquivo} em {segundos:.2f}s{taxa}")
+    finally:
+        registro.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
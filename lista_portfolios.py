@@ -1,22 +1,258 @@
 import customtkinter as ctk
+import copy
 import json
 import os
+import itertools
+import queue
+import sys
+import threading
+import webbrowser
 from datetime import datetime
+from collections import OrderedDict
 from PIL import Image
-from relatorios import GeradorRelatorios
-import hashlib
+from relatorios import GeradorRelatorios, CHARTS_DIR
+from registro import obter_registro
+from busca import obter_indice, obter_indice_async, indice_pronto, atualizar_indice
+
+# Altura fixa (em pixels não escalados) de cada card na lista virtualizada
+ALTURA_CARD = 330
+# Cards extras materializados acima e abaixo da área visível
+MARGEM_CARDS = 2
+# Tamanho reservado para o mini gráfico (o placeholder ocupa o mesmo espaço)
+TAMANHO_GRAFICO = (200, 130)
+
+
+class CarregadorAssets:
+    """
+    Pool de threads que gera e decodifica os mini gráficos fora da thread do Tk.
+    Os pedidos saem por prioridade (menor primeiro); um pedido cujo card já saiu da
+    tela é descartado sem trabalho (valido() retorna False).
+    """
+    def __init__(self, num_threads=2):
+        self._fila = queue.PriorityQueue()
+        self._sequencia = itertools.count() # Desempate: mesma prioridade sai em ordem de chegada
+        for _ in range(num_threads):
+            threading.Thread(target=self._loop, daemon=True).start()
+
+    def pedir(self, prioridade, tarefa, callback, valido=None):
+        """Agenda tarefa(); callback(resultado, erro) é chamado na thread de trabalho."""
+        self._fila.put((prioridade, next(self._sequencia), tarefa, callback, valido))
+
+    def _loop(self):
+        while True:
+            _, _, tarefa, callback, valido = self._fila.get()
+            if valido is not None and not valido():
+                continue
+            try:
+                resultado, erro = tarefa(), None
+            except Exception as e:
+                resultado, erro = None, e
+            try:
+                callback(resultado, erro)
+            except Exception as e:
+                print(f"Erro ao entregar gráfico do card: {e}")
+
+
+class CardPortfolio(ctk.CTkFrame):
+    """
+    Card reutilizável da lista: os widgets são criados uma vez e apenas
+    reconfigurados (preencher) quando o card passa a mostrar outro portfólio.
+    """
+    def __init__(self, master, ao_carregar, ao_similares):
+        super().__init__(master, fg_color="#f0f0f0", corner_radius=10)
+        self.grid_columnconfigure(0, weight=1)
+        self.indice = None
+        self.token = 0 # Muda a cada preencher: resultados atrasados de outro portfólio são ignorados
+        self.window_id = None # Item do canvas que posiciona o card
+        self.chart_image = None
+        
+        # Nome
+        self.name_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#000000",
+            anchor="w"
+        )
+        self.name_label.grid(row=0, column=0, sticky="w", padx=15, pady=(15, 5))
+        
+        # Título profissional
+        self.title_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#333333",
+            anchor="w"
+        )
+        self.title_label.grid(row=1, column=0, sticky="w", padx=15, pady=(0, 5))
+        
+        # Email
+        self.email_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#1a1a1a",
+            anchor="w"
+        )
+        self.email_label.grid(row=2, column=0, sticky="w", padx=15, pady=(0, 5))
+        
+        # Formação
+        self.formacao_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color="#1a1a1a",
+            anchor="w"
+        )
+        self.formacao_label.grid(row=3, column=0, sticky="w", padx=15, pady=(0, 5))
+        
+        # Badges de habilidades (5 fixos, ocultos quando não usados)
+        badges_frame = ctk.CTkFrame(self, fg_color="transparent")
+        badges_frame.grid(row=4, column=0, sticky="w", padx=15, pady=(5, 5))
+        self.badges = []
+        for i in range(5):
+            badge = ctk.CTkLabel(
+                badges_frame,
+                text="",
+                font=ctk.CTkFont(size=9),
+                fg_color="#3498db",
+                text_color="white",
+                corner_radius=5,
+                padx=6,
+                pady=2
+            )
+            badge.grid(row=0, column=i, padx=2)
+            self.badges.append(badge)
+        
+        # Mini gráfico de habilidades
+        self.chart_label = ctk.CTkLabel(
+            self,
+            text="",
+            width=TAMANHO_GRAFICO[0],
+            height=TAMANHO_GRAFICO[1],
+            fg_color="#e4e4e4",
+            text_color="gray",
+            corner_radius=8
+        )
+        self.chart_label.grid(row=5, column=0, sticky="w", padx=15, pady=(8, 8))
+        
+        # Data de criação
+        self.date_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=10),
+            text_color="gray",
+            anchor="w"
+        )
+        self.date_label.grid(row=6, column=0, sticky="w", padx=15, pady=(0, 15))
+        
+        # Botões carregar e similares
+        self.ao_carregar = ao_carregar
+        self.ao_similares = ao_similares
+        self.portfolio = None
+        actions_frame = ctk.CTkFrame(self, fg_color="transparent")
+        actions_frame.grid(row=0, column=1, rowspan=7, padx=15, pady=15)
+        
+        self.load_button = ctk.CTkButton(
+            actions_frame,
+            text="Carregar",
+            width=100,
+            height=30,
+            command=lambda: self.ao_carregar(self.portfolio)
+        )
+        self.load_button.grid(row=0, column=0, pady=(0, 8))
+        
+        self.similar_button = ctk.CTkButton(
+            actions_frame,
+            text="Similares",
+            width=100,
+            height=30,
+            fg_color="gray",
+            command=lambda: self.ao_similares(self.portfolio)
+        )
+        self.similar_button.grid(row=1, column=0)
+
+    def preencher(self, portfolio, indice, chart_image=None, carregando=False):
+        """
+        Mostra outro portfólio reaproveitando os widgets.
+        Com carregando=True o gráfico aparece como placeholder até mostrar_grafico().
+        Retorna o token que identifica este preenchimento.
+        """
+        self.portfolio = portfolio
+        self.indice = indice
+        self.token += 1
+        
+        self.name_label.configure(text=portfolio.get("nome", "Sem nome"))
+        self.title_label.configure(text=portfolio.get("titulo", "Sem título"))
+        self.email_label.configure(text=f"📧 {portfolio.get('email', 'Sem email')}")
+        
+        formacoes = portfolio.get("formacoes_list") or [{}]
+        formacao = formacoes[0].get("curso", "")
+        if formacao:
+            self.formacao_label.configure(text=f"🎓 {formacao} - {formacoes[0].get('instituicao', '')}")
+            self.formacao_label.grid()
+        else:
+            self.formacao_label.grid_remove()
+        
+        skills = []
+        if portfolio.get("habilidades_frontend_list"):
+            skills.extend(portfolio["habilidades_frontend_list"][:3])
+        if portfolio.get("habilidades_backend_list"):
+            skills.extend(portfolio["habilidades_backend_list"][:2])
+        for i, badge in enumerate(self.badges):
+            if i < len(skills[:5]):
+                badge.configure(text=skills[i])
+                badge.grid()
+            else:
+                badge.grid_remove()
+        
+        if chart_image is not None:
+            self.mostrar_grafico(chart_image)
+        elif carregando:
+            self.chart_image = None
+            self.chart_label.configure(image=None, text="Carregando gráfico...", fg_color="#e4e4e4")
+            self.chart_label.grid()
+        else:
+            self.mostrar_grafico(None)
+        
+        self.date_label.configure(text=f"📅 {portfolio.get('data_criacao', 'Data desconhecida')}")
+        return self.token
+
+    def mostrar_grafico(self, chart_image):
+        """Troca o placeholder pelo gráfico (ou oculta a área se não houver gráfico)."""
+        self.chart_image = chart_image
+        if chart_image is not None:
+            self.chart_label.configure(image=chart_image, text="", fg_color="transparent")
+            self.chart_label.grid()
+        else:
+            self.chart_label.configure(image=None, text="")
+            self.chart_label.grid_remove()
+
 
 class ListaPortfolios(ctk.CTkFrame):
     """
     Tela para visualizar todos os portfólios registrados.
+    A lista é virtualizada: só existem cards para a área visível (mais uma margem),
+    e os cards que saem da tela são reaproveitados para os que entram.
     """
     def __init__(self, master, controller):
         super().__init__(master)
         self.controller = controller
-        self.portfolios_file = "portfolios_registrados.json"
-        self.chart_gen = GeradorRelatorios(output_dir="uploads/charts")
+        self.chart_gen = GeradorRelatorios(output_dir=CHARTS_DIR)
+        
+        self.portfolios = []
+        self._cards_visiveis = {} # índice do portfólio -> CardPortfolio
+        self._cards_livres = [] # Pool de cards para reutilizar
+        self._imagens = OrderedDict() # dados do gráfico -> CTkImage (LRU)
+        self._faixa_visivel = (0, -1) # Índices materializados; lido pelas threads do carregador
+        self.carregador = CarregadorAssets()
+        self._max_imagens = 64
+        self._posicao_scroll = 0.0 # Mantida entre visitas à tela
+        self._busca_after_id = None
+        self.busca_delay_ms = 150
+        self._aguardando_indice = False # Índice de busca sendo montado em background
         
-        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=1)
         self.grid_columnconfigure(0, weight=1)
         
         # Título
@@ -27,150 +263,393 @@ class ListaPortfolios(ctk.CTkFrame):
         )
         self.title_label.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="n")
         
-        # Frame scrollable para a lista
-        self.scrollable_frame = ctk.CTkScrollableFrame(self)
-        self.scrollable_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
+        # Barra de busca: texto (por prefixo), filtro por habilidade e ordenação
+        search_frame = ctk.CTkFrame(self, fg_color="transparent")
+        search_frame.grid(row=1, column=0, sticky="ew", padx=20, pady=(0, 10))
+        search_frame.grid_columnconfigure(0, weight=1)
+        
+        self.search_entry = ctk.CTkEntry(
+            search_frame,
+            placeholder_text="Buscar por nome, cargo, local, instituição ou habilidade..."
+        )
+        self.search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 10))
+        self.search_entry.bind("<KeyRelease>", lambda event: self._agendar_busca())
+        
+        self.todas_habilidades = "Todas as habilidades"
+        self._facetas = {} # rótulo exibido no menu -> habilidade
+        self.skill_menu = ctk.CTkOptionMenu(
+            search_frame,
+            values=[self.todas_habilidades],
+            command=lambda _: self._aplicar_busca(),
+            width=190
+        )
+        self.skill_menu.grid(row=0, column=1, padx=(0, 10))
+        
+        self.ordenacoes = {"Mais recentes": "recentes", "Mais antigos": "antigos", "Nome (A-Z)": "nome"}
+        self.sort_menu = ctk.CTkOptionMenu(
+            search_frame,
+            values=list(self.ordenacoes),
+            command=lambda _: self._aplicar_busca(),
+            width=140
+        )
+        self.sort_menu.grid(row=0, column=2, padx=(0, 10))
+        
+        self.result_label = ctk.CTkLabel(search_frame, text="", text_color="gray", width=110)
+        self.result_label.grid(row=0, column=3)
+        
+        # Canvas + barra de rolagem para a lista virtualizada
+        list_frame = ctk.CTkFrame(self)
+        list_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=(0, 20))
+        list_frame.grid_rowconfigure(0, weight=1)
+        list_frame.grid_columnconfigure(0, weight=1)
+        
+        self.canvas = ctk.CTkCanvas(list_frame, highlightthickness=0, bg=self._apply_appearance_mode(list_frame.cget("fg_color")))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(list_frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        self.canvas.bind("<Configure>", lambda event: self._atualizar_viewport(redimensionar=True))
+        # Roda do mouse numa bindtag própria do canvas e dos cards: um bind_all aqui
+        # substituiria a rolagem global dos CTkScrollableFrame das outras janelas
+        self._tag_roda = f"RodaListaPortfolios{id(self)}"
+        self.canvas.bind_class(self._tag_roda, "<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind_class(self._tag_roda, "<Button-4>", lambda event: self._rolar(-1))
+        self.canvas.bind_class(self._tag_roda, "<Button-5>", lambda event: self._rolar(1))
+        self._aplicar_tag_roda(self.canvas)
+        
+        self.empty_label = ctk.CTkLabel(
+            list_frame,
+            text="Nenhum portfólio registrado ainda.\nCrie seu primeiro portfólio!",
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        )
+        
+        bottom_frame = ctk.CTkFrame(self, fg_color="transparent")
+        bottom_frame.grid(row=3, column=0, padx=20, pady=(0, 20))
         
         # Botão voltar
         self.back_button = ctk.CTkButton(
-            self, 
+            bottom_frame, 
             text="Voltar ao Início", 
             command=lambda: controller.show_frame("WelcomeFrame"),
             height=40,
             width=200,
             fg_color="gray"
         )
-        self.back_button.grid(row=2, column=0, padx=20, pady=(0, 20))
+        self.back_button.grid(row=0, column=0, padx=(0, 10))
+        
+        # Dashboard com as estatísticas de habilidades de todo o registro
+        self.analise_button = ctk.CTkButton(
+            bottom_frame,
+            text="📊 Análise do Registro",
+            command=self._gerar_analise,
+            height=40,
+            width=200
+        )
+        self.analise_button.grid(row=0, column=1)
         
     def update_data(self):
-        """Atualiza a lista de portfólios ao exibir a tela."""
-        # Limpa a lista atual
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Atualiza a lista de portfólios ao exibir a tela (mantendo a busca e a posição de rolagem)."""
+        if self.portfolios:
+            self._posicao_scroll = self.canvas.yview()[0]
         
         # Cria diretório de gráficos se não existir
-        if not os.path.exists("uploads/charts"):
-            os.makedirs("uploads/charts")
+        if not os.path.exists(CHARTS_DIR):
+            os.makedirs(CHARTS_DIR)
+        
+        self._aplicar_busca(manter_scroll=True)
+    
+    def _agendar_busca(self):
+        """Espera o usuário parar de digitar antes de buscar."""
+        if self._busca_after_id is not None:
+            self.after_cancel(self._busca_after_id)
+        self._busca_after_id = self.after(self.busca_delay_ms, self._aplicar_busca)
+    
+    def _aplicar_busca(self, manter_scroll=False):
+        """Consulta o índice com o texto, a habilidade e a ordenação escolhidos e redesenha a lista."""
+        self._busca_after_id = None
+        if indice_pronto() is None:
+            self._aguardar_indice(manter_scroll)
+            return
+        texto = self.search_entry.get()
+        skill = self._facetas.get(self.skill_menu.get())
+        ordenacao = self.ordenacoes.get(self.sort_menu.get(), "recentes")
+        
+        self.portfolios, facetas = self._load_portfolios(texto, [skill] if skill else None, ordenacao)
+        self._atualizar_facetas(texto, skill, facetas)
+        
+        total = len(self.portfolios)
+        self.result_label.configure(text=f"{total} portfólio{'s' if total != 1 else ''}")
         
-        portfolios = self._load_portfolios()
+        if not manter_scroll:
+            self._posicao_scroll = 0.0
         
-        if not portfolios:
-            empty_label = ctk.CTkLabel(
-                self.scrollable_frame,
-                text="Nenhum portfólio registrado ainda.\nCrie seu primeiro portfólio!",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
+        # Devolve todos os cards ao pool: o conteúdo pode ter mudado
+        for indice in list(self._cards_visiveis):
+            self._liberar_card(indice)
+        
+        if not self.portfolios:
+            filtrando = bool(texto.strip() or skill)
+            self.empty_label.configure(
+                text="Nenhum portfólio encontrado para esta busca." if filtrando
+                else "Nenhum portfólio registrado ainda.\nCrie seu primeiro portfólio!"
             )
-            empty_label.grid(row=0, column=0, pady=50)
+            self.empty_label.grid(row=0, column=0, pady=50)
         else:
-            for idx, portfolio in enumerate(portfolios):
-                self._create_portfolio_card(portfolio, idx)
-    
-    def _create_portfolio_card(self, portfolio, index):
-        """Cria um card para cada portfólio."""
-        card = ctk.CTkFrame(self.scrollable_frame, fg_color="#f0f0f0", corner_radius=10)
-        card.grid(row=index, column=0, sticky="ew", padx=10, pady=10)
-        card.grid_columnconfigure(0, weight=1)
+            self.empty_label.grid_remove()
         
-        # Nome
-        name_label = ctk.CTkLabel(
-            card,
-            text=portfolio.get("nome", "Sem nome"),
-            font=ctk.CTkFont(size=18, weight="bold"),
-            text_color="#000000",
-            anchor="w"
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.portfolios) * self._altura_card()))
+        self.canvas.yview_moveto(self._posicao_scroll)
+        self._atualizar_viewport()
+    
+    def _aguardar_indice(self, manter_scroll):
+        """Primeira abertura: o índice é montado fora da thread do Tk e a lista aparece quando ficar pronto."""
+        self.result_label.configure(text="")
+        self.empty_label.configure(text="Carregando portfólios...")
+        self.empty_label.grid(row=0, column=0, pady=50)
+        if self._aguardando_indice:
+            return
+        self._aguardando_indice = True
+        obter_indice_async(
+            lambda indice, erro: self.after(0, lambda: self._indice_pronto(erro, manter_scroll))
         )
-        name_label.grid(row=0, column=0, sticky="w", padx=15, pady=(15, 5))
+    
+    def _indice_pronto(self, erro, manter_scroll):
+        self._aguardando_indice = False
+        if erro is not None:
+            print(f"Erro ao carregar portfólios: {erro}")
+            self.empty_label.configure(text="Erro ao carregar os portfólios.")
+            return
+        self._aplicar_busca(manter_scroll)
+    
+    def _atualizar_facetas(self, texto, skill, facetas):
+        """Menu de habilidades com as contagens do resultado atual do texto buscado."""
+        if skill is not None:
+            return # Com uma habilidade escolhida o menu fica como está, para poder trocar
+        self._facetas = {f"{rotulo} ({quantidade})": rotulo for rotulo, quantidade in facetas}
+        self.skill_menu.configure(values=[self.todas_habilidades] + list(self._facetas))
+        self.skill_menu.set(self.todas_habilidades)
+    
+    def _altura_card(self):
+        """Altura do card em pixels reais (considera o fator de escala do customtkinter)."""
+        return int(ALTURA_CARD * self._get_widget_scaling())
+    
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._atualizar_viewport()
+    
+    def _aplicar_tag_roda(self, widget):
+        """Acrescenta a bindtag da roda do mouse ao widget e a todos os filhos dele."""
+        tags = widget.bindtags()
+        if self._tag_roda not in tags:
+            widget.bindtags((tags[0], self._tag_roda) + tags[1:])
+        for filho in widget.winfo_children():
+            self._aplicar_tag_roda(filho)
+    
+    def _on_mousewheel(self, event):
+        self._rolar(-1 if event.delta > 0 else 1)
+    
+    def _rolar(self, direcao):
+        if self.portfolios:
+            self.canvas.yview_scroll(direcao * 3, "units")
+            self._atualizar_viewport()
+    
+    def _atualizar_viewport(self, redimensionar=False):
+        """Materializa os cards da área visível (+ margem) e recicla os que saíram dela."""
+        altura_card = self._altura_card()
+        largura = max(self.canvas.winfo_width() - 20, 100)
+        self.canvas.configure(yscrollincrement=max(altura_card // 10, 1))
         
-        # Título profissional
-        title_label = ctk.CTkLabel(
-            card,
-            text=portfolio.get("titulo", "Sem título"),
-            font=ctk.CTkFont(size=14),
-            text_color="#333333",
-            anchor="w"
-        )
-        title_label.grid(row=1, column=0, sticky="w", padx=15, pady=(0, 5))
+        if not self.portfolios:
+            return
         
-        # Email
-        email_label = ctk.CTkLabel(
-            card,
-            text=f"📧 {portfolio.get('email', 'Sem email')}",
-            font=ctk.CTkFont(size=12),
-            text_color="#1a1a1a",
-            anchor="w"
+        topo = self.canvas.canvasy(0)
+        base = topo + self.canvas.winfo_height()
+        visivel_inicio = int(topo // altura_card)
+        visivel_fim = int(base // altura_card)
+        primeiro = max(0, visivel_inicio - MARGEM_CARDS)
+        ultimo = min(len(self.portfolios) - 1, visivel_fim + MARGEM_CARDS)
+        self._faixa_visivel = (primeiro, ultimo)
+        
+        # Recicla os cards fora da faixa
+        for indice in list(self._cards_visiveis):
+            if indice < primeiro or indice > ultimo:
+                self._liberar_card(indice)
+        
+        # Materializa os que faltam
+        for indice in range(primeiro, ultimo + 1):
+            card = self._cards_visiveis.get(indice)
+            if card is None:
+                card = self._obter_card()
+                self._preencher_card(card, indice, visivel_inicio <= indice <= visivel_fim)
+                self._cards_visiveis[indice] = card
+                self.canvas.coords(card.window_id, 10, indice * altura_card + 10)
+                self.canvas.itemconfigure(card.window_id, state="normal")
+                redimensionar = True
+            if redimensionar:
+                self.canvas.itemconfigure(card.window_id, width=largura, height=altura_card - 20)
+    
+    def _obter_card(self):
+        """Pega um card do pool ou cria um novo."""
+        if self._cards_livres:
+            return self._cards_livres.pop()
+        card = CardPortfolio(self.canvas, self._load_portfolio, self._mostrar_similares)
+        card.window_id = self.canvas.create_window(10, 0, window=card, anchor="nw", state="hidden")
+        self._aplicar_tag_roda(card)
+        return card
+    
+    def _liberar_card(self, indice):
+        """Oculta o card e devolve ao pool."""
+        card = self._cards_visiveis.pop(indice)
+        self.canvas.itemconfigure(card.window_id, state="hidden")
+        card.indice = None
+        self._cards_livres.append(card)
+    
+    def _preencher_card(self, card, indice, na_tela):
+        """Preenche o card na hora; o gráfico vem da memória ou é pedido ao carregador."""
+        portfolio = self.portfolios[indice]
+        chave = self._dados_grafico(portfolio)
+        imagem = self._imagens.get(chave) if chave else None
+        if imagem is not None:
+            self._imagens.move_to_end(chave)
+        token = card.preencher(portfolio, indice, imagem, carregando=chave is not None and imagem is None)
+        if chave is None or imagem is not None:
+            return
+        
+        # Cards na tela passam na frente dos que estão só na margem
+        prioridade = 0 if na_tela else 1
+        faixa = lambda: self._faixa_visivel[0] <= indice <= self._faixa_visivel[1]
+        self.carregador.pedir(
+            prioridade,
+            lambda: self._carregar_grafico(chave),
+            lambda img, erro: self.after(0, lambda: self._grafico_pronto(card, token, chave, img, erro)),
+            valido=faixa
         )
-        email_label.grid(row=2, column=0, sticky="w", padx=15, pady=(0, 5))
+    
+    def _carregar_grafico(self, chave):
+        """Executado no carregador: gera (ou reaproveita) o arquivo e decodifica a imagem."""
+        categories, values, color = chave
+        chart_path = self.chart_gen.generate_mini_bar_chart(list(categories), list(values), color=color)
+        if not chart_path or not os.path.exists(chart_path):
+            return None
+        with Image.open(chart_path) as img:
+            img.load()
+            return img.copy()
+    
+    def _grafico_pronto(self, card, token, chave, img, erro):
+        """De volta à thread do Tk: cria a CTkImage e troca o placeholder, se o card ainda for o mesmo."""
+        if erro is not None:
+            print(f"Erro ao carregar gráfico: {erro}")
         
-        # Formação
-        formacao = portfolio.get("formacao_curso", "")
-        if formacao:
-            formacao_label = ctk.CTkLabel(
-                card,
-                text=f"🎓 {formacao} - {portfolio.get('formacao_instituicao', '')}",
-                font=ctk.CTkFont(size=11),
-                text_color="#1a1a1a",
-                anchor="w"
-            )
-            formacao_label.grid(row=3, column=0, sticky="w", padx=15, pady=(0, 5))
+        imagem = None
+        if img is not None:
+            imagem = self._imagens.get(chave)
+            if imagem is None:
+                imagem = ctk.CTkImage(light_image=img, dark_image=img, size=TAMANHO_GRAFICO)
+                self._imagens[chave] = imagem
+                while len(self._imagens) > self._max_imagens:
+                    self._imagens.popitem(last=False)
         
-        # Badges de habilidades
-        badges_frame = ctk.CTkFrame(card, fg_color="transparent")
-        badges_frame.grid(row=4, column=0, sticky="w", padx=15, pady=(5, 5))
+        # O card pode ter sido reciclado para outro portfólio enquanto o gráfico carregava
+        if card.token == token:
+            card.mostrar_grafico(imagem)
+    
+    def _mostrar_similares(self, portfolio, n=10):
+        """Abre uma janela com os portfólios mais parecidos (habilidades e título) com o escolhido."""
+        janela = ctk.CTkToplevel(self)
+        janela.title(f"Similares a {portfolio.get('nome', 'Sem nome')}")
+        janela.geometry("560x520")
+        janela.transient(self.winfo_toplevel())
+        janela.grid_columnconfigure(0, weight=1)
+        janela.grid_rowconfigure(1, weight=1)
         
-        skills = []
-        if portfolio.get("habilidades_frontend_list"):
-            skills.extend(portfolio["habilidades_frontend_list"][:3])
-        if portfolio.get("habilidades_backend_list"):
-            skills.extend(portfolio["habilidades_backend_list"][:2])
+        ctk.CTkLabel(
+            janela,
+            text=f"🔎 Parecidos com {portfolio.get('nome', 'Sem nome')}",
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).grid(row=0, column=0, padx=20, pady=(20, 10), sticky="w")
         
-        for i, skill in enumerate(skills[:5]):
-            badge = ctk.CTkLabel(
-                badges_frame,
-                text=skill,
-                font=ctk.CTkFont(size=9),
-                fg_color="#3498db",
-                text_color="white",
-                corner_radius=5,
-                padx=6,
-                pady=2
-            )
-            badge.grid(row=0, column=i, padx=2)
+        lista = ctk.CTkScrollableFrame(janela)
+        lista.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
+        lista.grid_columnconfigure(0, weight=1)
+        status = ctk.CTkLabel(lista, text="Buscando...", text_color="gray")
+        status.grid(row=0, column=0, pady=20)
         
-        # Mini gráfico de habilidades (matplotlib)
-        chart_path = self._generate_skills_chart(portfolio)
-        if chart_path and os.path.exists(chart_path):
+        def tarefa():
+            # Na primeira consulta o motor é montado a partir do registro: fora da thread do Tk
             try:
-                img = Image.open(chart_path)
-                ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(200, 130))
-                chart_label = ctk.CTkLabel(card, image=ctk_img, text="")
-                chart_label.grid(row=5, column=0, sticky="w", padx=15, pady=(8, 8))
+                from similaridade import obter_motor_similaridade
+                resultados, erro = obter_motor_similaridade().similares(portfolio, n), None
             except Exception as e:
-                print(f"Erro ao carregar gráfico: {e}")
+                resultados, erro = [], str(e)
+            self.after(0, lambda: preencher(resultados, erro))
         
-        # Data de criação
-        date_label = ctk.CTkLabel(
-            card,
-            text=f"📅 {portfolio.get('data_criacao', 'Data desconhecida')}",
-            font=ctk.CTkFont(size=10),
-            text_color="gray",
-            anchor="w"
-        )
-        date_label.grid(row=6, column=0, sticky="w", padx=15, pady=(0, 15))
+        def preencher(resultados, erro):
+            if not janela.winfo_exists():
+                return
+            if erro:
+                print(f"Erro ao buscar similares: {erro}")
+                status.configure(text="Não foi possível buscar os similares.")
+                return
+            if not resultados:
+                status.configure(text="Nenhum portfólio parecido encontrado.")
+                return
+            status.destroy()
+            for linha, (similar, pontuacao) in enumerate(resultados):
+                item = ctk.CTkFrame(lista, fg_color="#f0f0f0", corner_radius=8)
+                item.grid(row=linha, column=0, sticky="ew", pady=4)
+                item.grid_columnconfigure(0, weight=1)
+                ctk.CTkLabel(
+                    item,
+                    text=f"{similar.get('nome', 'Sem nome')} — {similar.get('titulo', 'Sem título')}",
+                    font=ctk.CTkFont(size=13, weight="bold"),
+                    text_color="#000000",
+                    anchor="w"
+                ).grid(row=0, column=0, sticky="w", padx=10, pady=(8, 0))
+                ctk.CTkLabel(
+                    item,
+                    text=f"{pontuacao * 100:.0f}% de semelhança",
+                    font=ctk.CTkFont(size=11),
+                    text_color="gray",
+                    anchor="w"
+                ).grid(row=1, column=0, sticky="w", padx=10, pady=(0, 8))
+                ctk.CTkButton(
+                    item,
+                    text="Carregar",
+                    width=90,
+                    height=28,
+                    command=lambda p=similar: (janela.destroy(), self._load_portfolio(p))
+                ).grid(row=0, column=1, rowspan=2, padx=10)
         
-        # Botão carregar
-        load_button = ctk.CTkButton(
-            card,
-            text="Carregar",
-            width=100,
-            height=30,
-            command=lambda portfolio=portfolio: self._load_portfolio(portfolio)
-        )
-        load_button.grid(row=0, column=1, rowspan=7, padx=15, pady=15)
+        threading.Thread(target=tarefa, daemon=True).start()
+    
+    def _gerar_analise(self):
+        """Gera (ou reaproveita, se o registro não mudou) o dashboard do registro em background e abre o PDF."""
+        self.analise_button.configure(state="disabled", text="Gerando análise...")
+        
+        def tarefa():
+            try:
+                import analise_registro # Import sob demanda: carrega NumPy/matplotlib só aqui
+                caminho = analise_registro.gerar_relatorio(formato="pdf")
+                erro = None if caminho else "não foi possível gerar o dashboard"
+            except Exception as e:
+                caminho, erro = None, str(e)
+            self.after(0, lambda: self._analise_pronta(caminho, erro))
+        
+        threading.Thread(target=tarefa, daemon=True).start()
+    
+    def _analise_pronta(self, caminho, erro):
+        self.analise_button.configure(state="normal", text="📊 Análise do Registro")
+        if erro:
+            print(f"Erro ao gerar análise do registro: {erro}")
+            return
+        webbrowser.open(caminho)
     
     def _load_portfolio(self, portfolio):
         """Carrega um portfólio selecionado."""
+        # Cópia: o formulário edita os dados sem alterar o que está no índice da lista
+        portfolio = copy.deepcopy(portfolio)
         # Salva no JSON para que o formulário carregue
         import json
         try:
@@ -184,23 +663,19 @@ class ListaPortfolios(ctk.CTkFrame):
             self.controller.set_design_config(portfolio["design_config"])
         
         # Recarrega o formulário
-        self.controller.frames["FormsFrame"]._load_data()
+        self.controller.get_frame("FormsFrame")._load_data()
         self.controller.show_frame("FormsFrame")
     
-    def _load_portfolios(self):
-        """Carrega a lista de portfólios do arquivo JSON."""
-        if not os.path.exists(self.portfolios_file):
-            return []
-        
+    def _load_portfolios(self, texto="", skills=None, ordenacao="recentes"):
+        """Carrega os portfólios (e as facetas) pelo índice de busca; só chamado com o índice já pronto."""
         try:
-            with open(self.portfolios_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return obter_indice().buscar(texto, skills, ordenacao)
         except Exception as e:
             print(f"Erro ao carregar portfólios: {e}")
-            return []
+            return [], []
     
-    def _generate_skills_chart(self, portfolio):
-        """Gera um mini gráfico de habilidades para o card."""
+    def _dados_grafico(self, portfolio):
+        """(categorias, valores, cor) do mini gráfico do card, ou None se não houver habilidades."""
         frontend = len(portfolio.get("habilidades_frontend_list", []))
         backend = len(portfolio.get("habilidades_backend_list", []))
         soft = len(portfolio.get("habilidades_soft_list", []))
@@ -221,47 +696,23 @@ class ListaPortfolios(ctk.CTkFrame):
             categories.append("Soft")
             values.append(soft)
         
-        # Gera nome único baseado no email
-        email_hash = hashlib.md5(portfolio.get("email", "default").encode()).hexdigest()[:8]
-        filename = f"mini_chart_{email_hash}.png"
-        
         color = portfolio.get("design_config", {}).get("cor_principal", "#3498db")
-        return self.chart_gen.generate_mini_bar_chart(categories, values, filename, color)
+        return tuple(categories), tuple(values), color
     
     @staticmethod
     def save_portfolio(portfolio_data, design_config):
-        """Salva um portfólio na lista geral."""
-        portfolios_file = "portfolios_registrados.json"
-        
-        # Carrega portfólios existentes
-        if os.path.exists(portfolios_file):
-            try:
-                with open(portfolios_file, "r", encoding="utf-8") as f:
-                    portfolios = json.load(f)
-            except:
-                portfolios = []
-        else:
-            portfolios = []
-        
+        """Salva um portfólio na lista geral (upsert pelo email no registro)."""
         # Adiciona data de criação
         portfolio_data["data_criacao"] = datetime.now().strftime("%d/%m/%Y %H:%M")
         portfolio_data["design_config"] = design_config
         
-        # Verifica se já existe (por email) e atualiza, senão adiciona
-        email = portfolio_data.get("email")
-        found = False
-        for i, p in enumerate(portfolios):
-            if p.get("email") == email:
-                portfolios[i] = portfolio_data
-                found = True
-                break
-        
-        if not found:
-            portfolios.append(portfolio_data)
-        
-        # Salva
         try:
-            with open(portfolios_file, "w", encoding="utf-8") as f:
-                json.dump(portfolios, f, ensure_ascii=False, indent=4)
+            obter_registro().salvar(portfolio_data)
+            atualizar_indice(portfolio_data)
+            # O motor de similaridade só existe depois que a janela de similares o usou, e então o
+            # módulo já está carregado; antes disso não há o que atualizar e o NumPy não é importado
+            similaridade = sys.modules.get("similaridade")
+            if similaridade is not None:
+                similaridade.atualizar_similaridade(portfolio_data)
         except Exception as e:
             print(f"Erro ao salvar portfólio na lista: {e}")
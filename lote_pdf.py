@@ -0,0 +1,148 @@
+#modo lote: gera o PDF de todos os portfólios registrados (ou de um subconjunto) sem abrir a interface
+#rode o comando: python lote_pdf.py --workers 4
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Garante que os outros módulos possam ser importados
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Mesmo ajuste do main.py para o WeasyPrint encontrar o GTK3 no Windows
+gtk3_path = r"C:\Program Files\GTK3-Runtime Win64\bin"
+if os.path.exists(gtk3_path):
+    os.environ['PATH'] = gtk3_path + os.pathsep + os.environ['PATH']
+
+from modelo import DESIGN_PADRAO
+
+
+def nome_arquivo_saida(portfolio):
+    """Gera um nome de arquivo único e legível para cada portfólio (nome + hash do email)."""
+    nome = unicodedata.normalize("NFKD", portfolio.get("nome") or "sem_nome")
+    nome = nome.encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", nome).strip("_").lower() or "sem_nome"
+    email_hash = hashlib.md5((portfolio.get("email") or "default").encode()).hexdigest()[:8]
+    return f"portfolio_{slug}_{email_hash}.pdf"
+
+
+def carregar_portfolios(caminho):
+    """Lê a lista de portfólios registrados (registro SQLite ou um JSON exportado)."""
+    if caminho.lower().endswith(".json"):
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    from registro import abrir_registro
+    registro = abrir_registro(caminho)
+    try:
+        return registro.listar()
+    finally:
+        registro.fechar()
+
+
+def filtrar_portfolios(portfolios, emails=None, filtro=None):
+    """Seleciona apenas os portfólios pedidos (por email exato ou texto no nome/título)."""
+    selecionados = []
+    for portfolio in portfolios:
+        if emails and portfolio.get("email") not in emails:
+            continue
+        if filtro:
+            texto = f"{portfolio.get('nome', '')} {portfolio.get('titulo', '')}".lower()
+            if filtro.lower() not in texto:
+                continue
+        selecionados.append(portfolio)
+    return selecionados
+
+
+def _renderizar_portfolio(indice, portfolio, saida_dir):
+    """
+    Tarefa executada em cada processo do pool.
+    Retorna (indice, nome, caminho, erro, segundos) para o resumo final.
+    """
+    # Import local: cada processo carrega o pipeline uma única vez
+    import motor_pdf
+
+    inicio = time.perf_counter()
+    nome = portfolio.get("nome", "Sem nome")
+    try:
+        design = dict(DESIGN_PADRAO)
+        design.update(portfolio.get("design_config") or {})
+
+        # Gráficos e fotos reduzidas são nomeados pelo conteúdo (escrita atômica): os processos não colidem
+        destino = os.path.join(saida_dir, nome_arquivo_saida(portfolio))
+        motor_pdf.gerar_pdf(portfolio, design, destino)
+        return indice, nome, destino, None, time.perf_counter() - inicio
+    except Exception as e:
+        return indice, nome, None, str(e), time.perf_counter() - inicio
+
+
+def executar_lote(portfolios, saida_dir, workers):
+    """Distribui os portfólios entre os processos e imprime o progresso."""
+    if not os.path.exists(saida_dir):
+        os.makedirs(saida_dir)
+
+    resultados = []
+    total = len(portfolios)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [
+            pool.submit(_renderizar_portfolio, indice, portfolio, saida_dir)
+            for indice, portfolio in enumerate(portfolios)
+        ]
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            resultado = futuro.result()
+            resultados.append(resultado)
+            _, nome, caminho, erro, segundos = resultado
+            status = f"OK   {caminho}" if erro is None else f"ERRO {erro}"
+            print(f"[{concluidos}/{total}] {nome} ({segundos:.2f}s) {status}")
+
+    return sorted(resultados)
+
+
+def imprimir_resumo(resultados, tempo_total, workers):
+    """Resumo de vazão e falhas do lote."""
+    falhas = [r for r in resultados if r[3] is not None]
+    sucesso = len(resultados) - len(falhas)
+    tempos = [r[4] for r in resultados]
+
+    print("\n--- Resumo do lote ---")
+    print(f"Processos: {workers}")
+    print(f"Portfólios: {len(resultados)} | Sucesso: {sucesso} | Falhas: {len(falhas)}")
+    print(f"Tempo total: {tempo_total:.2f}s")
+    if resultados and tempo_total > 0:
+        print(f"Vazão: {len(resultados) / tempo_total:.2f} portfólios/s")
+        print(f"Tempo médio por portfólio: {sum(tempos) / len(tempos):.2f}s (máx {max(tempos):.2f}s)")
+    for _, nome, _, erro, _ in falhas:
+        print(f"  Falha em '{nome}': {erro}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os PDFs dos portfólios registrados em lote.")
+    parser.add_argument("--registro", default="portfolios_registrados.db",
+                        help="Registro SQLite (ou um JSON exportado) com os portfólios.")
+    parser.add_argument("--saida", default=os.path.join("output", "lote"),
+                        help="Pasta onde os PDFs serão salvos.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Número de processos em paralelo.")
+    parser.add_argument("--email", action="append", dest="emails",
+                        help="Gera apenas o portfólio com este email (pode repetir).")
+    parser.add_argument("--filtro", help="Gera apenas portfólios cujo nome ou título contém o texto.")
+    args = parser.parse_args()
+
+    portfolios = filtrar_portfolios(carregar_portfolios(args.registro), args.emails, args.filtro)
+    if not portfolios:
+        print("Nenhum portfólio encontrado com os filtros informados.")
+        return 0
+
+    workers = max(1, min(args.workers, len(portfolios)))
+    inicio = time.perf_counter()
+    resultados = executar_lote(portfolios, args.saida, workers)
+    imprimir_resumo(resultados, time.perf_counter() - inicio, workers)
+
+    return 1 if any(r[3] is not None for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,42 @@
-import customtkinter as ctk
+import time
+_INICIO = time.perf_counter() # Referência para o relatório de inicialização
 import os
 import sys
 
 # Garante que os outros módulos possam ser importados
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+_t0 = time.perf_counter()
+from tempo_inicializacao import RelatorioInicializacao
+
+relatorio_inicializacao = RelatorioInicializacao(
+    inicio=_INICIO,
+    ativo="--tempo-inicializacao" in sys.argv or os.environ.get("PORTFOLIO_TEMPO_INICIALIZACAO") == "1"
+)
+relatorio_inicializacao.registrar_import("tempo_inicializacao", time.perf_counter() - _t0)
+
+# Cada import do topo passa antes pelo relatório (que mede e guarda o módulo em sys.modules);
+# o import normal logo abaixo só pega o módulo já carregado
+relatorio_inicializacao.importar("customtkinter")
+import customtkinter as ctk
+
 # Adicionando  o caminho do GTK3 ao PATH para o WeasyPrint funcionar no Windows (No meu não funcionou sem...)
 gtk3_path = r"C:\Program Files\GTK3-Runtime Win64\bin"
 if os.path.exists(gtk3_path):
     os.environ['PATH'] = gtk3_path + os.pathsep + os.environ['PATH']
 
-from forms import PortfolioForms
-from personaliza import PortfolioPersonalizacao
-from gerar_pdf import PortfolioPDFGenerator
-from lista_portfolios import ListaPortfolios
+relatorio_inicializacao.importar("agendador_render")
+relatorio_inicializacao.importar("modelo")
+from agendador_render import AgendadorRenderizacao
+from modelo import DESIGN_PADRAO
+
+# As telas (e as bibliotecas pesadas que elas usam) só são importadas na primeira exibição
+TELAS = {
+    "FormsFrame": ("forms", "PortfolioForms"),
+    "PersonalizacaoFrame": ("personaliza", "PortfolioPersonalizacao"),
+    "PDFGeneratorFrame": ("gerar_pdf", "PortfolioPDFGenerator"),
+    "ListaPortfoliosFrame": ("lista_portfolios", "ListaPortfolios"),
+}
 
 # Configura o tema do customtkinter
 ctk.set_appearance_mode("System")  # Ou "Dark", "Light"
@@ -50,46 +73,44 @@ class App(ctk.CTk):
         
         # Variável para armazenar os dados coletados e configurações de design
         self.portfolio_data = {}
-        self.design_config = {"cor_principal": "#3498db", "cor_secundaria": "#ecf0f1"}
-
-        # Adiciona todas as telas à estrutura de frames
-        self._add_frames()
+        self.design_config = dict(DESIGN_PADRAO)
         
-        # Mostra a tela inicial
-        self.show_frame("WelcomeFrame")
-
-    def _add_frames(self):
-        """Inicializa e armazena todas as telas da aplicação."""
-        
-        # Tela de Boas-vindas
-        self.frames["WelcomeFrame"] = WelcomeFrame(master=self, controller=self)
-        self.frames["WelcomeFrame"].grid(row=0, column=0, sticky="nsew")
-
-        # Tela de Formulário
-        self.frames["FormsFrame"] = PortfolioForms(master=self, controller=self)
-        self.frames["FormsFrame"].grid(row=0, column=0, sticky="nsew")
+        # Fila única de renderizações (previews e PDFs finais) compartilhada pelas telas
+        self.agendador_render = AgendadorRenderizacao()
 
-        # Tela de Personalização
-        self.frames["PersonalizacaoFrame"] = PortfolioPersonalizacao(master=self, controller=self)
-        self.frames["PersonalizacaoFrame"].grid(row=0, column=0, sticky="nsew")
-
-        # Tela de Geração de PDF
-        self.frames["PDFGeneratorFrame"] = PortfolioPDFGenerator(master=self, controller=self)
-        self.frames["PDFGeneratorFrame"].grid(row=0, column=0, sticky="nsew")
-        
-        # Tela de Lista de Portfólios
-        self.frames["ListaPortfoliosFrame"] = ListaPortfolios(master=self, controller=self)
-        self.frames["ListaPortfoliosFrame"].grid(row=0, column=0, sticky="nsew")
+        # As telas são criadas sob demanda (get_frame); só a inicial é criada agora
+        self.show_frame("WelcomeFrame")
+        relatorio_inicializacao.marcar("tela_inicial_criada")
+        self.after_idle(self._primeira_pintura)
+
+    def _primeira_pintura(self):
+        """Chamado quando o loop de eventos fica ocioso pela primeira vez (janela desenhada)."""
+        relatorio_inicializacao.marcar("primeira_pintura")
+        relatorio_inicializacao.imprimir()
+
+    def get_frame(self, page_name):
+        """Retorna a tela, criando-a (e importando seu módulo) no primeiro acesso."""
+        if page_name not in self.frames:
+            t0 = time.perf_counter()
+            if page_name == "WelcomeFrame":
+                classe = WelcomeFrame
+            else:
+                nome_modulo, nome_classe = TELAS[page_name]
+                classe = getattr(relatorio_inicializacao.importar(nome_modulo), nome_classe)
+            t_import = time.perf_counter() - t0
+            frame = classe(master=self, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+            relatorio_inicializacao.registrar_tela(page_name, t_import, time.perf_counter() - t0)
+        return self.frames[page_name]
 
     def show_frame(self, page_name):
         """Traz a tela solicitada para o topo."""
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
         frame.tkraise()
         # Atualiza o conteúdo da tela se necessário
-        if page_name == "PDFGeneratorFrame":
-            self.frames["PDFGeneratorFrame"].update_data()
-        elif page_name == "ListaPortfoliosFrame":
-            self.frames["ListaPortfoliosFrame"].update_data()
+        if page_name in ("PDFGeneratorFrame", "ListaPortfoliosFrame"):
+            frame.update_data()
         
     def set_portfolio_data(self, data):
         """Atualiza os dados do portfólio."""
@@ -0,0 +1,258 @@
+#modelo compacto dos portfólios registrados (esquema versionado)
+#converter um JSON antigo: python modelo.py portfolios_registrados.json portfolios_compactos.json
+import json
+import re
+import sys
+
+VERSAO_ESQUEMA = 2
+
+CAMPOS_TEXTO = ("nome", "titulo", "bio", "telefone", "email", "local", "linkedin", "instagram")
+CAMPOS_HABILIDADES = ("habilidades_frontend", "habilidades_backend", "habilidades_soft")
+
+# Cores do PDF quando o usuário não personaliza (App, importação, modo lote e benchmark)
+DESIGN_PADRAO = {"cor_principal": "#3498db", "cor_secundaria": "#ecf0f1"}
+
+# Campos que não são dados do usuário: recalculados pelo pipeline a cada PDF (caminhos
+# locais da máquina que gerou) ou cópias achatadas das listas
+CAMPOS_DERIVADOS = {"processed_img_path", "radar_chart_path", "radar_chart_svg", "radar_values", "css_pre_carregado"}
+CAMPO_ACHATADO = re.compile(r"^(formacao|exp)_([a-z]+)_(\d+)$")
+
+# Chaves curtas da serialização compacta
+CHAVES_CURTAS = {
+    "nome": "n", "titulo": "t", "bio": "b", "telefone": "tel", "email": "m",
+    "local": "l", "linkedin": "li", "instagram": "ig",
+}
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor)
+
+
+def dividir_habilidades(texto):
+    """'HTML5, CSS3, React' -> ['HTML5', 'CSS3', 'React'] (itens vazios são ignorados)."""
+    return [item.strip() for item in _texto(texto).split(",") if item.strip()]
+
+
+def adicionar_listas_habilidades(dados):
+    """Cria as listas habilidades_*_list a partir dos textos separados por vírgula (formulário e importação)."""
+    for chave in CAMPOS_HABILIDADES:
+        dados[f"{chave}_list"] = dividir_habilidades(dados.get(chave))
+    return dados
+
+
+def normalizar_url(url):
+    """'linkedin.com/in/x' -> 'https://linkedin.com/in/x' (o formulário aceita o domínio sem esquema)."""
+    if url and not url.startswith(("http://", "https://")):
+        return f"https://{url}"
+    return url
+
+
+class Formacao:
+    __slots__ = ("curso", "instituicao", "periodo", "descricao")
+
+    def __init__(self, curso="", instituicao="", periodo="", descricao=""):
+        self.curso = curso
+        self.instituicao = instituicao
+        self.periodo = periodo
+        self.descricao = descricao
+
+    def para_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class Experiencia:
+    __slots__ = ("cargo", "empresa", "periodo", "resumo")
+
+    def __init__(self, cargo="", empresa="", periodo="", resumo=""):
+        self.cargo = cargo
+        self.empresa = empresa
+        self.periodo = periodo
+        self.resumo = resumo
+
+    def para_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+def _blocos(classe, lista):
+    """Lista de dicts (ou de listas na forma compacta) -> tupla de blocos, sem os vazios."""
+    blocos = []
+    for item in lista or ():
+        if isinstance(item, dict):
+            valores = [_texto(item.get(campo)) for campo in classe.__slots__]
+        else:
+            valores = [_texto(v) for v in item] + [""] * (len(classe.__slots__) - len(item))
+        if any(valores):
+            blocos.append(classe(*valores[:len(classe.__slots__)]))
+    return tuple(blocos)
+
+
+def _blocos_achatados(dados, prefixo, campos):
+    """Reconstrói a lista a partir das chaves antigas formacao_curso_0 / exp_cargo_0."""
+    numerados = {}
+    for chave, valor in dados.items():
+        encontrado = CAMPO_ACHATADO.match(chave)
+        if encontrado and encontrado.group(1) == prefixo and encontrado.group(2) in campos:
+            numerados.setdefault(int(encontrado.group(3)), {})[encontrado.group(2)] = valor
+    return [numerados[n] for n in sorted(numerados)]
+
+
+class Portfolio:
+    """
+    Um portfólio registrado, só com os dados do usuário.
+    As habilidades são tuplas de strings internadas (sys.intern): 'Python' repetido em
+    100 mil portfólios ocupa a memória de uma única string. O texto 'habilidades_*' e os
+    campos derivados não são guardados; para_dict() os regenera no formato que o resto
+    do app usa.
+    """
+    __slots__ = CAMPOS_TEXTO + ("photo_path", "formacoes", "experiencias", "habilidades",
+                                "data_criacao", "design_config", "extras")
+
+    def __init__(self):
+        for campo in CAMPOS_TEXTO:
+            setattr(self, campo, "")
+        self.photo_path = None
+        self.formacoes = ()
+        self.experiencias = ()
+        self.habilidades = ((), (), ()) # frontend, backend, soft
+        self.data_criacao = None
+        self.design_config = None
+        self.extras = None # Campos desconhecidos, preservados como vieram
+
+    @classmethod
+    def de_dict(cls, dados):
+        """
+        Cria o modelo a partir de qualquer versão do dicionário de portfólio (migração):
+        prefere as listas, reconstrói das chaves achatadas ou do texto separado por vírgula
+        quando elas faltam e descarta os campos derivados.
+        """
+        modelo = cls()
+        for campo in CAMPOS_TEXTO:
+            setattr(modelo, campo, _texto(dados.get(campo)).strip())
+        modelo.photo_path = dados.get("photo_path") or None
+
+        formacoes = dados.get("formacoes_list")
+        if formacoes is None:
+            formacoes = _blocos_achatados(dados, "formacao", Formacao.__slots__)
+        experiencias = dados.get("experiencias_list")
+        if experiencias is None:
+            experiencias = _blocos_achatados(dados, "exp", Experiencia.__slots__)
+        modelo.formacoes = _blocos(Formacao, formacoes)
+        modelo.experiencias = _blocos(Experiencia, experiencias)
+
+        habilidades = []
+        for chave in CAMPOS_HABILIDADES:
+            lista = dados.get(f"{chave}_list")
+            if lista is None:
+                lista = dividir_habilidades(dados.get(chave))
+            habilidades.append(tuple(sys.intern(str(s).strip()) for s in lista if str(s).strip()))
+        modelo.habilidades = tuple(habilidades)
+
+        modelo.data_criacao = dados.get("data_criacao") or None
+        modelo.design_config = dados.get("design_config") or None
+
+        conhecidos = set(CAMPOS_TEXTO) | {"photo_path", "formacoes_list", "experiencias_list",
+                                          "data_criacao", "design_config"}
+        conhecidos |= set(CAMPOS_HABILIDADES) | {f"{chave}_list" for chave in CAMPOS_HABILIDADES}
+        extras = {
+            chave: valor for chave, valor in dados.items()
+            if chave not in conhecidos and chave not in CAMPOS_DERIVADOS and not CAMPO_ACHATADO.match(chave)
+        }
+        modelo.extras = extras or None
+        return modelo
+
+    def para_dict(self):
+        """Dicionário no formato que o formulário monta em _save_and_next (e que o PDF usa)."""
+        dados = {campo: getattr(self, campo) for campo in CAMPOS_TEXTO}
+        dados["photo_path"] = self.photo_path
+        dados["formacoes_list"] = [f.para_dict() for f in self.formacoes]
+        dados["experiencias_list"] = [e.para_dict() for e in self.experiencias]
+        for chave, lista in zip(CAMPOS_HABILIDADES, self.habilidades):
+            dados[chave] = ", ".join(lista)
+            dados[f"{chave}_list"] = list(lista)
+        if self.data_criacao is not None:
+            dados["data_criacao"] = self.data_criacao
+        if self.design_config is not None:
+            dados["design_config"] = self.design_config
+        if self.extras:
+            dados.update(self.extras)
+        return dados
+
+    def serializar(self):
+        """JSON compacto: chaves curtas, campos vazios omitidos, blocos como listas posicionais."""
+        compacto = {"v": VERSAO_ESQUEMA}
+        for campo, curta in CHAVES_CURTAS.items():
+            valor = getattr(self, campo)
+            if valor:
+                compacto[curta] = valor
+        if self.photo_path:
+            compacto["p"] = self.photo_path
+        if self.formacoes:
+            compacto["f"] = [_sem_vazios_no_fim([getattr(f, c) for c in Formacao.__slots__]) for f in self.formacoes]
+        if self.experiencias:
+            compacto["e"] = [_sem_vazios_no_fim([getattr(e, c) for c in Experiencia.__slots__]) for e in self.experiencias]
+        if any(self.habilidades):
+            compacto["h"] = [list(lista) for lista in self.habilidades]
+        if self.data_criacao:
+            compacto["d"] = self.data_criacao
+        if self.design_config:
+            compacto["c"] = self.design_config
+        if self.extras:
+            compacto["x"] = self.extras
+        return json.dumps(compacto, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def desserializar(cls, texto):
+        """Lê a forma compacta; um JSON em formato antigo é migrado na hora."""
+        dados = json.loads(texto)
+        if dados.get("v") != VERSAO_ESQUEMA:
+            return cls.de_dict(dados)
+
+        modelo = cls()
+        for campo, curta in CHAVES_CURTAS.items():
+            setattr(modelo, campo, dados.get(curta, ""))
+        modelo.photo_path = dados.get("p")
+        modelo.formacoes = _blocos(Formacao, dados.get("f"))
+        modelo.experiencias = _blocos(Experiencia, dados.get("e"))
+        habilidades = dados.get("h") or ([], [], [])
+        modelo.habilidades = tuple(tuple(sys.intern(s) for s in lista) for lista in habilidades)
+        modelo.data_criacao = dados.get("d")
+        modelo.design_config = dados.get("c")
+        modelo.extras = dados.get("x")
+        return modelo
+
+
+def _sem_vazios_no_fim(valores):
+    while valores and not valores[-1]:
+        valores.pop()
+    return valores
+
+
+def compactar(dados):
+    """Dicionário de portfólio (qualquer versão) -> JSON compacto."""
+    return Portfolio.de_dict(dados).serializar()
+
+
+def expandir(texto):
+    """JSON compacto (ou antigo) -> dicionário no formato usado pelo app."""
+    return Portfolio.desserializar(texto).para_dict()
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Uso: python modelo.py <json antigo> <json compacto>")
+        return 1
+    origem, destino = sys.argv[1], sys.argv[2]
+    with open(origem, "r", encoding="utf-8") as f:
+        portfolios = json.load(f)
+    linhas = [compactar(p) for p in portfolios]
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write("[" + ",\n".join(linhas) + "]\n")
+
+    antes = sum(len(json.dumps(p, ensure_ascii=False, indent=4)) for p in portfolios)
+    depois = sum(len(linha) for linha in linhas)
+    print(f"{len(portfolios)} portfólios: {antes} -> {depois} caracteres ({depois / max(antes, 1):.0%} do original)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+import hashlib
+import os
+import pathlib
+import threading
+import time
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
+from PIL import Image
+import fitz # PyMuPDF
+from relatorios import GeradorRelatorios, CHARTS_DIR
+from cache_pdf import obter_cache, hash_arquivo
+from cache_imagens import obter_derivado
+from desempenho import etapa
+from modelo import normalizar_url
+
+# Caminhos absolutos para que o pipeline funcione fora da pasta do projeto (ex: modo lote)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+TEMPLATE_NAME = "portfolio_template.html"
+STYLESHEET_NAME = "style.css"
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+INTERVALO_VERIFICACAO = 2.0 # Segundos entre duas varreduras de templates/ (edição do template aparece nesse prazo)
+
+# "svg" embute os gráficos como vetores no HTML; "png" usa o arquivo rasterizado (200 DPI)
+FORMATO_GRAFICOS = "svg"
+
+
+def processar_imagem(photo_path, target_size=150):
+    """Retorna o derivado reduzido da foto de perfil para uso no template (ou None)."""
+    try:
+        # O recorte em círculo é feito pelo CSS (border-radius: 50%)
+        return obter_derivado(photo_path, target_size)
+    except Exception as e:
+        print(f"Erro ao processar imagem para PDF: {e}")
+        return None
+
+
+def preparar_dados(data, design, chart_gen, checkpoint=None, medicao=None):
+    """
+    Monta uma cópia dos dados pronta para o template (foto processada, URLs e gráficos).
+    O dicionário original não é alterado.
+    checkpoint: função opcional chamada entre as etapas (pode levantar exceção para interromper).
+    medicao: MedicaoRender opcional (desempenho.py) que recebe o tempo de cada etapa.
+    """
+    dados = dict(data)
+
+    # --- 1. Processar a imagem (derivado de 150px em cache, compartilhado entre renderizações) ---
+    with etapa(medicao, "foto"):
+        processed_img_path = processar_imagem(dados.get("photo_path"))
+    if processed_img_path:
+        dados["processed_img_path"] = pathlib.Path(processed_img_path).as_uri()
+    else:
+        dados["processed_img_path"] = None
+
+    if checkpoint: checkpoint()
+
+    # --- 1.5. Sanitizar URLs ---
+    for key in ["linkedin", "instagram"]:
+        dados[key] = normalizar_url(dados.get(key))
+
+    # --- 2. Gerar Gráficos ---
+    # Radar Chart (Equilíbrio)
+    cats = ["Frontend", "Backend", "Soft Skills"]
+    vals = [
+        min(len(dados.get("habilidades_frontend_list", [])) * 20, 100),
+        min(len(dados.get("habilidades_backend_list", [])) * 20, 100),
+        min(len(dados.get("habilidades_soft_list", [])) * 20, 100)
+    ]
+    # Evita gráfico vazio se não tiver skills
+    if sum(vals) == 0: vals = [20, 20, 20]
+
+    with etapa(medicao, "graficos"):
+        if FORMATO_GRAFICOS == "svg":
+            # Vetorial e embutido direto no HTML: sem PNG temporário e nítido em qualquer zoom
+            dados["radar_chart_svg"] = chart_gen.generate_radar_chart(
+                cats, vals, color=design["cor_principal"], formato="svg"
+            )
+            dados["radar_chart_path"] = None
+        else:
+            # Nome pelo hash do conteúdo: processos/threads em paralelo não colidem
+            radar_path = chart_gen.generate_radar_chart(cats, vals, color=design["cor_principal"])
+            if radar_path:
+                dados["radar_chart_path"] = pathlib.Path(radar_path).as_uri()
+            else:
+                dados["radar_chart_path"] = None
+
+    return dados
+
+
+class MotorRenderizacao:
+    """
+    Motor de renderização de longa duração.
+    Compila o template uma única vez (com cache de bytecode em disco), faz o parse do
+    style.css e registra as fontes @font-face uma única vez, e só recarrega quando
+    algum arquivo da pasta templates/ muda (verificado no máximo a cada INTERVALO_VERIFICACAO).
+    O lock cobre só a verificação e a troca dos recursos: cada render pega os recursos
+    atuais e roda o WeasyPrint fora dele, então renders em threads diferentes não se
+    enfileiram; um recarregamento cria uma FontConfiguration nova em vez de mexer na
+    que um render em andamento está usando.
+    """
+    def __init__(self, templates_dir=TEMPLATES_DIR, cache_dir=CACHE_DIR):
+        self.templates_dir = templates_dir
+        self.bytecode_dir = os.path.join(cache_dir, "jinja")
+        if not os.path.exists(self.bytecode_dir):
+            os.makedirs(self.bytecode_dir)
+
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._verificado_em = None # time.monotonic() da última varredura
+        self._versao = None
+        self.env = None
+        self.template = None
+        self.font_config = None
+        self.stylesheet = None
+
+    def _assinatura_templates(self):
+        """Retorna (arquivo, mtime, tamanho) de tudo em templates/ para detectar alterações."""
+        assinatura = []
+        for raiz, _, arquivos in os.walk(self.templates_dir):
+            for nome in sorted(arquivos):
+                caminho = os.path.join(raiz, nome)
+                info = os.stat(caminho)
+                assinatura.append((os.path.relpath(caminho, self.templates_dir), info.st_mtime_ns, info.st_size))
+        return tuple(sorted(assinatura))
+
+    def _carregar(self):
+        """(Re)compila o template e faz o parse do CSS e das fontes."""
+        self.env = Environment(
+            loader=FileSystemLoader(self.templates_dir),
+            bytecode_cache=FileSystemBytecodeCache(self.bytecode_dir),
+            auto_reload=False # A verificação é feita pela assinatura da pasta templates/
+        )
+        self.template = self.env.get_template(TEMPLATE_NAME)
+
+        self.font_config = FontConfiguration()
+        self.stylesheet = CSS(
+            filename=os.path.join(self.templates_dir, STYLESHEET_NAME),
+            font_config=self.font_config
+        )
+
+    def _verificar_templates(self):
+        """Recarrega os recursos apenas se algum arquivo de templates/ mudou (chamado com self._lock)."""
+        agora = time.monotonic()
+        if self._verificado_em is not None and agora - self._verificado_em < INTERVALO_VERIFICACAO:
+            return
+        self._verificado_em = agora
+        assinatura = self._assinatura_templates()
+        if assinatura != self._assinatura:
+            self._carregar()
+            self._versao = self._hash_templates(assinatura)
+            self._assinatura = assinatura
+
+    def _hash_templates(self, assinatura):
+        """Hash do conteúdo de template, CSS e fontes (versão usada na chave do cache de PDFs)."""
+        h = hashlib.sha256()
+        for relativo, _, _ in assinatura:
+            h.update(relativo.encode("utf-8"))
+            h.update(hash_arquivo(os.path.join(self.templates_dir, relativo)).encode("ascii"))
+        return h.hexdigest()
+
+    def versao_templates(self):
+        """Versão atual dos arquivos de templates/."""
+        with self._lock:
+            self._verificar_templates()
+            return self._versao
+
+    def renderizar_html(self, dados, design):
+        """Renderiza o template já compilado. O CSS é aplicado direto no WeasyPrint."""
+        with self._lock:
+            self._verificar_templates()
+            template = self.template
+        return template.render(dados=dados, design=design, css_pre_carregado=True)
+
+    def escrever_pdf(self, html_output, target_path=None):
+        """
+        Converte o HTML em PDF reaproveitando a folha de estilo e as fontes já carregadas.
+        Sem target_path, retorna os bytes do PDF (nada é escrito em disco).
+        """
+        with self._lock:
+            self._verificar_templates()
+            stylesheet, font_config = self.stylesheet, self.font_config
+        return HTML(string=html_output, base_url=self.templates_dir).write_pdf(
+            target_path,
+            stylesheets=[stylesheet],
+            font_config=font_config
+        )
+
+
+_motor = None
+_motor_lock = threading.Lock()
+
+
+def obter_motor():
+    """Retorna o motor de renderização compartilhado pelo processo."""
+    global _motor
+    with _motor_lock:
+        if _motor is None:
+            _motor = MotorRenderizacao()
+        return _motor
+
+
+def gerar_pdf(data, design, target_path, chart_gen=None, html_path=None, usar_cache=True, checkpoint=None,
+              medicao=None):
+    """
+    Pipeline completo: dados -> HTML (Jinja2) -> PDF (WeasyPrint).
+    Usado tanto pela interface quanto pelo modo lote (lote_pdf.py).
+    Se as entradas já foram renderizadas antes, o PDF é apenas copiado do cache
+    (com html_path, o template ainda é renderizado para gravar o HTML; só o WeasyPrint é evitado).
+    medicao: MedicaoRender opcional que recebe o tempo de cada etapa.
+    Retorna o caminho do PDF gerado.
+    """
+    if chart_gen is None:
+        chart_gen = GeradorRelatorios(output_dir=CHARTS_DIR)
+    motor = obter_motor()
+
+    pasta = os.path.dirname(target_path)
+    if pasta and not os.path.exists(pasta):
+        os.makedirs(pasta)
+
+    chave = None
+    copiado = False
+    if usar_cache:
+        with etapa(medicao, "cache"):
+            cache = obter_cache()
+            chave = cache.chave(data, design, motor.versao_templates())
+            copiado = cache.copiar_para(chave, target_path)
+        if copiado:
+            if medicao: medicao.cache = True
+            if not html_path:
+                return target_path
+
+    dados = preparar_dados(data, design, chart_gen, checkpoint, medicao)
+    if checkpoint: checkpoint()
+    with etapa(medicao, "template"):
+        html_output = motor.renderizar_html(dados, design)
+    if checkpoint: checkpoint()
+
+    # Salva o HTML também (opcional, mas bom para debug)
+    if html_path:
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html_output)
+    if copiado:
+        return target_path
+
+    with etapa(medicao, "weasyprint"):
+        motor.escrever_pdf(html_output, target_path)
+    if chave:
+        with etapa(medicao, "cache"):
+            cache.guardar(chave, target_path)
+    return target_path
+
+
+def gerar_pdf_bytes(data, design, chart_gen=None, usar_cache=True, checkpoint=None, medicao=None):
+    """Mesmo pipeline de gerar_pdf, mas o PDF fica apenas em memória (usado pelo preview)."""
+    if chart_gen is None:
+        chart_gen = GeradorRelatorios(output_dir=CHARTS_DIR)
+    motor = obter_motor()
+
+    chave = None
+    if usar_cache:
+        with etapa(medicao, "cache"):
+            cache = obter_cache()
+            chave = cache.chave(data, design, motor.versao_templates())
+            pdf_bytes = cache.ler(chave)
+        if pdf_bytes:
+            if medicao: medicao.cache = True
+            return pdf_bytes
+
+    dados = preparar_dados(data, design, chart_gen, checkpoint, medicao)
+    if checkpoint: checkpoint()
+    with etapa(medicao, "template"):
+        html_output = motor.renderizar_html(dados, design)
+    if checkpoint: checkpoint()
+    with etapa(medicao, "weasyprint"):
+        pdf_bytes = motor.escrever_pdf(html_output)
+    if chave:
+        with etapa(medicao, "cache"):
+            cache.guardar_bytes(chave, pdf_bytes)
+    return pdf_bytes
+
+
+def rasterizar_pagina(pdf, max_width, max_height, pagina=0):
+    """
+    Rasteriza uma página do PDF (bytes ou caminho) direto no tamanho pedido
+    e devolve uma imagem PIL, sem passar por arquivos PNG intermediários.
+    """
+    if isinstance(pdf, (bytes, bytearray)):
+        doc = fitz.open(stream=pdf, filetype="pdf")
+    else:
+        doc = fitz.open(pdf)
+    try:
+        page = doc.load_page(pagina)
+        escala = min(max_width / page.rect.width, max_height / page.rect.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(escala, escala), alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    finally:
+        doc.close()
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import fitz # PyMuPDF
+from PIL import Image
+
+
+class PaginadorPreview:
+    """
+    Preview de várias páginas com rasterização sob demanda.
+    Cada página só é rasterizada na primeira vez que é pedida, as imagens ficam num
+    cache LRU pequeno e a próxima página pode ser pré-carregada em background.
+    """
+    def __init__(self, pdf_bytes, max_width, max_height, max_cache=4):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_cache = max_cache
+
+        # O documento do PyMuPDF não é thread-safe: todo acesso passa pelo _doc_lock
+        self._doc_lock = threading.Lock()
+        self._doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        self.num_paginas = self._doc.page_count
+
+        self._cache_lock = threading.Lock()
+        self._cache = OrderedDict() # pagina -> imagem PIL
+        self._pendentes = {} # pagina -> Future do pré-carregamento
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def em_cache(self, pagina):
+        """Retorna a imagem da página se já estiver rasterizada (e marca como usada)."""
+        with self._cache_lock:
+            imagem = self._cache.get(pagina)
+            if imagem is not None:
+                self._cache.move_to_end(pagina)
+            return imagem
+
+    def definir(self, pagina, imagem):
+        """Guarda uma imagem já rasterizada no cache, descartando a menos usada se passar do limite."""
+        with self._cache_lock:
+            self._cache[pagina] = imagem
+            self._cache.move_to_end(pagina)
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+
+    def _rasterizar(self, pagina):
+        with self._doc_lock:
+            if self._doc is None:
+                return None
+            page = self._doc.load_page(pagina)
+            escala = min(self.max_width / page.rect.width, self.max_height / page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(escala, escala), alpha=False)
+            return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    def obter(self, pagina):
+        """Retorna a imagem da página, rasterizando agora se necessário (bloqueante)."""
+        imagem = self.em_cache(pagina)
+        if imagem is None:
+            imagem = self._rasterizar(pagina)
+            if imagem is not None:
+                self.definir(pagina, imagem)
+        return imagem
+
+    def obter_async(self, pagina, callback):
+        """Rasteriza em background e chama callback(pagina, imagem) na thread do paginador."""
+        def tarefa():
+            callback(pagina, self.obter(pagina))
+        return self._executor.submit(tarefa)
+
+    def pre_carregar(self, pagina):
+        """Agenda a rasterização da página em background, se ainda não estiver pronta."""
+        if not 0 <= pagina < self.num_paginas or self.em_cache(pagina) is not None:
+            return
+        with self._cache_lock:
+            futuro = self._pendentes.get(pagina)
+            if futuro is not None and not futuro.done():
+                return
+            self._pendentes[pagina] = self._executor.submit(self.obter, pagina)
+
+    def fechar(self):
+        """Libera o documento e as imagens."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._doc_lock:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+        with self._cache_lock:
+            self._cache.clear()
+            self._pendentes.clear()
@@ -0,0 +1,287 @@
+#registro dos portfólios em SQLite (substitui a regravação inteira do portfolios_registrados.json)
+#migrar/exportar manualmente: python registro.py --exportar portfolios.json
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from modelo import Portfolio, VERSAO_ESQUEMA, compactar, expandir
+
+REGISTRO_DB = "portfolios_registrados.db"
+REGISTRO_JSON = "portfolios_registrados.json" # Formato antigo: migrado uma única vez
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    nome TEXT,
+    titulo TEXT,
+    data_criacao TEXT,
+    dados TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolios_email ON portfolios(email);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+UPSERT = """
+INSERT INTO portfolios (email, nome, titulo, data_criacao, dados)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(email) DO UPDATE SET
+    nome = excluded.nome,
+    titulo = excluded.titulo,
+    data_criacao = excluded.data_criacao,
+    dados = excluded.dados
+"""
+
+
+class RegistroPortfolios:
+    """
+    Portfólios registrados, um por email.
+    Cada save é um upsert transacional (O(1) no índice do email); o WAL deixa a lista
+    ser lida enquanto outro save acontece e um crash no meio não corrompe o registro.
+    A ordem da lista é a de inserção: atualizar um portfólio mantém a posição dele.
+    Os dados são gravados no formato compacto do modelo.py (sem campos derivados) e
+    devolvidos como o dicionário que o resto do app usa.
+    """
+    def __init__(self, caminho=REGISTRO_DB):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(ESQUEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def _linha(portfolio):
+        return (
+            portfolio.get("email") or "",
+            portfolio.get("nome"),
+            portfolio.get("titulo"),
+            portfolio.get("data_criacao"),
+            compactar(portfolio),
+        )
+
+    def salvar(self, portfolio):
+        """Insere ou atualiza (pelo email) um portfólio."""
+        with self._lock, self._conn:
+            self._conn.execute(UPSERT, self._linha(portfolio))
+
+    def salvar_varios(self, portfolios):
+        """
+        Upsert de vários portfólios numa única transação. Retorna quantas linhas foram
+        gravadas: emails repetidos na lista caem na mesma linha (vale o último).
+        """
+        emails = set()
+        with self._lock, self._conn:
+            for portfolio in portfolios:
+                linha = self._linha(portfolio)
+                self._conn.execute(UPSERT, linha)
+                emails.add(linha[0])
+        return len(emails)
+
+    def obter(self, email):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT dados FROM portfolios WHERE email = ?", (email or "",)
+            ).fetchone()
+        return expandir(linha[0]) if linha else None
+
+    def listar(self):
+        """Todos os portfólios, na ordem em que foram registrados."""
+        with self._lock:
+            linhas = self._conn.execute("SELECT dados FROM portfolios ORDER BY id").fetchall()
+        return [expandir(dados) for (dados,) in linhas]
+
+    def listar_modelos(self):
+        """Todos os portfólios como objetos Portfolio (bem menores em memória que os dicionários)."""
+        with self._lock:
+            linhas = self._conn.execute("SELECT dados FROM portfolios ORDER BY id").fetchall()
+        return [Portfolio.desserializar(dados) for (dados,) in linhas]
+
+    def iterar(self, tamanho_pagina=500):
+        """Percorre todos os portfólios em páginas (memória constante, sem segurar o lock entre páginas)."""
+        ultimo_id = 0
+        while True:
+            with self._lock:
+                linhas = self._conn.execute(
+                    "SELECT id, dados FROM portfolios WHERE id > ? ORDER BY id LIMIT ?",
+                    (ultimo_id, tamanho_pagina)
+                ).fetchall()
+            if not linhas:
+                return
+            for ultimo_id, dados in linhas:
+                yield expandir(dados)
+
+    def contar(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM portfolios").fetchone()[0]
+
+    def remover(self, email):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM portfolios WHERE email = ?", (email or "",))
+        return cursor.rowcount > 0
+
+    def _meta(self, chave):
+        with self._lock:
+            linha = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def migrar_json(self, caminho_json=REGISTRO_JSON, forcar=False):
+        """
+        Importa o registro antigo em JSON (uma única vez, a menos que forcar=True).
+        O arquivo JSON não é apagado. Retorna quantas linhas foram gravadas (portfólios
+        com o mesmo email no JSON viram uma linha só).
+        """
+        if not forcar and self._meta("migrado_de_json"):
+            return 0
+        if not os.path.exists(caminho_json):
+            return 0
+
+        with open(caminho_json, "r", encoding="utf-8") as f:
+            portfolios = json.load(f)
+
+        emails = set()
+        with self._lock, self._conn:
+            for portfolio in portfolios:
+                linha = self._linha(portfolio)
+                self._conn.execute(UPSERT, linha)
+                emails.add(linha[0])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('migrado_de_json', ?)",
+                (datetime.now().isoformat(timespec="seconds"),)
+            )
+        return len(emails)
+
+    def tamanho_dados(self):
+        """Total de caracteres guardados na coluna de dados (para comparar antes/depois da migração)."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(LENGTH(dados)), 0) FROM portfolios").fetchone()[0]
+
+    def migrar_esquema(self, tamanho_lote=1000, forcar=False):
+        """
+        Regrava no formato compacto as linhas gravadas antes do modelo versionado
+        (remove os campos derivados). Roda uma vez por versão do esquema.
+        Retorna a quantidade de linhas regravadas.
+        """
+        if not forcar and self._meta("versao_esquema") == str(VERSAO_ESQUEMA):
+            return 0
+
+        regravadas = 0
+        ultimo_id = 0
+        while True:
+            with self._lock:
+                linhas = self._conn.execute(
+                    "SELECT id, dados FROM portfolios WHERE id > ? ORDER BY id LIMIT ?",
+                    (ultimo_id, tamanho_lote)
+                ).fetchall()
+            if not linhas:
+                break
+            ultimo_id = linhas[-1][0]
+            novas = [(Portfolio.desserializar(dados).serializar(), id_linha) for id_linha, dados in linhas]
+            novas = [(dados, id_linha) for (dados, id_linha), (_, antigo) in zip(novas, linhas) if dados != antigo]
+            if novas:
+                with self._lock, self._conn:
+                    self._conn.executemany("UPDATE portfolios SET dados = ? WHERE id = ?", novas)
+                regravadas += len(novas)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('versao_esquema', ?)", (str(VERSAO_ESQUEMA),)
+            )
+        return regravadas
+
+    def exportar_json(self, caminho_json):
+        """Grava todos os portfólios num JSON no formato antigo (escrita atômica)."""
+        portfolios = self.listar()
+        pasta = os.path.dirname(os.path.abspath(caminho_json))
+        fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(portfolios, f, ensure_ascii=False, indent=4)
+            os.replace(temporario, caminho_json)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        return len(portfolios)
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def obter_registro():
+    """Registro compartilhado pelo processo; na primeira abertura migra o JSON antigo, se existir."""
+    global _registro
+    with _registro_lock:
+        if _registro is None:
+            _registro = RegistroPortfolios()
+            executar_migracoes(_registro)
+    return _registro
+
+
+def abrir_registro(caminho=REGISTRO_DB):
+    """
+    Abre um registro avulso (usado pelas ferramentas de linha de comando). Se for o banco
+    do app, roda antes as mesmas migrações do obter_registro: num checkout que só tem o
+    JSON antigo, o banco novo viria vazio.
+    """
+    registro = RegistroPortfolios(caminho)
+    if os.path.abspath(caminho) == os.path.abspath(REGISTRO_DB):
+        executar_migracoes(registro)
+    return registro
+
+
+def executar_migracoes(registro):
+    """Migrações de uma única vez (JSON antigo e esquema compacto); erros são só impressos."""
+    try:
+        importados = registro.migrar_json()
+        if importados:
+            print(f"{importados} portfólios migrados de {REGISTRO_JSON} para {registro.caminho}.")
+    except Exception as e:
+        print(f"Erro ao migrar {REGISTRO_JSON}: {e}")
+    try:
+        registro.migrar_esquema()
+    except Exception as e:
+        print(f"Erro ao atualizar o esquema do registro: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do registro de portfólios (SQLite).")
+    parser.add_argument("--banco", default=REGISTRO_DB, help="Arquivo SQLite do registro.")
+    parser.add_argument("--importar", metavar="JSON",
+                        help="Importa (upsert por email) os portfólios de um JSON no formato antigo.")
+    parser.add_argument("--exportar", metavar="JSON", help="Exporta o registro para um JSON no formato antigo.")
+    parser.add_argument("--migrar-esquema", action="store_true",
+                        help="Regrava todas as linhas no formato compacto atual e mostra o ganho de espaço.")
+    args = parser.parse_args()
+
+    registro = abrir_registro(args.banco)
+    if args.migrar_esquema:
+        antes = registro.tamanho_dados()
+        regravadas = registro.migrar_esquema(forcar=True)
+        depois = registro.tamanho_dados()
+        print(f"{regravadas} portfólios regravados: {antes} -> {depois} caracteres.")
+    if args.importar:
+        print(f"{registro.migrar_json(args.importar, forcar=True)} portfólios importados de {args.importar}.")
+    if args.exportar:
+        print(f"{registro.exportar_json(args.exportar)} portfólios exportados para {args.exportar}.")
+    if not args.importar and not args.exportar and not args.migrar_esquema:
+        print(f"{registro.contar()} portfólios em {args.banco}.")
+    registro.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,212 @@
-import matplotlib
-matplotlib.use('Agg') # Define o backend não-interativo para evitar erros de thread
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import numpy as np
 import os
+import math
+import io
+import re
+import json
 import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont, ImageColor, ImageChops
+
+CHARTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads", "charts")
+
+# Arquivos que a limpeza LRU pode apagar: gráficos em cache e os antigos mini_chart_<hash do email>
+PADRAO_ARQUIVO_CACHE = re.compile(r"^(?:(?:radar|barras|donut)_[0-9a-f]{32}\.(?:png|svg)|mini_chart_[0-9a-f]{8}\.png)$")
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "fonts")
+
+# Bytes dos gráficos em cache por pasta (caminho absoluto -> total). Compartilhado entre as
+# instâncias, que são criadas a cada renderização; a pasta só é varrida na primeira escrita
+# do processo e quando uma escrita passa do limite.
+_bytes_cache = {}
+FRACAO_APOS_LIMPEZA = 0.9 # Ao passar do limite, descarta até esta fração dele
+_bytes_cache_lock = threading.Lock()
+
+_matplotlib = None
+_matplotlib_lock = threading.Lock()
+
+
+def _carregar_matplotlib():
+    """
+    Importa o matplotlib só quando um gráfico do PDF (radar/barras) é pedido,
+    para a interface não pagar o import e a inicialização das fontes ao abrir.
+    """
+    global _matplotlib
+    with _matplotlib_lock:
+        if _matplotlib is None:
+            import matplotlib
+            # API orientada a objetos (Figure + FigureCanvasAgg): cada gráfico tem sua própria figura,
+            # sem o estado global de "figura atual" do pyplot, então é seguro gerar gráficos em várias threads
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+            # hashsalt fixo: o mesmo gráfico sempre gera o mesmo SVG (configurado uma vez, só leitura depois)
+            matplotlib.rcParams["svg.hashsalt"] = "portfolio"
+            _matplotlib = (Figure, FigureCanvasAgg)
+    return _matplotlib
+
+
+def _fonte(tamanho, negrito=True):
+    """Fonte do projeto (Montserrat) para os gráficos feitos com Pillow."""
+    nome = "Montserrat-Bold.ttf" if negrito else "Montserrat-Regular.ttf"
+    try:
+        return ImageFont.truetype(os.path.join(FONTS_DIR, nome), tamanho)
+    except OSError:
+        return ImageFont.load_default()
+
 
 class GeradorRelatorios:
     """
     Classe responsável por gerar gráficos para o portfólio.
     """
-    def __init__(self, output_dir="uploads"):
+    def __init__(self, output_dir="uploads", usar_cache=True, max_bytes_cache=20 * 1024 * 1024):
+        """
+        usar_cache: gráficos gerados sem 'filename' são nomeados pelo hash do conteúdo
+        (tipo, categorias, valores, cor, tamanho, dpi) e reaproveitados entre portfólios e sessões.
+        max_bytes_cache: limite de espaço dos gráficos em cache em output_dir (descarte LRU).
+        """
         self.output_dir = output_dir
+        self.usar_cache = usar_cache
+        self.max_bytes_cache = max_bytes_cache
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def generate_radar_chart(self, categories, values, filename="radar_chart.png", color="#3498db"):
+    def _nova_figura(self, **kwargs):
+        """Cria uma figura independente, já ligada ao canvas Agg."""
+        Figure, FigureCanvasAgg = _carregar_matplotlib()
+        fig = Figure(**kwargs)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def _consultar_cache(self, tipo, filename, formato, categories, values, color, figsize, dpi):
+        """
+        Decide onde o gráfico será salvo e se ele já existe.
+        Retorna (caminho, resultado): resultado não é None quando o gráfico já está em cache.
+        """
+        if filename: # Nome explícito: comportamento antigo, sempre regera
+            return os.path.join(self.output_dir, filename), None
+
+        partes = [tipo, list(categories), [float(v) for v in values], color, list(figsize), dpi, formato]
+        chave = hashlib.sha256(json.dumps(partes, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+        caminho = os.path.join(self.output_dir, f"{tipo}_{chave}.{formato}")
+        if not self.usar_cache:
+            # Sempre regera, mas com o mesmo nome pelo conteúdo: threads/processos gerando
+            # gráficos diferentes ao mesmo tempo não gravam por cima um do outro
+            return (None if formato == "svg" else caminho), None
+        try:
+            os.utime(caminho, None) # Marca como usado (LRU)
+        except FileNotFoundError:
+            return caminho, None
+
+        if formato == "svg":
+            with open(caminho, "r", encoding="utf-8") as f:
+                return caminho, f.read()
+        return caminho, os.path.abspath(caminho)
+
+    def _gravar_atomico(self, caminho, escrever):
+        """
+        Grava via arquivo temporário + rename: threads/processos gerando o mesmo gráfico não se atrapalham.
+        Retorna quantos bytes a pasta ganhou (o arquivo novo menos o que ele substituiu).
+        """
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                escrever(f)
+            try:
+                anterior = os.path.getsize(caminho)
+            except FileNotFoundError:
+                anterior = 0
+            novo = os.path.getsize(temporario)
+            os.replace(temporario, caminho)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        return novo - anterior
+
+    def _salvar(self, fig, caminho, formato, **kwargs):
+        """
+        Salva a figura.
+        formato="png": grava em 'caminho' e retorna o caminho absoluto.
+        formato="svg": retorna o markup SVG (vetorial) para embutir no HTML; se houver
+        'caminho', também guarda uma cópia em cache.
+        """
+        if formato == "svg":
+            buffer = io.StringIO()
+            kwargs.pop("dpi", None) # Vetorial: resolução não se aplica
+            # Sem data nos metadados: mesmo gráfico -> mesmo SVG
+            fig.savefig(buffer, format="svg", metadata={"Date": None}, **kwargs)
+            svg = buffer.getvalue()
+            svg = svg[svg.index("<svg"):] # Remove o cabeçalho XML/DOCTYPE
+            # Sem width/height fixos (em pt) o tamanho passa a ser definido pelo CSS, mantendo o viewBox
+            svg = re.sub(r'^<svg([^>]*?) width="[^"]*" height="[^"]*"', r'<svg\1', svg, count=1)
+            if caminho:
+                self._limpar_cache(self._gravar_atomico(caminho, lambda f: f.write(svg.encode("utf-8"))))
+            return svg
+        
+        self._limpar_cache(self._gravar_atomico(caminho, lambda f: fig.savefig(f, format="png", **kwargs)))
+        return os.path.abspath(caminho)
+
+    def _limpar_cache(self, acrescimo):
+        """
+        Soma 'acrescimo' bytes ao total da pasta e, se passou de max_bytes_cache, apaga os
+        gráficos em cache menos usados até FRACAO_APOS_LIMPEZA do limite (a varredura também corrige o total).
+        """
+        pasta = os.path.abspath(self.output_dir)
+        with _bytes_cache_lock:
+            total = _bytes_cache.get(pasta)
+            if total is not None:
+                total += acrescimo
+                _bytes_cache[pasta] = total
+                if total <= self.max_bytes_cache:
+                    return
+
+            entradas = []
+            total = 0
+            for entrada in os.scandir(self.output_dir):
+                if entrada.is_file() and PADRAO_ARQUIVO_CACHE.match(entrada.name):
+                    info = entrada.stat()
+                    entradas.append((info.st_mtime, info.st_size, entrada.path))
+                    total += info.st_size
+
+            entradas.sort() # Menos usados primeiro
+            alvo = self.max_bytes_cache * FRACAO_APOS_LIMPEZA
+            for _, tamanho, caminho in entradas:
+                if total <= alvo:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+            _bytes_cache[pasta] = total
+
+    def generate_radar_chart(self, categories, values, filename=None, color="#3498db", formato="png"):
         """
         Gera um gráfico de radar (teia) para as categorias e valores fornecidos.
         Values deve ser uma lista de números (0-10 ou 0-100).
+        formato: "png" (retorna o caminho do arquivo) ou "svg" (retorna o markup SVG).
         """
         try:
             # Número de variáveis
             N = len(categories)
             if N < 3: return None # Precisa de pelo menos 3 para um radar
 
+            caminho, pronto = self._consultar_cache("radar", filename, formato, categories, values, color, (6, 6), 200)
+            if pronto is not None:
+                return pronto
+
             # O que faremos é repetir o primeiro valor no final para fechar o círculo
-            values += values[:1]
+            # (em uma cópia, para não alterar a lista de quem chamou)
+            values = list(values) + list(values[:1])
             
             # Calcula os ângulos para cada eixo
-            angles = [n / float(N) * 2 * np.pi for n in range(N)]
+            angles = [n / float(N) * 2 * math.pi for n in range(N)]
             angles += angles[:1]
 
             # Inicializa o plot polar com fundo branco
-            fig = plt.figure(figsize=(6, 6), facecolor='white')
+            fig = self._nova_figura(figsize=(6, 6), facecolor='white')
             ax = fig.add_subplot(111, polar=True, facecolor='white')
             
             # Desenha uma linha por fora e preenche
@@ -57,24 +230,26 @@ class GeradorRelatorios:
             ax.spines['polar'].set_visible(False)
 
             # Salva com fundo branco sólido
-            filepath = os.path.join(self.output_dir, filename)
-            plt.savefig(filepath, facecolor='white', edgecolor='none', bbox_inches='tight', dpi=200)
-            plt.close()
-            
-            return os.path.abspath(filepath)
+            return self._salvar(fig, caminho, formato, facecolor='white', edgecolor='none', bbox_inches='tight', dpi=200)
         except Exception as e:
             print(f"Erro ao gerar gráfico de radar: {e}")
             return None
 
-    def generate_bar_chart(self, categories, values, filename="bar_chart.png", color="#3498db"):
+    def generate_bar_chart(self, categories, values, filename=None, color="#3498db", formato="png"):
         """
         Gera um gráfico de barras horizontais.
+        formato: "png" (retorna o caminho do arquivo) ou "svg" (retorna o markup SVG).
         """
         try:
-            fig, ax = plt.subplots(figsize=(8, 4))
+            caminho, pronto = self._consultar_cache("barras", filename, formato, categories, values, color, (8, 4), 100)
+            if pronto is not None:
+                return pronto
+
+            fig = self._nova_figura(figsize=(8, 4))
+            ax = fig.add_subplot(111)
             
             # Cria as barras
-            y_pos = np.arange(len(categories))
+            y_pos = list(range(len(categories)))
             ax.barh(y_pos, values, align='center', color=color, alpha=0.8)
             
             # Labels e Títulos
@@ -95,72 +270,187 @@ class GeradorRelatorios:
             ax.set_axisbelow(True)
 
             # Salva
-            filepath = os.path.join(self.output_dir, filename)
-            plt.savefig(filepath, transparent=True, bbox_inches='tight', dpi=100)
-            plt.close()
-            
-            return os.path.abspath(filepath)
+            return self._salvar(fig, caminho, formato, transparent=True, bbox_inches='tight', dpi=100)
         except Exception as e:
             print(f"Erro ao gerar gráfico de barras: {e}")
             return None
     
-    def generate_mini_bar_chart(self, categories, values, filename="mini_bar.png", color="#3498db"):
+    def generate_mini_bar_chart(self, categories, values, filename=None, color="#3498db"):
         """
         Gera um gráfico de donut moderno para cards.
+        Desenhado direto com Pillow (no máximo três fatias e o total no centro): não depende do matplotlib.
         """
         try:
             if not categories or not values:
                 return None
-            
+
+            # Mesmo tamanho do antigo figsize=(3, 2) a 120 DPI
+            largura, altura = 360, 240
+            caminho, pronto = self._consultar_cache("donut", filename, "png", categories, values, color, (largura, altura), None)
+            if pronto is not None:
+                return pronto
+
+            # Desenha em escala 2x e reduz no final (antialiasing das bordas)
+            escala = 2
+            img = Image.new("RGB", (largura * escala, altura * escala), "white")
+            draw = ImageDraw.Draw(img)
+            cx, cy = largura * escala / 2, altura * escala / 2
+            raio = 95 * escala
+            raio_interno = raio * 0.6 # Espessura do anel: 0.4 do raio
+            texto_cor = "#2c3e50"
+
             # Paleta de cores moderna baseada na cor principal
-            import matplotlib.colors as mcolors
-            base_color = mcolors.to_rgb(color)
+            base = ImageColor.getrgb(color)[:3]
             colors = [
-                color,
-                mcolors.to_hex([base_color[0]*0.7, base_color[1]*0.7, base_color[2]*0.7]),
-                mcolors.to_hex([base_color[0]*0.5, base_color[1]*0.5, base_color[2]*0.5])
-            ]
-            colors = colors[:len(values)]
-            
-            # Cria figura com fundo branco
-            fig, ax = plt.subplots(figsize=(3, 2), facecolor='white')
-            ax.set_facecolor('white')
-            
-            # Cria o donut chart
-            wedges, texts, autotexts = ax.pie(
-                values, 
-                labels=categories,
-                colors=colors,
-                autopct='%1.0f',
-                startangle=90,
-                pctdistance=0.85,
-                wedgeprops=dict(width=0.4, edgecolor='white', linewidth=3),
-                textprops=dict(color='#2c3e50', weight='bold', fontsize=9)
-            )
-            
-            # Estiliza os textos de porcentagem
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontsize(10)
-                autotext.set_weight('bold')
-            
-            # Adiciona círculo central para efeito donut
-            centre_circle = plt.Circle((0, 0), 0.60, fc='white', linewidth=0)
-            ax.add_artist(centre_circle)
-            
-            # Adiciona texto central
+                base,
+                tuple(int(c * 0.7) for c in base),
+                tuple(int(c * 0.5) for c in base)
+            ][:len(values)]
+
             total = sum(values)
-            ax.text(0, 0, f'{total}\nSkills', ha='center', va='center',
-                   fontsize=11, weight='bold', color='#2c3e50')
-            
-            ax.axis('equal')
-            plt.tight_layout()
-            
-            filepath = os.path.join(self.output_dir, filename)
-            plt.savefig(filepath, facecolor='white', bbox_inches='tight', dpi=120)
-            plt.close()
-            
-            return os.path.abspath(filepath)
+            caixa = (cx - raio, cy - raio, cx + raio, cy + raio)
+
+            # Fatias no sentido anti-horário a partir do topo (como startangle=90 do matplotlib).
+            # O Pillow mede ângulos no sentido horário a partir das 3h, por isso o sinal invertido.
+            fatias = []
+            inicio = 90.0
+            for valor, cor in zip(values, colors):
+                fim = inicio + 360.0 * valor / total
+                draw.pieslice(caixa, -fim, -inicio, fill=cor)
+                fatias.append((inicio, fim, valor))
+                inicio = fim
+
+            # Separadores brancos entre as fatias
+            if len(fatias) > 1:
+                for inicio, _, _ in fatias:
+                    rad = math.radians(inicio)
+                    draw.line(
+                        [(cx, cy), (cx + raio * math.cos(rad), cy - raio * math.sin(rad))],
+                        fill="white", width=3 * escala
+                    )
+
+            # Círculo central para o efeito donut
+            draw.ellipse((cx - raio_interno, cy - raio_interno, cx + raio_interno, cy + raio_interno), fill="white")
+
+            fonte_label = _fonte(15 * escala)
+            fonte_pct = _fonte(17 * escala)
+            fonte_centro = _fonte(18 * escala)
+            for (inicio, fim, valor), categoria in zip(fatias, categories):
+                meio = math.radians((inicio + fim) / 2)
+                cos, sen = math.cos(meio), math.sin(meio)
+
+                # Percentual (branco) no meio do anel
+                pct = f"{100.0 * valor / total:1.0f}"
+                draw.text((cx + raio * 0.8 * cos, cy - raio * 0.8 * sen), pct, fill="white", font=fonte_pct, anchor="mm")
+
+                # Nome da categoria do lado de fora
+                ancora = "lm" if cos >= 0 else "rm"
+                draw.text((cx + raio * 1.1 * cos, cy - raio * 1.1 * sen), categoria, fill=texto_cor, font=fonte_label, anchor=ancora)
+
+            # Texto central
+            draw.multiline_text((cx, cy), f"{total}\nSkills", fill=texto_cor, font=fonte_centro, anchor="mm", align="center")
+
+            # Recorta a borda branca (como bbox_inches='tight') e volta ao tamanho final
+            margem = 12 * escala
+            bbox = ImageChops.difference(img, Image.new("RGB", img.size, "white")).getbbox()
+            if bbox:
+                img = img.crop((
+                    max(bbox[0] - margem, 0), max(bbox[1] - margem, 0),
+                    min(bbox[2] + margem, img.width), min(bbox[3] + margem, img.height)
+                ))
+            img = img.resize((img.width // escala, img.height // escala), Image.Resampling.LANCZOS)
+
+            self._limpar_cache(self._gravar_atomico(caminho, lambda f: img.save(f, "PNG")))
+            return os.path.abspath(caminho)
         except Exception as e:
             print(f"Erro ao gerar mini gráfico: {e}")
             return None
+    
+    def gerar_dashboard_registro(self, analise, caminho, formato="png"):
+        """
+        Dashboard com as estatísticas de todo o registro (ver analise_registro.analisar):
+        habilidades mais frequentes, co-ocorrência frontend x backend, quantidade de
+        habilidades por portfólio e portfólios criados por mês.
+        formato: "png" ou "pdf". Retorna o caminho absoluto do arquivo.
+        """
+        try:
+            fig = self._nova_figura(figsize=(16, 11), facecolor='white')
+            fig.suptitle(
+                f"Habilidades no registro — {analise['total_portfolios']} portfólios, "
+                f"{analise['total_habilidades']} habilidades distintas",
+                fontsize=18, weight='bold'
+            )
+            grade = fig.add_gridspec(2, 2, hspace=0.35, wspace=0.3)
+
+            # Habilidades mais frequentes
+            ax = fig.add_subplot(grade[0, 0])
+            nomes = [nome for nome, _ in analise["frequencia"]]
+            quantidades = [quantidade for _, quantidade in analise["frequencia"]]
+            ax.barh(range(len(nomes)), quantidades, color='#3498db', alpha=0.85)
+            ax.set_yticks(range(len(nomes)))
+            ax.set_yticklabels(nomes)
+            ax.invert_yaxis()
+            ax.set_title("Habilidades mais frequentes", weight='bold')
+            ax.set_xlabel("Portfólios")
+            ax.spines['right'].set_visible(False)
+            ax.spines['top'].set_visible(False)
+
+            # Co-ocorrência frontend x backend
+            ax = fig.add_subplot(grade[0, 1])
+            frontend, backend, matriz = analise["coocorrencia"]
+            if len(frontend) and len(backend):
+                mapa = ax.imshow(matriz, cmap='Blues', aspect='auto')
+                ax.set_xticks(range(len(backend)))
+                ax.set_xticklabels(backend, rotation=45, ha='right')
+                ax.set_yticks(range(len(frontend)))
+                ax.set_yticklabels(frontend)
+                fig.colorbar(mapa, ax=ax, fraction=0.046, pad=0.04)
+            else:
+                ax.text(0.5, 0.5, "Sem dados suficientes", ha='center', va='center', color='gray')
+                ax.set_axis_off()
+            ax.set_title("Co-ocorrência Frontend x Backend", weight='bold')
+
+            # Quantidade de habilidades por portfólio, por categoria
+            ax = fig.add_subplot(grade[1, 0])
+            distribuicao = analise["distribuicao"]
+            largura = 0.8 / max(len(analise["categorias"]), 1)
+            cores = ('#3498db', '#2ecc71', '#e67e22')
+            for i, categoria in enumerate(analise["categorias"]):
+                posicoes = [x + i * largura for x in range(distribuicao.shape[1])]
+                ax.bar(posicoes, distribuicao[i], width=largura, label=categoria, color=cores[i % len(cores)])
+            ax.set_xticks([x + 0.4 - largura / 2 for x in range(distribuicao.shape[1])])
+            ax.set_xticklabels([str(x) for x in range(distribuicao.shape[1])])
+            ax.set_title("Habilidades por portfólio", weight='bold')
+            ax.set_xlabel("Quantidade de habilidades")
+            ax.set_ylabel("Portfólios")
+            ax.legend()
+            ax.spines['right'].set_visible(False)
+            ax.spines['top'].set_visible(False)
+
+            # Portfólios criados por mês
+            ax = fig.add_subplot(grade[1, 1])
+            meses, por_mes = analise["por_mes"]
+            ax.bar(range(len(meses)), por_mes, color='#9b59b6', alpha=0.85)
+            passo = max(1, len(meses) // 12) # No máximo ~12 rótulos no eixo
+            ax.set_xticks(range(0, len(meses), passo))
+            ax.set_xticklabels(meses[::passo], rotation=45, ha='right')
+            ax.set_title("Portfólios criados por mês", weight='bold')
+            ax.set_ylabel("Portfólios")
+            ax.spines['right'].set_visible(False)
+            ax.spines['top'].set_visible(False)
+
+            self._gravar_atomico(caminho, lambda f: fig.savefig(f, format=formato, dpi=100, facecolor='white'))
+            return os.path.abspath(caminho)
+        except Exception as e:
+            print(f"Erro ao gerar dashboard do registro: {e}")
+            return None
+
+    def gerar_em_paralelo(self, tarefas, max_workers=None):
+        """
+        Gera vários gráficos ao mesmo tempo em um pool de threads.
+        tarefas: lista de (nome_do_metodo, kwargs), ex: ("generate_radar_chart", {...}).
+        Retorna os resultados na mesma ordem das tarefas.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futuros = [pool.submit(getattr(self, nome), **kwargs) for nome, kwargs in tarefas]
+            return [futuro.result() for futuro in futuros]
@@ -0,0 +1,190 @@
+import copy
+import threading
+import numpy as np
+
+from busca import habilidades, tokenizar
+
+# Peso de cada tipo de termo no vetor do portfólio: habilidades pesam mais que palavras do título
+PESO_HABILIDADE = 1.0
+PESO_TITULO = 0.5
+
+METRICAS = ("cosseno", "jaccard")
+
+
+def termos_portfolio(portfolio):
+    """Termos (com peso) que descrevem o perfil: habilidades normalizadas e palavras do título."""
+    termos = {f"h:{chave}": PESO_HABILIDADE for chave in habilidades(portfolio)}
+    for palavra in tokenizar(portfolio.get("titulo")):
+        termos.setdefault(f"t:{palavra}", PESO_TITULO)
+    return termos
+
+
+class MotorSimilaridade:
+    """
+    Busca de portfólios parecidos por habilidades e título.
+    Cada portfólio é um vetor esparso de termos; o índice guarda, por termo, os ids dos
+    portfólios que o têm. Para uma consulta, as listas dos termos dela são concatenadas e
+    np.bincount soma a interseção de todos os portfólios de uma vez; o resto (normas,
+    cosseno/Jaccard, top N com argpartition) é aritmética em vetores.
+    Atualizações marcam a versão antiga como removida e acrescentam uma nova; o índice é
+    compactado quando as removidas passam da metade.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self._termos = {} # termo -> código
+        self._pesos = [] # código -> peso
+        self._listas = [] # código -> lista de ids com o termo
+        self._arrays = {} # código -> np.array da lista (cache, refeito após mudanças)
+        self._ids = {} # email -> id atual
+        self._portfolios = [] # id -> portfólio (None se removido)
+        self._vivos = np.zeros(0, dtype=bool)
+        self._norma2 = np.zeros(0) # soma dos pesos ao quadrado (cosseno)
+        self._massa = np.zeros(0) # soma dos pesos (Jaccard)
+        self._removidos = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def construir(self, portfolios):
+        with self._lock:
+            self._limpar()
+            for portfolio in portfolios:
+                self._adicionar(portfolio)
+
+    def atualizar(self, portfolio):
+        """Insere ou substitui (pelo email) um portfólio."""
+        with self._lock:
+            self._adicionar(portfolio)
+            if self._removidos > len(self._ids):
+                self._compactar()
+
+    def remover(self, email):
+        with self._lock:
+            id_doc = self._ids.pop(email or "", None)
+            if id_doc is not None:
+                self._marcar_removido(id_doc)
+
+    def _marcar_removido(self, id_doc):
+        self._vivos[id_doc] = False
+        self._portfolios[id_doc] = None
+        self._removidos += 1
+
+    def _crescer(self, tamanho):
+        """Aumenta os vetores por dobra (custo amortizado constante por inserção)."""
+        capacidade = self._vivos.size
+        if tamanho <= capacidade:
+            return
+        nova = max(tamanho, capacidade * 2, 64)
+        for nome in ("_vivos", "_norma2", "_massa"):
+            antigo = getattr(self, nome)
+            novo = np.zeros(nova, dtype=antigo.dtype)
+            novo[:capacidade] = antigo
+            setattr(self, nome, novo)
+
+    def _adicionar(self, portfolio):
+        email = portfolio.get("email") or ""
+        anterior = self._ids.get(email)
+        if anterior is not None:
+            self._marcar_removido(anterior)
+
+        id_doc = len(self._portfolios)
+        self._portfolios.append(portfolio)
+        self._ids[email] = id_doc
+        self._crescer(id_doc + 1)
+
+        norma2 = massa = 0.0
+        for termo, peso in termos_portfolio(portfolio).items():
+            codigo = self._termos.get(termo)
+            if codigo is None:
+                codigo = self._termos[termo] = len(self._pesos)
+                self._pesos.append(peso)
+                self._listas.append([])
+            self._listas[codigo].append(id_doc)
+            self._arrays.pop(codigo, None)
+            norma2 += peso * peso
+            massa += peso
+        self._vivos[id_doc] = True
+        self._norma2[id_doc] = norma2
+        self._massa[id_doc] = massa
+
+    def _compactar(self):
+        """Reconstrói sem as versões removidas."""
+        vivos = [p for p in self._portfolios if p is not None]
+        self._limpar()
+        for portfolio in vivos:
+            self._adicionar(portfolio)
+
+    def _array(self, codigo):
+        array = self._arrays.get(codigo)
+        if array is None:
+            array = self._arrays[codigo] = np.asarray(self._listas[codigo], dtype=np.int64)
+        return array
+
+    def similares(self, portfolio, n=10, metrica="cosseno"):
+        """
+        Os n portfólios mais parecidos com 'portfolio' (ele mesmo é excluído pelo email).
+        Retorna [(portfolio, pontuação entre 0 e 1), ...] do mais para o menos parecido.
+        """
+        consulta = termos_portfolio(portfolio)
+        with self._lock:
+            total = len(self._portfolios)
+            codigos = [self._termos[t] for t in consulta if t in self._termos]
+            if not codigos or total == 0:
+                return []
+
+            # Interseção ponderada de cada portfólio com a consulta, num único bincount
+            ids = np.concatenate([self._array(c) for c in codigos])
+            pesos = np.repeat([self._pesos[c] for c in codigos], [len(self._listas[c]) for c in codigos])
+
+            if metrica == "jaccard":
+                intersecao = np.bincount(ids, weights=pesos, minlength=total)
+                massa_consulta = sum(consulta.values())
+                uniao = self._massa[:total] + massa_consulta - intersecao
+                pontuacao = np.divide(intersecao, uniao, out=np.zeros(total), where=uniao > 0)
+            else:
+                produto = np.bincount(ids, weights=pesos * pesos, minlength=total)
+                norma_consulta = np.sqrt(sum(p * p for p in consulta.values()))
+                normas = np.sqrt(self._norma2[:total]) * norma_consulta
+                pontuacao = np.divide(produto, normas, out=np.zeros(total), where=normas > 0)
+
+            np.minimum(pontuacao, 1.0, out=pontuacao) # Arredondamento de ponto flutuante
+            pontuacao[~self._vivos[:total]] = 0
+            proprio = self._ids.get(portfolio.get("email") or "")
+            if proprio is not None:
+                pontuacao[proprio] = 0
+
+            candidatos = int(np.count_nonzero(pontuacao))
+            n = min(n, candidatos)
+            if n <= 0:
+                return []
+            melhores = np.argpartition(-pontuacao, n - 1)[:n]
+            melhores = melhores[np.argsort(-pontuacao[melhores], kind="stable")]
+            return [(self._portfolios[i], float(pontuacao[i])) for i in melhores]
+
+
+_motor = None
+_motor_lock = threading.Lock()
+
+
+def obter_motor_similaridade():
+    """Motor compartilhado, construído a partir do registro na primeira consulta."""
+    global _motor
+    with _motor_lock:
+        if _motor is None:
+            from registro import obter_registro
+            motor = MotorSimilaridade()
+            motor.construir(obter_registro().listar())
+            _motor = motor
+    return _motor
+
+
+def atualizar_similaridade(portfolio):
+    """Atualização incremental após um save (se o motor ainda não foi construído, nada a fazer)."""
+    with _motor_lock:
+        motor = _motor
+    if motor is not None:
+        # Cópia: o dicionário salvo continua sendo editado pelo formulário
+        motor.atualizar(copy.deepcopy(portfolio))
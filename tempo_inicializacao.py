@@ -0,0 +1,106 @@
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+
+class RelatorioInicializacao:
+    """
+    Mede o tempo de inicialização do app: import de cada módulo, criação das telas
+    e o tempo até a primeira pintura da janela.
+    Ativado com a variável de ambiente PORTFOLIO_TEMPO_INICIALIZACAO=1 ou com
+    'python main.py --tempo-inicializacao'. O relatório é impresso no console e
+    acrescentado em output/tempo_inicializacao.jsonl para acompanhar regressões.
+    As telas criadas depois da primeira pintura (com os imports pesados delas) entram
+    no log em linhas próprias, uma por tela.
+    """
+    def __init__(self, inicio=None, ativo=False, log_path=os.path.join("output", "tempo_inicializacao.jsonl")):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.ativo = ativo
+        self.log_path = log_path
+        self.imports = [] # (módulo, segundos, pacotes novos carregados)
+        self.marcos = [] # (nome, segundos desde o início)
+        self.telas = [] # (tela, segundos de import, segundos no total), antes da primeira pintura
+        self._impresso = False
+        self._imports_salvos = 0 # Imports já gravados no log
+
+    def importar(self, nome_modulo):
+        """Importa um módulo medindo o tempo (só conta se ainda não estava carregado)."""
+        if nome_modulo in sys.modules:
+            return sys.modules[nome_modulo]
+        antes = set(sys.modules)
+        t0 = time.perf_counter()
+        modulo = importlib.import_module(nome_modulo)
+        duracao = time.perf_counter() - t0
+        novos = sorted({nome.split(".")[0] for nome in set(sys.modules) - antes} - {nome_modulo.split(".")[0]})
+        self.imports.append((nome_modulo, duracao, novos))
+        return modulo
+
+    def registrar_import(self, nome_modulo, duracao):
+        """Registra um import medido manualmente (ex: imports do topo do main.py)."""
+        self.imports.append((nome_modulo, duracao, []))
+
+    def registrar_tela(self, nome, segundos_import, segundos_total):
+        """
+        Registra a criação de uma tela. Antes da primeira pintura ela entra no relatório
+        principal; depois, é impressa e gravada no log na hora, com os imports que trouxe.
+        """
+        if not self.ativo:
+            return
+        if not self._impresso:
+            self.telas.append((nome, segundos_import, segundos_total))
+            return
+        imports = self.imports[self._imports_salvos:]
+        self._imports_salvos = len(self.imports)
+        print(f"Tela {nome} criada em {segundos_total * 1000:.1f} ms (import {segundos_import * 1000:.1f} ms)")
+        for modulo, duracao, novos in imports:
+            print(self._linha_import(modulo, duracao, novos))
+        self._salvar({
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "tela": nome,
+            "import_ms": round(segundos_import * 1000, 1),
+            "total_ms": round(segundos_total * 1000, 1),
+            "imports_ms": {modulo: round(duracao * 1000, 1) for modulo, duracao, _ in imports},
+            "instante_ms": round((time.perf_counter() - self.inicio) * 1000, 1),
+        })
+
+    def marcar(self, nome):
+        """Registra um marco (ex: 'primeira_pintura') com o tempo desde o início."""
+        self.marcos.append((nome, time.perf_counter() - self.inicio))
+
+    def imprimir(self):
+        if not self.ativo:
+            return
+        print("\n--- Tempo de inicialização ---")
+        for nome, duracao, novos in self.imports:
+            print(self._linha_import(nome, duracao, novos))
+        for nome, _, total in self.telas:
+            print(f"{'tela ' + nome:<27} {total * 1000:8.1f} ms")
+        for nome, instante in self.marcos:
+            print(f"{nome:<27} {instante * 1000:8.1f} ms")
+        self._impresso = True
+        self._imports_salvos = len(self.imports)
+        self._salvar({
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "imports_ms": {nome: round(duracao * 1000, 1) for nome, duracao, _ in self.imports},
+            "telas_ms": {nome: round(total * 1000, 1) for nome, _, total in self.telas},
+            "marcos_ms": {nome: round(instante * 1000, 1) for nome, instante in self.marcos},
+        })
+
+    @staticmethod
+    def _linha_import(nome, duracao, novos):
+        extra = f" (+ {', '.join(novos[:6])}{'...' if len(novos) > 6 else ''})" if novos else ""
+        return f"import {nome:<20} {duracao * 1000:8.1f} ms{extra}"
+
+    def _salvar(self, registro):
+        """Acrescenta o registro como uma linha JSON no log."""
+        try:
+            pasta = os.path.dirname(self.log_path)
+            if pasta and not os.path.exists(pasta):
+                os.makedirs(pasta)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"Erro ao salvar relatório de inicialização: {e}")